@@ -4,14 +4,23 @@ import os
 import json
 import shutil
 import subprocess  # Import subprocess module
-from PyQt5.QtCore import pyqtSignal
+import threading
+from collections import OrderedDict
+from PyQt5.QtCore import QObject, pyqtSignal
 from PyQt5.QtCore import Qt  # Import Qt module for alignment
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QMainWindow, QTextEdit, QApplication, QMessageBox, QInputDialog, QVBoxLayout, QPushButton, QWidget, QDesktopWidget, QHBoxLayout, QSpacerItem, QSizePolicy, QLabel
-
-# Define constants for file paths
-BASE_DIRECTORY_PATH = "C:/Autodesk/Autodesk_Maya_2024_1_Update_Windows_64bit_dlm"
-PROJECTS_FOLDER = "PMT_Projects"
-COMPANY_NAME = "Company Name"
+from PyQt5.QtWidgets import QTableWidget, QTableWidgetItem, QHeaderView, QStackedWidget, QProgressDialog
+
+# Import shared constants for file paths
+from pmt_config import BASE_DIRECTORY_PATH, COMPANY_NAME, DEPARTMENT_ASSETS_PATH, PMT_PROJECTS_PATH
+import pmt_disk_usage
+import pmt_export_queue
+import pmt_metadata
+import pmt_operations
+import pmt_templates
+import pmt_tools
+import pmt_temp_janitor
 
 # Create the QApplication instance
 app = QApplication(sys.argv)
@@ -24,7 +33,143 @@ class CenteredWindowMixin:
         qr.moveCenter(cp)
         self.move(qr.topLeft())
 
-class MainWindow(QMainWindow, CenteredWindowMixin):
+# Remove and free everything in a layout so a screen can be refilled without stacking old widgets on top
+def clear_layout(layout):
+    while layout.count():
+        item = layout.takeAt(0)
+        if item.widget() is not None:
+            item.widget().deleteLater()
+        elif item.layout() is not None:
+            clear_layout(item.layout())
+            item.layout().deleteLater()
+
+# Runs one long operation (archive, rename with reference rewriting) on a worker thread.
+# work(progress) is called on the thread; progress and the result are delivered as signals on the Qt thread.
+class OperationWorker(QObject):
+    progress = pyqtSignal(int, int, str)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, work):
+        super().__init__()
+        self.work = work
+
+    def run(self):
+        try:
+            result = self.work(self.progress.emit)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.finished.emit(result)
+
+# Base class for the screens shown inside the NavigationController
+class Screen(QWidget):
+    def __init__(self, navigator):
+        super().__init__()
+        self.navigator = navigator
+        self.workers = set()
+
+    # Run work(progress) without blocking the UI, behind a modal progress dialog; done(result) runs on the Qt thread
+    def run_operation(self, label, work, done, error_text):
+        dialog = QProgressDialog(label, None, 0, 0, self)
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(0)
+        worker = OperationWorker(work)
+        self.workers.add(worker)  # Keep the worker alive until it reports back
+
+        def progress(done_count, total, name):
+            dialog.setMaximum(total)
+            dialog.setValue(done_count)
+            dialog.setLabelText(f"{label}\n{os.path.basename(name.rstrip('/'))}")
+
+        def finished(result):
+            self.workers.discard(worker)
+            dialog.close()
+            done(result)
+
+        def failed(error):
+            self.workers.discard(worker)
+            dialog.close()
+            QMessageBox.critical(self, "Error", f"{error_text}: {error}")
+
+        worker.progress.connect(progress)
+        worker.finished.connect(finished)
+        worker.failed.connect(failed)
+        dialog.show()
+        threading.Thread(target=worker.run, daemon=True).start()
+
+    # Called when a cached screen is shown again; screens re-read their folder listing here
+    def refresh(self):
+        pass
+
+    def go_back(self):
+        self.navigator.back()
+
+# Single top-level window that shows one screen at a time in a QStackedWidget.
+# Screens are cached by (class, arguments) and refreshed instead of rebuilt when shown again;
+# once the cache is full the least recently used screens that aren't in the back history are freed.
+class NavigationController(QMainWindow, CenteredWindowMixin):
+    def __init__(self, max_cached_screens=8):
+        super().__init__()
+        self.max_cached_screens = max_cached_screens
+        self.stack = QStackedWidget()
+        self.setCentralWidget(self.stack)
+        self.screens = OrderedDict()
+        self.history = []
+
+    def set_home(self, screen):
+        self.screens[None] = screen
+        self.stack.addWidget(screen)
+        self.history = [None]
+        self.show_screen(None)
+
+    def push(self, screen_class, replace=False, **kwargs):
+        key = (screen_class, tuple(sorted(kwargs.items())))
+        screen = self.screens.get(key)
+        if screen is None:
+            screen = screen_class(self, **kwargs)
+            self.screens[key] = screen
+            self.stack.addWidget(screen)
+        else:
+            self.screens.move_to_end(key)
+            screen.refresh()
+
+        # replace=True swaps out the current screen so Back skips it
+        if replace and len(self.history) > 1:
+            self.history.pop()
+        if key in self.history:
+            del self.history[self.history.index(key) + 1:]
+        else:
+            self.history.append(key)
+        self.show_screen(key)
+        self.evict()
+        return screen
+
+    def back(self):
+        if len(self.history) > 1:
+            self.history.pop()
+        self.screens[self.history[-1]].refresh()
+        self.show_screen(self.history[-1])
+
+    def home(self):
+        del self.history[1:]
+        self.show_screen(None)
+
+    def show_screen(self, key):
+        screen = self.screens[key]
+        self.stack.setCurrentWidget(screen)
+        self.setWindowTitle(screen.windowTitle())
+
+    def evict(self):
+        while len(self.screens) > self.max_cached_screens:
+            key = next((k for k in self.screens if k not in self.history), None)
+            if key is None:
+                break
+            screen = self.screens.pop(key)
+            self.stack.removeWidget(screen)
+            screen.deleteLater()
+
+class MainWindow(NavigationController):
     def __init__(self):
         super(MainWindow, self).__init__()
         self.setWindowTitle("Main Menu")
@@ -36,6 +181,8 @@ class MainWindow(QMainWindow, CenteredWindowMixin):
         self.center_window()
         self.json_file_path = self.create_pmt_json()  # Create/update the JSON file on startup and get its path
         self.copy_shelf_script()  # Copy the MEL script to Maya shelves directory
+        self.start_export_scheduler()  # Run queued exports from Maya in the background
+        self.start_temp_janitor()  # Keep the Temp folders from filling up
 
     def check_maya_installation(self):
         possible_paths = [
@@ -73,33 +220,60 @@ class MainWindow(QMainWindow, CenteredWindowMixin):
         assets_button.clicked.connect(self.open_department_assets_window)
         layout.addWidget(assets_button)
 
-        container = QWidget()
-        container.setLayout(layout)
-        self.setCentralWidget(container)
+        queue_button = QPushButton('Export Queue')
+        queue_button.setFixedSize(160, 30)
+        queue_button.clicked.connect(self.open_export_queue_window)
+        layout.addWidget(queue_button)
 
-    def copy_shelf_script(self):
-        # Get the user's Documents directory
-        documents_dir = os.path.join(os.path.expanduser('~'), 'OneDrive - University of Central Florida', 'Documents')
-        maya_prefs_dir = os.path.join(documents_dir, 'maya', '2024', 'prefs', 'shelves')
-    
-        if not os.path.exists(maya_prefs_dir):
-            QMessageBox.critical(self, "Error", f"Maya shelves directory does not exist at {maya_prefs_dir}!")
+        usage_button = QPushButton('Disk Usage')
+        usage_button.setFixedSize(160, 30)
+        usage_button.clicked.connect(lambda: self.push(DiskUsageWindow))
+        layout.addWidget(usage_button)
+
+        home_screen = Screen(self)
+        home_screen.setWindowTitle("Main Menu")
+        home_screen.setLayout(layout)
+        self.set_home(home_screen)
+
+    def start_export_scheduler(self):
+        try:
+            self.export_scheduler = pmt_export_queue.ExportScheduler()
+            self.export_scheduler.start()
+            app.aboutToQuit.connect(lambda: self.export_scheduler.stop(wait=False))
+        except OSError as e:
+            self.export_scheduler = None
+            QMessageBox.warning(self, "Warning", f"Export queue is unavailable: {e}")
+
+    def start_temp_janitor(self):
+        self.temp_janitor = pmt_temp_janitor.TempJanitor()
+        self.temp_janitor.start()
+        app.aboutToQuit.connect(lambda: self.temp_janitor.stop(wait=False))
+
+    def open_export_queue_window(self):
+        if self.export_scheduler is None:
+            QMessageBox.critical(self, "Error", "Export queue is not running!")
             return
+        self.push(ExportQueueWindow, scheduler=self.export_scheduler)
 
-        # Define the source and destination paths for the MEL script
-        source_script_path = os.path.join(os.path.dirname(__file__), 'shelf_AutoExport.mel')
-        destination_script_path = os.path.join(maya_prefs_dir, 'shelf_AutoExport.mel')
+    def copy_shelf_script(self):
+        # Generate the shelf from the export tool; shelves that are already current aren't touched
+        shelf_folders = pmt_tools.find_shelf_folders()
+        if not shelf_folders:
+            QMessageBox.critical(self, "Error", f"No Maya shelves directory found in {', '.join(pmt_tools.DOCUMENTS_FOLDERS)}!")
+            return
 
-        # Copy the MEL script
         try:
-            shutil.copy(source_script_path, destination_script_path)
-            print(f"Copied {source_script_path} to {destination_script_path}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to copy MEL script: {e}")
+            summary = pmt_tools.deploy_shelves(shelf_folders)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to read the export tool: {e}")
+            return
+        for path in summary['written']:
+            print(f"Updated {path}")
+        for path, error in summary['failed']:
+            QMessageBox.critical(self, "Error", f"Failed to write MEL script {path}: {error}")
 
     def open_department_assets_window(self, copy_source_path=None):
         department_assets_path = os.path.join(BASE_DIRECTORY_PATH, COMPANY_NAME, "Department Assets")
-        self.close()
         if not os.path.exists(department_assets_path):
             try:
                 os.makedirs(department_assets_path)
@@ -109,13 +283,12 @@ class MainWindow(QMainWindow, CenteredWindowMixin):
 
         if copy_source_path:
             try:
-                shutil.copy(copy_source_path, department_assets_path)
+                pmt_operations.copy_maya_file(copy_source_path, department_assets_path)
                 QMessageBox.information(self, "File Copied", "Maya file copied to Department Assets folder successfully!")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to copy Maya file to Department Assets folder: {e}")
         else:
-            department_assets_window = DepartmentAssetsWindow(parent=self)
-            department_assets_window.show()
+            self.push(DepartmentAssetsWindow)
 
     def createproject(self):
         try:
@@ -123,49 +296,21 @@ class MainWindow(QMainWindow, CenteredWindowMixin):
             if not ok or not project_name:
                 return
 
-            project_path = os.path.join(BASE_DIRECTORY_PATH, COMPANY_NAME, "PMT Projects", project_name)
-            subdirectories = [
-                'Exported/Characters',
-                'Exported/Environments',
-                'Exported/Props',
-                'Source/Characters',
-                'Source/Environments',
-                'Source/Props'
-            ]
-
-            os.makedirs(project_path, exist_ok=True)
-            for subdirectory in subdirectories:
-                subdirectory_path = os.path.join(project_path, subdirectory)
-                os.makedirs(subdirectory_path, exist_ok=True)
-                if subdirectory.startswith('Source'):
-                    tools_folder_path = os.path.join(subdirectory_path, 'Tools')
-                    temp_folder_path = os.path.join(subdirectory_path, 'Temp')
-                    config_folder_path = os.path.join(tools_folder_path, 'Config')
-                    os.makedirs(tools_folder_path, exist_ok=True)
-                    os.makedirs(temp_folder_path, exist_ok=True)
-                    os.makedirs(config_folder_path, exist_ok=True)
-                    config_json_path = os.path.join(config_folder_path, 'ConfigInfo.json')
-                    if not os.path.exists(config_json_path):
-                        shutil.copy(self.json_file_path, config_folder_path)  # Copy JSON file to Config folder
-
-                                    # Copy PMT Export Tool to Tools folder
-                    source_tool_path = os.path.join(os.path.dirname(__file__), 'PMT Export Tool.txt')
-                    destination_tool_path = os.path.join(tools_folder_path, 'PMT Export Tool.txt')
-                    if os.path.exists(source_tool_path):
-                        shutil.copy(source_tool_path, destination_tool_path)
-                    else:
-                        QMessageBox.warning(self, "Warning", f"PMT Export Tool.txt not found at {source_tool_path}")
-
-
-            source_maya_files = [
-                os.path.join(project_path, 'Source/Characters/Character.ma'),
-                os.path.join(project_path, 'Source/Environments/Environment.ma'),
-                os.path.join(project_path, 'Source/Props/Prop.ma')
-            ]
-            for maya_file in source_maya_files:
-                with open(maya_file, 'w') as file:
-                    file.write("//Maya ASCII 2023 scene\n")
-
+            # Clone the project from a template; only ask which one when there is a choice
+            pmt_templates.ensure_default_template()
+            templates = pmt_templates.list_templates()
+            template = pmt_templates.DEFAULT_TEMPLATE
+            if len(templates) > 1:
+                template, ok = QInputDialog.getItem(self, 'Project Template', 'Choose a project template:', templates,
+                                                    templates.index(template) if template in templates else 0, False)
+                if not ok:
+                    return
+
+            summary = pmt_operations.create_project(project_name, template)
+            for warning in summary['warnings']:
+                QMessageBox.warning(self, "Warning", warning)
+            print(f"Created project '{project_name}' from template '{template}' in {summary['seconds']:.2f}s "
+                  f"({summary['reflinked']} reflinked, {summary['hardlinked']} hardlinked, {summary['copied']} copied)")
             QMessageBox.information(self, "Project Creation", f"Created project structure!")
 
         except OSError as e:
@@ -241,9 +386,7 @@ class MainWindow(QMainWindow, CenteredWindowMixin):
         if not os.path.exists(projects_path):
             QMessageBox.critical(self, "Error", f"'PMT Projects' folder does not exist!")
             return
-        self.project_selection_window = ProjectSelectionWindow(projects_path, previous_window=self)
-        self.project_selection_window.show()
-        self.close()
+        self.push(ProjectSelectionWindow, projects_path=projects_path)
 
     def create_pmt_json(self, json_path=None):
         projects_path = os.path.join(BASE_DIRECTORY_PATH, COMPANY_NAME, "PMT Projects")
@@ -310,21 +453,198 @@ class MainWindow(QMainWindow, CenteredWindowMixin):
         print(f"Created JSON file at {json_path}")
         return json_path
 
-class DepartmentAssetsWindow(QMainWindow, CenteredWindowMixin):
-    def __init__(self, parent=None):
-        super().__init__(parent)
+class ExportQueueWindow(Screen):
+    def __init__(self, navigator, scheduler):
+        super().__init__(navigator)
+        self.setWindowTitle('Export Queue')
+        self.scheduler = scheduler
+        self.initUI()
+
+        # Refresh the dashboard once a second while it is on screen
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def showEvent(self, event):
+        self.refresh_timer.start(1000)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def initUI(self):
+        layout = QVBoxLayout()
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.jobs_table = QTableWidget(0, 6)
+        self.jobs_table.setHorizontalHeaderLabels(['Scene', 'State', 'Priority', 'Attempts', 'Waited (s)', 'Ran (s)'])
+        self.jobs_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.jobs_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.jobs_table)
+
+        back_button = QPushButton('Back')
+        back_button.setFixedSize(60, 30)
+        back_button.clicked.connect(self.go_back)
+        layout.addWidget(back_button)
+
+        self.setLayout(layout)
+
+    def refresh(self):
+        status = self.scheduler.status()
+        counts = status['counts']
+        self.summary_label.setText(f"Queued: {counts['queued']}   Running: {counts['running']} / {status['max_concurrent']}   "
+                                   f"Done: {counts['done']}   Failed: {counts['failed']}")
+
+        self.jobs_table.setRowCount(len(status['jobs']))
+        for row, job in enumerate(status['jobs']):
+            run_seconds = '' if job['run_seconds'] is None else f"{job['run_seconds']:.1f}"
+            values = [os.path.basename(job['scene']), job['state'], str(job['priority']), str(job['attempts']),
+                      f"{job['wait_seconds']:.1f}", run_seconds]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column == 1 and job['error']:
+                    item.setToolTip(job['error'])
+                self.jobs_table.setItem(row, column, item)
+
+class DiskUsageWindow(Screen):
+    def __init__(self, navigator):
+        super().__init__(navigator)
+        self.setWindowTitle('Disk Usage')
+        self.report = None
+        self.scan_thread = None
+        self.initUI()
+
+        # The scan runs in a background thread; poll for its result instead of blocking the UI
+        self.poll_timer = QTimer(self)
+        self.poll_timer.timeout.connect(self.show_report)
+        self.refresh()
+
+    def initUI(self):
+        layout = QVBoxLayout()
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.usage_table = QTableWidget(0, 4)
+        self.usage_table.setHorizontalHeaderLabels(['Project / Library', 'Total', 'Source', 'Exported'])
+        self.usage_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.usage_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.usage_table)
+
+        self.largest_table = QTableWidget(0, 2)
+        self.largest_table.setHorizontalHeaderLabels(['Largest Files', 'Size'])
+        self.largest_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.largest_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.largest_table)
+
+        button_layout = QHBoxLayout()
+
+        duplicates_button = QPushButton('Find Duplicates')
+        duplicates_button.setFixedSize(120, 30)
+        duplicates_button.clicked.connect(lambda: self.start_scan(duplicates=True))
+        button_layout.addWidget(duplicates_button)
+
+        back_button = QPushButton('Back')
+        back_button.setFixedSize(60, 30)
+        back_button.clicked.connect(self.go_back)
+        button_layout.addWidget(back_button)
+
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+    def refresh(self):
+        self.start_scan()
+
+    def start_scan(self, duplicates=False):
+        if self.scan_thread is not None and self.scan_thread.is_alive():
+            return
+        self.summary_label.setText("Scanning...")
+
+        def scan():
+            try:
+                self.report = pmt_disk_usage.disk_usage(duplicates=duplicates)
+            except OSError as e:
+                self.report = {"error": str(e)}
+
+        self.report = None
+        self.scan_thread = threading.Thread(target=scan, daemon=True)
+        self.scan_thread.start()
+        self.poll_timer.start(200)
+
+    def show_report(self):
+        if self.report is None:
+            return
+        self.poll_timer.stop()
+        report = self.report
+        if "error" in report:
+            self.summary_label.setText("")
+            QMessageBox.critical(self, "Error", f"Failed to measure disk usage: {report['error']}")
+            return
+
+        size = pmt_disk_usage.format_size
+        self.summary_label.setText(f"{size(report['total'])} in {report['files']} files ({report['seconds']:.1f}s)")
+        rows = [(name, project['total'], sum(project['Source'].values()), sum(project['Exported'].values()))
+                for name, project in report['projects'].items()]
+        rows += [(name, library_size, None, None) for name, library_size in report['libraries'].items()]
+        self.usage_table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                text = value if column == 0 else ('' if value is None else size(value))
+                self.usage_table.setItem(row, column, QTableWidgetItem(text))
+
+        self.largest_table.setRowCount(len(report['largest']))
+        for row, item in enumerate(report['largest']):
+            self.largest_table.setItem(row, 0, QTableWidgetItem(item['path']))
+            self.largest_table.setItem(row, 1, QTableWidgetItem(size(item['size'])))
+
+        if 'duplicates' in report:
+            wasted = sum(d['wasted'] for d in report['duplicates'])
+            lines = [f"{size(d['size'])} x{len(d['paths'])}: " + ", ".join(d['paths']) for d in report['duplicates'][:20]]
+            QMessageBox.information(self, "Duplicate Files",
+                                    f"{len(report['duplicates'])} sets of duplicates, {size(wasted)} reclaimable\n\n" + "\n".join(lines))
+
+class DepartmentAssetsWindow(Screen):
+    def __init__(self, navigator):
+        super().__init__(navigator)
         self.setWindowTitle("Department Assets")
-        self.setGeometry(100, 100, 400, 300)
-        self.parent = parent
+        self.listed_files = None
         self.initUI()
-        self.center_window()  # Center the window after initialization
+        self.refresh()
 
     def initUI(self):
         layout = QVBoxLayout()
 
+        # Maya file rows are filled in by refresh()
+        self.files_layout = QVBoxLayout()
+        layout.addLayout(self.files_layout)
+
+        # Create Maya File button
+        create_button = QPushButton('Create Maya File')
+        create_button.setFixedSize(120, 30)
+        create_button.clicked.connect(self.create_maya_file)
+        layout.addWidget(create_button)
+
+        back_button = QPushButton('Back')
+        back_button.setFixedSize(60, 30)
+        back_button.clicked.connect(self.go_back)
+        layout.addWidget(back_button)
+
+        self.setLayout(layout)
+
+        # Create the "Tools" folder if it doesn't exist
+        self.create_tools_folder()
+
+    def refresh(self):
         # List Maya files in the Department Assets folder
         department_assets_path = os.path.join(BASE_DIRECTORY_PATH, COMPANY_NAME, "Department Assets")
-        maya_files = [f for f in os.listdir(department_assets_path) if f.endswith('.ma') or f.endswith('.mb')]
+        maya_files = [f for f in pmt_metadata.list_files(department_assets_path) if f.endswith('.ma') or f.endswith('.mb')]
+        if maya_files == self.listed_files:
+            return
+        self.listed_files = maya_files
+        clear_layout(self.files_layout)
 
         for file in maya_files:
             file_layout = QVBoxLayout()
@@ -352,25 +672,7 @@ class DepartmentAssetsWindow(QMainWindow, CenteredWindowMixin):
 
             file_layout.addLayout(button_layout)
 
-            layout.addLayout(file_layout)
-
-        # Create Maya File button
-        create_button = QPushButton('Create Maya File')
-        create_button.setFixedSize(120, 30)
-        create_button.clicked.connect(self.create_maya_file)
-        layout.addWidget(create_button)
-
-        back_button = QPushButton('Back')
-        back_button.setFixedSize(60, 30)
-        back_button.clicked.connect(self.go_back)
-        layout.addWidget(back_button)
-
-        container = QWidget()
-        container.setLayout(layout)
-        self.setCentralWidget(container)
-
-        # Create the "Tools" folder if it doesn't exist
-        self.create_tools_folder()
+            self.files_layout.addLayout(file_layout)
 
     def create_tools_folder(self):
         department_assets_path = os.path.join(BASE_DIRECTORY_PATH, COMPANY_NAME, "Department Assets")
@@ -393,13 +695,13 @@ class DepartmentAssetsWindow(QMainWindow, CenteredWindowMixin):
         old_file_path = os.path.join(department_assets_path, file_name)
         new_file_name, ok = QInputDialog.getText(self, 'Rename Maya File', 'Enter new file name:', text=file_name)
         if ok and new_file_name:
-            new_file_path = os.path.join(department_assets_path, new_file_name)
-            try:
-                os.rename(old_file_path, new_file_path)
+            def done(new_file_path):
                 QMessageBox.information(self, "File Renamed", f"Renamed file to {new_file_name}")
-                self.initUI()  # Refresh the UI to reflect the renamed file
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to rename file: {e}")
+                self.refresh()  # Refresh the UI to reflect the renamed file
+
+            self.run_operation(f"Renaming {file_name}...",
+                               lambda progress: pmt_operations.rename_maya_file(old_file_path, new_file_name, processes=False, progress=progress),
+                               done, "Failed to rename file")
 
     def delete_maya_file(self, file_name):
         department_assets_path = os.path.join(BASE_DIRECTORY_PATH, COMPANY_NAME, "Department Assets")
@@ -408,25 +710,18 @@ class DepartmentAssetsWindow(QMainWindow, CenteredWindowMixin):
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.Yes:
             try:
-                os.remove(file_path)
+                pmt_operations.delete_maya_file(file_path)
                 QMessageBox.information(self, "File Deleted", f"Deleted file '{file_name}'")
-                self.initUI()  # Refresh the UI after successful deletion
+                self.refresh()  # Refresh the UI after successful deletion
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to delete file: {e}")
 
-    def go_back(self):
-        if self.parent:
-            self.parent.show()
-        self.close()
-
     def create_maya_file(self):
         department_assets_path = os.path.join(BASE_DIRECTORY_PATH, COMPANY_NAME, "Department Assets")
         file_name, ok = QInputDialog.getText(self, 'Create Maya File', 'Enter Maya file name:')
         if ok and file_name:
-            file_path = os.path.join(department_assets_path, file_name + '.ma')
             try:
-                with open(file_path, 'w') as file:
-                    file.write("//Maya ASCII 2023 scene\n")  # Header for a basic Maya ASCII file
+                file_path = pmt_operations.create_maya_file(department_assets_path, file_name)
                 QMessageBox.information(self, "File Creation", f"Created Maya file: {file_name}")
                 self.open_maya_file_and_exit(file_path)  # Open the new Maya file and exit the application
             except Exception as e:
@@ -443,28 +738,24 @@ class DepartmentAssetsWindow(QMainWindow, CenteredWindowMixin):
     def copy_maya_file(self, file_name):
         department_assets_path = os.path.join(BASE_DIRECTORY_PATH, COMPANY_NAME, "Department Assets")
         source_file_path = os.path.join(department_assets_path, file_name)
-        self.project_selection_window = ProjectSelectionWindow(os.path.join(BASE_DIRECTORY_PATH, COMPANY_NAME, "PMT Projects"),
-                                                               copy_source_path=source_file_path,
-                                                               previous_window=self)
-        self.project_selection_window.show()
-        self.close()
-
-class ProjectSelectionWindow(QWidget, CenteredWindowMixin):
-    def __init__(self, projects_path, previous_window=None, copy_source_path=None):
-        super().__init__()
+        self.navigator.push(ProjectSelectionWindow, projects_path=os.path.join(BASE_DIRECTORY_PATH, COMPANY_NAME, "PMT Projects"),
+                            copy_source_path=source_file_path)
+
+class ProjectSelectionWindow(Screen):
+    def __init__(self, navigator, projects_path, copy_source_path=None):
+        super().__init__(navigator)
         self.setWindowTitle('Select Project')
-        self.setGeometry(100, 100, 400, 300)
         self.projects_path = projects_path
-        self.previous_window = previous_window
         self.copy_source_path = copy_source_path
+        self.listed_projects = None
         self.initUI()
+        self.refresh()
         self.create_project_assets_folder()
-        self.center_window()
 
     def create_project_assets_folder(self):
         project_assets_path = os.path.join(self.projects_path, 'Project Assets')
         tools_folder_path = os.path.join(project_assets_path, 'Tools')
-        department_tools_path = os.path.join('C:/Autodesk/Autodesk_Maya_2024_1_Update_Windows_64bit_dlm', 'Company name', 'Department Assets', 'Tools')
+        department_tools_path = os.path.join(DEPARTMENT_ASSETS_PATH, 'Tools')
 
         if not os.path.exists(project_assets_path):
             os.makedirs(project_assets_path)
@@ -475,22 +766,43 @@ class ProjectSelectionWindow(QWidget, CenteredWindowMixin):
         if not os.path.exists(department_tools_path):
             os.makedirs(department_tools_path)
 
-        # Copy the PMT Export Tool.txt file to the Tools folder within Project Assets
-        source_tool_path = os.path.join(os.path.dirname(__file__), 'PMT Export Tool.txt')
-        destination_tool_path_project = os.path.join(tools_folder_path, 'PMT Export Tool.txt')
-        destination_tool_path_department = os.path.join(department_tools_path, 'PMT Export Tool.txt')
-        
+        # Keep the PMT Export Tool.txt copies in both Tools folders current; only changed copies are written
         try:
-            shutil.copy(source_tool_path, destination_tool_path_project)
-            shutil.copy(source_tool_path, destination_tool_path_department)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to copy export tool: {e}")
+            summary = pmt_tools.deploy_tools([tools_folder_path, department_tools_path])
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to read the export tool: {e}")
+            return
+        for path, error in summary['failed']:
+            QMessageBox.critical(self, "Error", f"Failed to copy export tool to {path}: {error}")
 
     def initUI(self):
         layout = QVBoxLayout()
-        project_dirs = [d for d in os.listdir(self.projects_path) 
-                        if os.path.isdir(os.path.join(self.projects_path, d)) 
-                        and d not in ['Project Assets', 'Tools']]
+
+        # Project rows are filled in by refresh()
+        self.projects_layout = QVBoxLayout()
+        layout.addLayout(self.projects_layout)
+
+        spacer_item = QSpacerItem(20, 40, QSizePolicy.Minimum, QSizePolicy.Expanding)
+        layout.addItem(spacer_item)
+
+        assets_button = QPushButton('Project Assets')
+        assets_button.setFixedSize(120, 30)
+        assets_button.clicked.connect(self.project_assets_button_clicked)
+        layout.addWidget(assets_button)
+
+        back_button = QPushButton('Back')
+        back_button.setFixedSize(60, 30)
+        back_button.clicked.connect(self.go_back)
+        layout.addWidget(back_button)
+
+        self.setLayout(layout)
+
+    def refresh(self):
+        project_dirs = pmt_operations.list_projects(self.projects_path)
+        if project_dirs == self.listed_projects:
+            return
+        self.listed_projects = project_dirs
+        clear_layout(self.projects_layout)
 
         for project in project_dirs:
             vbox = QVBoxLayout()
@@ -510,24 +822,14 @@ class ProjectSelectionWindow(QWidget, CenteredWindowMixin):
             delete_button.clicked.connect(lambda _, p=project: self.delete_project(p))
             hbox.addWidget(delete_button)
 
-            vbox.addLayout(hbox)
-
-            layout.addLayout(vbox)
+            archive_button = QPushButton('Archive')
+            archive_button.setFixedSize(80, 30)
+            archive_button.clicked.connect(lambda _, p=project: self.archive_project(p))
+            hbox.addWidget(archive_button)
 
-        spacer_item = QSpacerItem(20, 40, QSizePolicy.Minimum, QSizePolicy.Expanding)
-        layout.addItem(spacer_item)
-
-        assets_button = QPushButton('Project Assets')
-        assets_button.setFixedSize(120, 30)
-        assets_button.clicked.connect(self.project_assets_button_clicked)
-        layout.addWidget(assets_button)
-
-        back_button = QPushButton('Back')
-        back_button.setFixedSize(60, 30)
-        back_button.clicked.connect(self.go_back)
-        layout.addWidget(back_button)
+            vbox.addLayout(hbox)
 
-        self.setLayout(layout)
+            self.projects_layout.addLayout(vbox)
 
     def project_button_clicked(self):
         sender = self.sender()
@@ -536,22 +838,19 @@ class ProjectSelectionWindow(QWidget, CenteredWindowMixin):
         if self.copy_source_path:
             self.copy_maya_file_to_project(project_path)
         else:
-            self.maya_file_options_window = MayaFileOptionsWindow(project_path, previous_window=self)
-            self.maya_file_options_window.show()
-            self.close()
+            self.navigator.push(MayaFileOptionsWindow, project_path=project_path)
 
     def rename_project(self, project):
         old_project_path = os.path.join(self.projects_path, project)
         new_project_name, ok = QInputDialog.getText(self, 'Rename Project', 'Enter new project name:', text=project)
         if ok and new_project_name:
-            new_project_path = os.path.join(self.projects_path, new_project_name)
-            try:
-                os.rename(old_project_path, new_project_path)
+            def done(new_project_path):
                 QMessageBox.information(self, "Project Renamed", f"Renamed project to {new_project_name}")
-                self.previous_window.show()
-                self.close()
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to rename project: {e}")
+                self.go_back()
+
+            self.run_operation(f"Renaming project '{project}'...",
+                               lambda progress: pmt_operations.rename_project(old_project_path, new_project_name, processes=False, progress=progress),
+                               done, "Failed to rename project")
 
     def delete_project(self, project):
         project_path = os.path.join(self.projects_path, project)
@@ -559,15 +858,29 @@ class ProjectSelectionWindow(QWidget, CenteredWindowMixin):
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.Yes:
             try:
-                shutil.rmtree(project_path)
+                pmt_operations.delete_project(project_path)
                 QMessageBox.information(self, "Project Deleted", f"Deleted project '{project}'")
                 self.go_back()
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to delete project: {e}")
 
+    def archive_project(self, project):
+        project_path = os.path.join(self.projects_path, project)
+        reply = QMessageBox.question(self, 'Archive Project', f"Archive the project '{project}' and remove it from 'PMT Projects'?",
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            def done(summary):
+                QMessageBox.information(self, "Project Archived", f"Archived project '{project}' to {summary['archive_path']} "
+                                        f"({summary['compressed_size'] // (1024 * 1024)} MB)")
+                self.go_back()
+
+            self.run_operation(f"Archiving project '{project}'...",
+                               lambda progress: pmt_operations.archive_project(project_path, remove=True, progress=progress),
+                               done, "Failed to archive project")
+
     def copy_maya_file_to_project(self, project_path):
         source_folder = os.path.join(project_path, 'Source')
-        subfolders = [f for f in os.listdir(source_folder) if os.path.isdir(os.path.join(source_folder, f))]
+        subfolders = pmt_metadata.list_subfolders(source_folder)
         if not subfolders:
             QMessageBox.warning(self, "No Subfolders", "There are no subfolders in the 'Source' folder of this project.")
             return
@@ -582,12 +895,10 @@ class ProjectSelectionWindow(QWidget, CenteredWindowMixin):
 
         if dialog.exec_():
             selected_subfolder = dialog.textValue()
-            destination_path = os.path.join(source_folder, selected_subfolder, os.path.basename(self.copy_source_path))
             try:
-                shutil.copy(self.copy_source_path, destination_path)
+                pmt_operations.copy_maya_file(self.copy_source_path, os.path.join(source_folder, selected_subfolder))
                 QMessageBox.information(self, "File Copied", "Maya file copied to subfolder successfully!")
-                self.close()
-                self.previous_window.show()
+                self.go_back()
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to copy Maya file to subfolder: {e}")
 
@@ -596,35 +907,50 @@ class ProjectSelectionWindow(QWidget, CenteredWindowMixin):
 
         if self.copy_source_path:
             try:
-                shutil.copy(self.copy_source_path, project_assets_path)
+                pmt_operations.copy_maya_file(self.copy_source_path, project_assets_path)
                 QMessageBox.information(self, "File Copied", "Maya file copied to Project Assets folder successfully!")
                 self.go_back()  # Go back to the previous window after copying the file
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to copy Maya file to Project Assets folder: {e}")
         else:
-            self.project_assets_window = ProjectAssetsWindow(project_assets_path, self)
-            self.project_assets_window.show()
-            self.close()
+            self.navigator.push(ProjectAssetsWindow, project_assets_path=project_assets_path)
 
-    def go_back(self):
-        self.previous_window.show()
-        self.close()
-
-class ProjectAssetsWindow(QWidget, CenteredWindowMixin):
-    def __init__(self, project_assets_path, previous_window=None):
-        super().__init__()
+class ProjectAssetsWindow(Screen):
+    def __init__(self, navigator, project_assets_path):
+        super().__init__(navigator)
         self.setWindowTitle('Project Assets')
-        self.setGeometry(100, 100, 400, 300)
         self.project_assets_path = project_assets_path
-        self.previous_window = previous_window  # Reference to the previous window
+        self.listed_files = None
         self.initUI()
-        self.center_window()
+        self.refresh()
 
     def initUI(self):
         layout = QVBoxLayout()
 
+        # Maya file rows are filled in by refresh()
+        self.files_layout = QVBoxLayout()
+        layout.addLayout(self.files_layout)
+
+        # Create Maya File button
+        create_button = QPushButton('Create Maya File')
+        create_button.setFixedSize(120, 30)
+        create_button.clicked.connect(self.create_maya_file)
+        layout.addWidget(create_button)
+
+        back_button = QPushButton('Back')
+        back_button.setFixedSize(60, 30)
+        back_button.clicked.connect(self.go_back)
+        layout.addWidget(back_button)
+
+        self.setLayout(layout)
+
+    def refresh(self):
         # List Maya files in the Project Assets folder
-        maya_files = [f for f in os.listdir(self.project_assets_path) if f.endswith('.ma') or f.endswith('.mb')]
+        maya_files = [f for f in pmt_metadata.list_files(self.project_assets_path) if f.endswith('.ma') or f.endswith('.mb')]
+        if maya_files == self.listed_files:
+            return
+        self.listed_files = maya_files
+        clear_layout(self.files_layout)
 
         for file in maya_files:
             file_layout = QVBoxLayout()
@@ -652,22 +978,7 @@ class ProjectAssetsWindow(QWidget, CenteredWindowMixin):
 
             file_layout.addLayout(button_layout)
 
-            layout.addLayout(file_layout)
-
-        # Create Maya File button
-        create_button = QPushButton('Create Maya File')
-        create_button.setFixedSize(120, 30)
-        create_button.clicked.connect(self.create_maya_file)
-        layout.addWidget(create_button)
-
-        back_button = QPushButton('Back')
-        back_button.setFixedSize(60, 30)
-        back_button.clicked.connect(self.go_back)
-        layout.addWidget(back_button)
-
-        container = QWidget()
-        container.setLayout(layout)
-        self.setLayout(layout)
+            self.files_layout.addLayout(file_layout)
 
     def open_maya_file(self, file_name):
         file_path = os.path.join(self.project_assets_path, file_name)
@@ -682,13 +993,13 @@ class ProjectAssetsWindow(QWidget, CenteredWindowMixin):
         old_file_path = os.path.join(self.project_assets_path, file_name)
         new_file_name, ok = QInputDialog.getText(self, 'Rename Maya File', 'Enter new file name:', text=file_name)
         if ok and new_file_name:
-            new_file_path = os.path.join(self.project_assets_path, new_file_name)
-            try:
-                os.rename(old_file_path, new_file_path)
+            def done(new_file_path):
                 QMessageBox.information(self, "File Renamed", f"Renamed file to {new_file_name}")
                 self.go_back()  # Go back to the previous window after renaming the file
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to rename file: {e}")
+
+            self.run_operation(f"Renaming {file_name}...",
+                               lambda progress: pmt_operations.rename_maya_file(old_file_path, new_file_name, processes=False, progress=progress),
+                               done, "Failed to rename file")
 
     def delete_maya_file(self, file_name):
         file_path = os.path.join(self.project_assets_path, file_name)
@@ -696,24 +1007,17 @@ class ProjectAssetsWindow(QWidget, CenteredWindowMixin):
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.Yes:
             try:
-                os.remove(file_path)
+                pmt_operations.delete_maya_file(file_path)
                 QMessageBox.information(self, "File Deleted", f"Deleted file '{file_name}'")
                 self.go_back()  # Go back to the previous window after successful deletion
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to delete file: {e}")
 
-    def go_back(self):
-        if self.previous_window:
-            self.previous_window.show()
-        self.close()
-
     def create_maya_file(self):
         file_name, ok = QInputDialog.getText(self, 'Create Maya File', 'Enter Maya file name:')
         if ok and file_name:
-            file_path = os.path.join(self.project_assets_path, file_name + '.ma')
             try:
-                with open(file_path, 'w') as file:
-                    file.write("//Maya ASCII 2024 scene\n")  # Header for a basic Maya ASCII file
+                file_path = pmt_operations.create_maya_file(self.project_assets_path, file_name, "//Maya ASCII 2024 scene\n")
                 QMessageBox.information(self, "File Creation", f"Created Maya file: {file_name}")
                 self.open_maya_file_and_exit(file_path)  # Open the new Maya file and exit the application
             except Exception as e:
@@ -728,23 +1032,15 @@ class ProjectAssetsWindow(QWidget, CenteredWindowMixin):
             QMessageBox.critical(self, "Error", f"Failed to open Maya file: {e}")
 
     def copy_maya_file(self, file_name):
-        # Hardcoded path to the Maya files
-        source_file_path = os.path.join("C:/Autodesk/Autodesk_Maya_2024_1_Update_Windows_64bit_dlm/Company name/PMT Projects/Project Assets", file_name)
-        self.project_selection_window = ProjectSelectionWindow(os.path.join("C:/Autodesk/Autodesk_Maya_2024_1_Update_Windows_64bit_dlm/Company name", "PMT Projects"),
-                                                               copy_source_path=source_file_path,
-                                                               previous_window=self)
-        self.project_selection_window.show()
-        self.close()
-
-class MayaFileOptionsWindow(QWidget, CenteredWindowMixin):
-    def __init__(self, project_path, previous_window=None):
-        super().__init__()
+        source_file_path = os.path.join(self.project_assets_path, file_name)
+        self.navigator.push(ProjectSelectionWindow, projects_path=PMT_PROJECTS_PATH, copy_source_path=source_file_path)
+
+class MayaFileOptionsWindow(Screen):
+    def __init__(self, navigator, project_path):
+        super().__init__(navigator)
         self.setWindowTitle('Maya File Options')
-        self.setGeometry(150, 150, 400, 200)
         self.project_path = project_path
-        self.previous_window = previous_window  # Reference to the previous window
         self.initUI()
-        self.center_window()
 
     def initUI(self):
         layout = QVBoxLayout()
@@ -778,56 +1074,38 @@ class MayaFileOptionsWindow(QWidget, CenteredWindowMixin):
         self.setLayout(layout)
 
     def create_new_maya_file(self):
-        self.folder_selection_window = FolderSelectionWindow(self.project_path, new_file=True, previous_window=self)
-        self.folder_selection_window.show()
-        self.close()  # Close the current window
+        self.navigator.push(FolderSelectionWindow, project_path=self.project_path, new_file=True)
 
     def edit_existing_maya_file(self):
-        self.folder_selection_window = FolderSelectionWindow(self.project_path, new_file=False, previous_window=self)
-        self.folder_selection_window.show()
-        self.close()  # Close the current window
+        self.navigator.push(FolderSelectionWindow, project_path=self.project_path)
 
     def delete_maya_file(self):
-        self.folder_selection_window = FolderSelectionWindow(self.project_path, delete_file=True, previous_window=self)
-        self.folder_selection_window.show()
-        self.close()  # Close the current window
+        self.navigator.push(FolderSelectionWindow, project_path=self.project_path, delete_file=True)
 
     def rename_maya_file(self):
-        self.folder_selection_window = FolderSelectionWindow(self.project_path, rename_file=True, previous_window=self)
-        self.folder_selection_window.show()
-        self.close()  # Close the current window
+        self.navigator.push(FolderSelectionWindow, project_path=self.project_path, rename_file=True)
 
     def copy_maya_file(self):
-        self.source_file_selection_window = SourceFileSelectionWindow(self.project_path, previous_window=self)
-        self.source_file_selection_window.show()
-        self.close()  # Close the current window
+        self.navigator.push(SourceFileSelectionWindow, project_path=self.project_path)
 
-    def go_back(self):
-        self.previous_window.show()
-        self.close()
-
-class FolderSelectionWindow(QWidget, CenteredWindowMixin):
-    def __init__(self, project_path, new_file=False, delete_file=False, rename_file=False, previous_window=None):
-        super().__init__()
+class FolderSelectionWindow(Screen):
+    def __init__(self, navigator, project_path, new_file=False, delete_file=False, rename_file=False):
+        super().__init__(navigator)
         self.setWindowTitle('Select Folder')
-        self.setGeometry(200, 200, 400, 200)
         self.project_path = project_path
         self.new_file = new_file
         self.delete_file = delete_file
         self.rename_file = rename_file  # Add rename_file parameter
-        self.previous_window = previous_window  # Reference to the previous window
+        self.listed_folders = None
         self.initUI()
-        self.center_window()
+        self.refresh()
 
     def initUI(self):
         layout = QVBoxLayout()
-        source_folder = os.path.join(self.project_path, 'Source')
-        subfolders = [f for f in os.listdir(source_folder) if os.path.isdir(os.path.join(source_folder, f))]
 
-        for folder in subfolders:
-            button = QPushButton(folder)
-            button.clicked.connect(self.folder_button_clicked)
-            layout.addWidget(button)
+        # Folder buttons are filled in by refresh()
+        self.folders_layout = QVBoxLayout()
+        layout.addLayout(self.folders_layout)
 
         back_button = QPushButton('Back')
         back_button.setFixedSize(60, 30)  # Set smaller size for the Back button
@@ -836,49 +1114,40 @@ class FolderSelectionWindow(QWidget, CenteredWindowMixin):
 
         self.setLayout(layout)
 
+    def refresh(self):
+        source_folder = os.path.join(self.project_path, 'Source')
+        subfolders = pmt_metadata.list_subfolders(source_folder)
+        if subfolders == self.listed_folders:
+            return
+        self.listed_folders = subfolders
+        clear_layout(self.folders_layout)
+
+        for folder in subfolders:
+            button = QPushButton(folder)
+            button.clicked.connect(self.folder_button_clicked)
+            self.folders_layout.addWidget(button)
+
     # Function to handle button click for selecting a folder
     def folder_button_clicked(self):
         sender = self.sender()
         subfolder_path = os.path.join(self.project_path, 'Source', sender.text())
         if self.rename_file:  # If the user selected "Rename Maya File" option
-            # Open the MayaFileSelectionWindow directly for renaming Maya files
-            self.maya_file_selection_window = MayaFileSelectionWindow(subfolder_path, rename_file=True, previous_window=self.previous_window)
-            self.maya_file_selection_window.show()
-            self.close()  # Close the current window
+            # Open the MayaFileSelectionWindow in place of this one, so Back goes to the file options
+            self.navigator.push(MayaFileSelectionWindow, replace=True, subfolder_path=subfolder_path, rename_file=True)
         else:  # Default behavior for other options
             if self.new_file:
                 try:
                     file_name, ok = QInputDialog.getText(self, 'Maya File Name', 'Enter Maya file name:')
                     if ok and file_name:
-                        file_path = os.path.join(subfolder_path, file_name + '.ma')
-                        with open(file_path, 'w') as file:
-                            file.write("//Maya ASCII 2023 scene\n")  # Header for a basic Maya ASCII file
+                        file_path = pmt_operations.create_maya_file(subfolder_path, file_name)
                         QMessageBox.information(self, "File Creation", f"Created Maya file!")
                         self.open_maya_file_and_exit(file_path)  # Open the new Maya file and exit the application
                 except Exception as e:
                     QMessageBox.critical(self, "Error", f"Failed to create Maya file: {e}")
             elif self.delete_file:
-                self.maya_file_selection_window = MayaFileSelectionWindow(subfolder_path, delete_file=True, previous_window=self)
-                self.maya_file_selection_window.delete_file_button_clicked.connect(self.handle_delete_file)
-                self.maya_file_selection_window.show()
-                self.close()  # Close the current window
+                self.navigator.push(MayaFileSelectionWindow, subfolder_path=subfolder_path, delete_file=True)
             else:
-                self.maya_file_selection_window = MayaFileSelectionWindow(subfolder_path, previous_window=self)
-                self.maya_file_selection_window.show()
-                self.close()  # Close the current window
-
-    def handle_delete_file(self, file_path):
-        try:
-            os.remove(file_path)
-            QMessageBox.information(self, "File Deletion", f"Deleted Maya file!")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to delete Maya file: {e}")
-        #self.go_back()  # Go back to the previous window after deletion
-        self.close()
-
-    def go_back(self):
-        self.previous_window.show()
-        self.close()
+                self.navigator.push(MayaFileSelectionWindow, subfolder_path=subfolder_path)
 
     def open_maya_file_and_exit(self, file_path):
         # Replace this path with the actual path to your Maya executable
@@ -890,15 +1159,12 @@ class FolderSelectionWindow(QWidget, CenteredWindowMixin):
             QMessageBox.critical(self, "Error", f"Failed to open Maya file: {e}")
 
 # Define a window for selecting a source Maya file
-class SourceFileSelectionWindow(QWidget, CenteredWindowMixin):
-    def __init__(self, project_path, previous_window=None):
-        super().__init__()
+class SourceFileSelectionWindow(Screen):
+    def __init__(self, navigator, project_path):
+        super().__init__(navigator)
         self.setWindowTitle('Select Copy')
-        self.setGeometry(300, 300, 400, 200)
         self.project_path = project_path
-        self.previous_window = previous_window  # Reference to the previous window
         self.initUI()
-        self.center_window()
 
     def initUI(self):
         layout = QVBoxLayout()
@@ -920,42 +1186,26 @@ class SourceFileSelectionWindow(QWidget, CenteredWindowMixin):
     def folder_button_clicked(self):
         sender = self.sender()
         subfolder_path = os.path.join(self.project_path, 'Source', sender.text())
-        self.maya_file_selection_window = MayaFileSelectionWindow(subfolder_path, copy_file=True, previous_window=self)
-        self.maya_file_selection_window.show()
-        self.close()  # Close the current window
+        self.navigator.push(MayaFileSelectionWindow, subfolder_path=subfolder_path, copy_file=True)
 
-    # Function to go back to the previous window
-    def go_back(self):
-        self.previous_window.show()
-        self.close()
-
-class MayaFileSelectionWindow(QWidget, CenteredWindowMixin):
-    delete_file_button_clicked = pyqtSignal(str)
-
-    def __init__(self, subfolder_path, delete_file=False, copy_file=False, rename_file=False, previous_window=None):
-        super().__init__()
+class MayaFileSelectionWindow(Screen):
+    def __init__(self, navigator, subfolder_path, delete_file=False, copy_file=False, rename_file=False):
+        super().__init__(navigator)
         self.setWindowTitle('Select Maya File')
-        self.setGeometry(350, 350, 400, 200)
         self.subfolder_path = subfolder_path
         self.delete_file = delete_file
         self.copy_file = copy_file
         self.rename_file = rename_file
-        self.previous_window = previous_window
+        self.listed_files = None
         self.initUI()
-        self.center_window()
+        self.refresh()
 
     def initUI(self):
         layout = QVBoxLayout()
-        maya_files = [f for f in os.listdir(self.subfolder_path) if f.endswith('.ma')]
-
-        for file in maya_files:
-            hbox = QHBoxLayout()
 
-            file_button = QPushButton(file)
-            file_button.clicked.connect(self.file_button_clicked)
-            hbox.addWidget(file_button)
-
-            layout.addLayout(hbox)
+        # File buttons are filled in by refresh()
+        self.files_layout = QVBoxLayout()
+        layout.addLayout(self.files_layout)
 
         back_button = QPushButton('Back')
         back_button.setFixedSize(60, 30)
@@ -964,12 +1214,27 @@ class MayaFileSelectionWindow(QWidget, CenteredWindowMixin):
 
         self.setLayout(layout)
 
+    def refresh(self):
+        maya_files = [f for f in pmt_metadata.list_files(self.subfolder_path) if f.endswith('.ma')]
+        if maya_files == self.listed_files:
+            return
+        self.listed_files = maya_files
+        clear_layout(self.files_layout)
+
+        for file in maya_files:
+            hbox = QHBoxLayout()
+
+            file_button = QPushButton(file)
+            file_button.clicked.connect(self.file_button_clicked)
+            hbox.addWidget(file_button)
+
+            self.files_layout.addLayout(hbox)
+
     def file_button_clicked(self):
         sender = self.sender()
         maya_file_path = os.path.join(self.subfolder_path, sender.text())
         if self.delete_file:
-            self.delete_file_button_clicked.emit(maya_file_path)
-            self.go_back()
+            self.delete_maya_file(maya_file_path)
         elif self.copy_file:
             self.show_copy_options_dialog(maya_file_path)
         elif self.rename_file:
@@ -999,7 +1264,7 @@ class MayaFileSelectionWindow(QWidget, CenteredWindowMixin):
             return
 
         try:
-            shutil.copy(maya_file_path, department_assets_path)
+            pmt_operations.copy_maya_file(maya_file_path, department_assets_path)
             QMessageBox.information(self, "File Copied", "Maya file copied to Department Assets folder successfully!")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to copy Maya file: {e}")
@@ -1009,20 +1274,26 @@ class MayaFileSelectionWindow(QWidget, CenteredWindowMixin):
         if not os.path.exists(projects_path):
             QMessageBox.critical(self, "Error", f"'PMT Projects' folder does not exist!")
             return
-        self.project_selection_window = ProjectSelectionWindow(projects_path, copy_source_path=maya_file_path, previous_window=self.previous_window)
-        self.project_selection_window.show()
-        self.close()
+        self.navigator.push(ProjectSelectionWindow, replace=True, projects_path=projects_path, copy_source_path=maya_file_path)
+
+    def delete_maya_file(self, file_path):
+        try:
+            pmt_operations.delete_maya_file(file_path)
+            QMessageBox.information(self, "File Deletion", f"Deleted Maya file!")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to delete Maya file: {e}")
+        self.refresh()  # Stay on the list so more files can be deleted
 
     def rename_maya_file(self, file_path):
         new_file_name, ok = QInputDialog.getText(self, 'Rename Maya File', 'Enter new Maya file name:', text=os.path.basename(file_path)[:-3])
         if ok and new_file_name:
-            new_file_path = os.path.join(os.path.dirname(file_path), new_file_name + '.ma')
-            try:
-                os.rename(file_path, new_file_path)
+            def done(new_file_path):
                 QMessageBox.information(self, "File Renamed", f"Renamed Maya file to {new_file_name}")
                 self.go_back()  # Go back to the previous window after renaming the file
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to rename Maya file: {e}")
+
+            self.run_operation(f"Renaming {os.path.basename(file_path)}...",
+                               lambda progress: pmt_operations.rename_maya_file(file_path, new_file_name + '.ma', processes=False, progress=progress),
+                               done, "Failed to rename Maya file")
 
     def open_maya_file(self, file_path):
         # Print the file path for debugging
@@ -1036,10 +1307,6 @@ class MayaFileSelectionWindow(QWidget, CenteredWindowMixin):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to open Maya file: {e}")
 
-    def go_back(self):
-        self.previous_window.show()
-        self.close()
-
 if __name__ == "__main__":
     window = MainWindow()
     window.show()
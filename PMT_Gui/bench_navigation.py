@@ -0,0 +1,120 @@
+# Navigation soak test: push/back through the PMT screens many times and check memory and widget count.
+#   python bench_navigation.py [steps]
+# Runs headless against a throwaway company tree. With screen caching the widget count levels off after
+# the first few hundred steps instead of growing with every window opened; the run fails (exit code 1)
+# if widgets or RSS keep growing after the warm-up. tests/test_navigation.py runs it as part of the tests.
+import os
+import sys
+import random
+import shutil
+import tempfile
+
+# Steps before the baseline is taken: by then every kind of screen has been built and cached
+WARMUP_STEPS = 500
+# Widgets may exceed the warm-up peak by this factor (a different mix of screens can be cached), but not grow with steps
+MAX_WIDGET_GROWTH = 1.25
+MAX_RSS_GROWTH_MB = 10.0
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+TEMP_ROOT = tempfile.mkdtemp(prefix="pmt_bench_")
+os.environ["PMT_BASE_DIRECTORY"] = TEMP_ROOT
+
+from pmt_config import DEPARTMENT_ASSETS_PATH, PMT_PROJECTS_PATH
+
+# Company tree with a few projects and Maya files to list
+for folder in [DEPARTMENT_ASSETS_PATH, os.path.join(PMT_PROJECTS_PATH, "Project Assets")]:
+    os.makedirs(folder, exist_ok=True)
+    for i in range(5):
+        with open(os.path.join(folder, f"asset_{i}.ma"), "w") as maya_file:
+            maya_file.write("//Maya ASCII 2024 scene\n")
+for p in range(3):
+    for category in ["Characters", "Environments", "Props"]:
+        folder = os.path.join(PMT_PROJECTS_PATH, f"Project {p}", "Source", category)
+        os.makedirs(folder, exist_ok=True)
+        for i in range(5):
+            with open(os.path.join(folder, f"{category.lower()}_{i}.ma"), "w") as maya_file:
+                maya_file.write("//Maya ASCII 2024 scene\n")
+
+from PyQt5.QtCore import QEvent
+from PyQt5.QtWidgets import QApplication
+import PMT_Gui
+
+
+def memory_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def random_screen(rng):
+    project_path = os.path.join(PMT_PROJECTS_PATH, f"Project {rng.randrange(3)}")
+    category = rng.choice(["Characters", "Environments", "Props"])
+    return rng.choice([
+        (PMT_Gui.DepartmentAssetsWindow, {}),
+        (PMT_Gui.ProjectSelectionWindow, {"projects_path": PMT_PROJECTS_PATH}),
+        (PMT_Gui.ProjectAssetsWindow, {"project_assets_path": os.path.join(PMT_PROJECTS_PATH, "Project Assets")}),
+        (PMT_Gui.MayaFileOptionsWindow, {"project_path": project_path}),
+        (PMT_Gui.FolderSelectionWindow, {"project_path": project_path}),
+        (PMT_Gui.MayaFileSelectionWindow, {"subfolder_path": os.path.join(project_path, "Source", category)}),
+    ])
+
+
+def run(steps=10000, report_every=1000):
+    # Returns [(step, rss MB, widgets)] sampled every 100 steps
+    rng = random.Random(1)
+    navigator = PMT_Gui.NavigationController()
+    home_screen = PMT_Gui.Screen(navigator)
+    home_screen.setWindowTitle("Main Menu")
+    navigator.set_home(home_screen)
+    navigator.show()
+
+    samples = []
+    print(f"{'step':>6} {'rss MB':>8} {'widgets':>8} {'cached':>7} {'depth':>6}")
+    for step in range(1, steps + 1):
+        # Mostly go deeper, sometimes back up, like a user browsing projects
+        if len(navigator.history) > 1 and rng.random() < 0.45:
+            navigator.back()
+        else:
+            screen_class, kwargs = random_screen(rng)
+            navigator.push(screen_class, **kwargs)
+        QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+        QApplication.processEvents()
+        if step % 100 == 0:
+            samples.append((step, memory_mb(), len(QApplication.allWidgets())))
+        if step % report_every == 0 or step == 1:
+            print(f"{step:>6} {memory_mb():>8.1f} {len(QApplication.allWidgets()):>8} "
+                  f"{len(navigator.screens):>7} {len(navigator.history):>6}")
+    return samples
+
+
+def check(samples, warmup_steps=WARMUP_STEPS):
+    # Problems found in the samples after the warm-up, empty if memory and widgets stayed flat
+    warmup = [s for s in samples if s[0] <= warmup_steps]
+    after = [s for s in samples if s[0] > warmup_steps]
+    if not warmup or not after:
+        return [f"Need more than {warmup_steps} steps to compare against the warm-up"]
+    problems = []
+    widget_limit = int(max(s[2] for s in warmup) * MAX_WIDGET_GROWTH)
+    widget_peak = max(s[2] for s in after)
+    if widget_peak > widget_limit:
+        problems.append(f"Widget count grew to {widget_peak} (limit {widget_limit})")
+    rss_growth = max(s[1] for s in after) - warmup[-1][1]
+    if rss_growth > MAX_RSS_GROWTH_MB:
+        problems.append(f"RSS grew by {rss_growth:.1f} MB after the warm-up (limit {MAX_RSS_GROWTH_MB} MB)")
+    return problems
+
+
+if __name__ == "__main__":
+    try:
+        problems = check(run(int(sys.argv[1]) if len(sys.argv) > 1 else 10000))
+    finally:
+        shutil.rmtree(TEMP_ROOT, ignore_errors=True)
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if not problems:
+        print("OK: memory and widget count stayed flat")
+    sys.exit(1 if problems else 0)
+
@@ -0,0 +1,527 @@
+# Command line entry point for PMT operations that don't need the GUI
+# Usage: python pmt.py <command> [options]
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+import pmt_archive
+import pmt_checksums
+import pmt_disk_usage
+import pmt_export_queue
+import pmt_journal
+import pmt_metadata
+import pmt_operations
+import pmt_references
+import pmt_service
+import pmt_temp_janitor
+import pmt_templates
+import pmt_tools
+import pmt_unreal_import
+import pmt_validate
+import pmt_versions
+from pmt_config import COMPANY_PATH, PMT_PROJECTS_PATH, ARCHIVED_PROJECTS_PATH
+
+
+def resolve_project(project):
+    # Accept either a project name inside "PMT Projects" or a full path
+    if os.path.isdir(project):
+        return os.path.abspath(project)
+    return os.path.join(PMT_PROJECTS_PATH, project)
+
+
+def cmd_archive(args):
+    project_path = resolve_project(args.project)
+    project_name = os.path.basename(os.path.normpath(project_path))
+    archive_path = os.path.join(args.output, project_name + pmt_archive.ARCHIVE_EXTENSION)
+
+    def progress(done, total, name):
+        print(f"[{done}/{total}] {name}")
+
+    summary = pmt_operations.archive_project(project_path, args.output, remove=args.remove, overwrite=args.force,
+                                             level=args.level, workers=args.workers, progress=progress if args.verbose else None)
+    ratio = summary["compressed_size"] / summary["original_size"] if summary["original_size"] else 0
+    print(f"Archived '{project_name}' to {archive_path} "
+          f"({summary['original_size']} -> {summary['compressed_size']} bytes, {ratio:.1%})")
+
+    if args.remove:
+        print(f"Removed project folder {project_path}")
+    return 0
+
+
+def cmd_restore(args):
+    if args.file:
+        with pmt_journal.operation("extract_file", args.archive, args.dest, member=args.file):
+            target = pmt_archive.extract_file(args.archive, args.file, args.dest)
+        print(f"Extracted {args.file} to {target}")
+    else:
+        summary = pmt_operations.restore_project(args.archive, args.dest)
+        print(f"Restored {summary['entries']} entries from {args.archive} to {summary['project_path']}")
+    return 0
+
+
+def cmd_verify(args):
+    roots = [os.path.join(resolve_project(p), "Exported") for p in args.projects] or [PMT_PROJECTS_PATH]
+    service = pmt_checksums.ChecksumService(workers=args.workers)
+    problems = 0
+    try:
+        for root in roots:
+            for path, status, detail in service.verify(root, full=args.full, update=args.update):
+                if status in (pmt_checksums.STATUS_OK, pmt_checksums.STATUS_SKIPPED) and not args.verbose:
+                    continue
+                if status not in (pmt_checksums.STATUS_OK, pmt_checksums.STATUS_SKIPPED, pmt_checksums.STATUS_UNTRACKED):
+                    problems += 1
+                print(f"{status:>9}  {path}" + (f" ({detail})" if detail else ""))
+    finally:
+        service.shutdown()
+    print(f"{problems} corrupt, stale or missing file(s)")
+    return 1 if problems else 0
+
+
+def cmd_queue(args):
+    if args.action == "submit":
+        if not args.scene or not args.output:
+            print("Error: 'queue submit' needs --scene and --output")
+            return 1
+        priority = {"low": pmt_export_queue.PRIORITY_LOW, "normal": pmt_export_queue.PRIORITY_NORMAL,
+                    "high": pmt_export_queue.PRIORITY_HIGH}[args.priority]
+        job = pmt_export_queue.submit_job_file(os.path.abspath(args.scene), os.path.abspath(args.output), priority)
+        print(f"Queued export job {job['id']}")
+        return 0
+
+    if args.action == "run":
+        scheduler = pmt_export_queue.ExportScheduler(max_concurrent=args.workers)
+        scheduler.start()
+        print(f"Export scheduler running with {scheduler.max_concurrent} slot(s), Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            scheduler.stop(wait=False)
+        return 0
+
+    status = pmt_export_queue.load_status()
+    counts = status["counts"]
+    print(f"Queued: {counts['queued']}  Running: {counts['running']}  Done: {counts['done']}  Failed: {counts['failed']}")
+    for job in status["jobs"]:
+        ran = f"{job['finished'] - job['started']:.1f}s" if job["finished"] and job["started"] else "-"
+        print(f"{job['state']:>8}  {job['attempts']}x  {ran:>8}  {job['scene']}" + (f"  ({job['error']})" if job["error"] else ""))
+    return 0
+
+
+def cmd_ingest(args):
+    project_path = resolve_project(args.project)
+    if args.commit:
+        imported, failed = pmt_unreal_import.commit_results(project_path)
+        print(f"Recorded {imported} imported asset(s), {failed} failed (failed assets stay in the next manifest)")
+        return 0
+
+    manifest_path, manifest = pmt_unreal_import.write_manifest(project_path, args.batch_size, args.all)
+    print(f"{manifest['asset_count']} asset(s) in {len(manifest['batches'])} batch(es) written to {manifest_path}")
+    if manifest["asset_count"]:
+        script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "unreal_import_manifest.py")
+        print(f'In the Unreal Editor run: py "{script_path}" "{manifest_path}"')
+    return 0
+
+
+def cmd_serve_metadata(args):
+    host, _, port = args.address.rpartition(":")
+    server = pmt_metadata.MetadataServer(root=args.root, address=(host, int(port)), refresh_interval=args.refresh)
+    print(f"PMT metadata service on {args.address}, Ctrl+C to stop")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_usage(args):
+    report = pmt_disk_usage.disk_usage(args.root, top=args.top, duplicates=args.duplicates, full=args.full,
+                                       workers=args.workers)
+    if args.json:
+        print(json.dumps(report, indent=4))
+        return 0
+
+    size = pmt_disk_usage.format_size
+    print(f"{size(report['total'])} in {report['files']} files under {report['root']} "
+          f"({report['listed_folders']} folders listed, {report['cached_folders']} from cache, {report['seconds']:.1f}s)")
+    print("\nProjects:")
+    for name, project in report["projects"].items():
+        print(f"  {size(project['total']):>10}  {name}")
+        for kind in ("Source", "Exported"):
+            for category, category_size in sorted(project[kind].items()):
+                print(f"  {size(category_size):>10}    {kind}/{category}")
+    print("\nLibraries:")
+    for name, library_size in report["libraries"].items():
+        print(f"  {size(library_size):>10}  {name}")
+    if report["other"]:
+        print(f"  {size(report['other']):>10}  (everything else)")
+    print(f"\nLargest {len(report['largest'])} files:")
+    for item in report["largest"]:
+        print(f"  {size(item['size']):>10}  {item['path']}")
+    if args.duplicates:
+        wasted = sum(d["wasted"] for d in report["duplicates"])
+        print(f"\n{len(report['duplicates'])} sets of duplicate files, {size(wasted)} reclaimable:")
+        for duplicate in report["duplicates"]:
+            print(f"  {size(duplicate['size']):>10} x{len(duplicate['paths'])}")
+            for path in duplicate["paths"]:
+                print(f"                {path}")
+    return 0
+
+
+def cmd_janitor(args):
+    if args.log:
+        for record in pmt_temp_janitor.read_log(limit=args.log):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(record["time"]))
+            result = "dry run" if record["dry_run"] else record.get("result", "")
+            print(f"{when}  {record['reason']:>4}  {record['size']:>12}  {result:>8}  {record['path']}")
+        return 0
+
+    policy = pmt_temp_janitor.load_policy()
+    if args.max_age_days is not None:
+        policy["max_age_days"] = args.max_age_days
+    if args.max_mb is not None:
+        policy["max_bytes"] = args.max_mb * 1024 * 1024
+    janitor = pmt_temp_janitor.TempJanitor(policy)
+
+    if args.watch:
+        janitor.start()
+        print(f"Temp janitor running every {policy['interval_minutes']} minute(s), Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            janitor.stop(wait=False)
+        return 0
+
+    records = janitor.run_once(dry_run=args.dry_run)
+    for record in records:
+        print(f"{record['reason']:>4}  {record['size']:>12}  {record['path']}" + (f"  ({record['result']})" if "result" in record else ""))
+    total = sum(r["size"] for r in records)
+    print(f"{'Would remove' if args.dry_run else 'Removed'} {len(records)} file(s), {total} bytes")
+    return 0
+
+
+def cmd_validate(args):
+    scenes = []
+    for target in args.targets:
+        if target.lower().endswith(".ma") and os.path.isfile(target):
+            scenes.append(os.path.abspath(target))
+        else:
+            scenes.extend(pmt_validate.find_scenes(resolve_project(target)))
+    started = time.time()
+    report = pmt_validate.SceneValidator(workers=args.workers).validate(scenes, use_cache=not args.no_cache)
+    if args.json:
+        print(json.dumps(report, indent=4))
+    else:
+        for scene, issues in report.items():
+            if issues:
+                print(scene)
+            for item in issues:
+                print(f"  {item['severity']:>7}  line {item['line']:<6} {item['message']}")
+    failed = sum(1 for issues in report.values() if pmt_validate.has_errors(issues))
+    print(f"{len(scenes)} scene(s) checked in {time.time() - started:.1f}s, {failed} with errors")
+    return 1 if failed else 0
+
+
+def cmd_history(args):
+    store = pmt_versions.default_store
+    path = os.path.abspath(args.file)
+    if args.snapshot:
+        entry = store.snapshot(path, "manual", note=args.note)
+        print(f"Recorded version {entry['version']}" if entry else "File matches the latest version, nothing recorded")
+        return 0
+    if args.restore is not None:
+        with pmt_journal.operation("restore_version", path, args.output, version=args.restore):
+            output = store.restore(path, args.restore, os.path.abspath(args.output) if args.output else None)
+        print(f"Restored version {args.restore} to {output}")
+        return 0
+
+    versions = store.versions(path)
+    if not versions:
+        print(f"No history for {path}")
+        return 0
+    for entry in versions:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["time"]))
+        print(f"{entry['version']:>4}  {when}  {entry['size']:>12}  {entry['action']:<9}  {entry['user']}"
+              + (f"  {entry['note']}" if entry.get("note") else ""))
+    return 0
+
+
+def cmd_create(args):
+    if args.list:
+        pmt_templates.ensure_default_template()
+        for template in pmt_templates.list_templates():
+            description = pmt_templates.load_manifest(os.path.join(pmt_templates.PROJECT_TEMPLATES_PATH, template)).get("description", "")
+            print(f"{template:<24} {description}")
+        return 0
+    if not args.project:
+        print("Error: 'create' needs a project name")
+        return 1
+
+    summary = pmt_operations.create_project(args.project, args.template, mode=args.mode, workers=args.workers)
+    for warning in summary["warnings"]:
+        print(f"Warning: {warning}")
+    print(f"Created {summary['project_path']} from '{summary['template']}' in {summary['seconds']:.2f}s "
+          f"({summary['reflinked']} reflinked, {summary['hardlinked']} hardlinked, {summary['copied']} copied)")
+    return 0
+
+
+def cmd_rename(args):
+    if os.path.isdir(args.old) or not os.path.exists(args.old):
+        old_path = resolve_project(args.old)
+    else:
+        old_path = os.path.abspath(args.old)
+    new_path = os.path.join(os.path.dirname(old_path), args.new_name)
+    started = time.time()
+    if args.dry_run:
+        found = pmt_references.ReferenceRewriter(workers=args.workers).find(old_path, new_path)
+        for scene, count in found:
+            print(f"{count:>6}  {scene}")
+        print(f"{len(found)} scene(s) reference {old_path} ({time.time() - started:.1f}s)")
+        return 0
+    if os.path.isdir(old_path):
+        new_path = pmt_operations.rename_project(old_path, args.new_name)
+    else:
+        new_path = pmt_operations.rename_maya_file(old_path, args.new_name)
+    print(f"Renamed {old_path} to {new_path} in {time.time() - started:.1f}s")
+    return 0
+
+
+def cmd_tools(args):
+    if args.write_shelf:
+        with open(args.write_shelf, "wb") as shelf_file:
+            shelf_file.write(pmt_tools.build_shelf(pmt_tools.read_tool()))
+        print(f"Wrote {args.write_shelf}")
+        return 0
+
+    shelf_folders = pmt_tools.find_shelf_folders(args.documents or None)
+    started = time.time()
+    if args.shelves_only:
+        summary = pmt_tools.deploy_shelves(shelf_folders)
+    else:
+        summary = pmt_tools.deploy_all(shelf_folders)
+    for path in summary["written"]:
+        print(f"Updated {path}")
+    for path, error in summary["failed"]:
+        print(f"Failed  {path}: {error}")
+    print(f"{len(summary['written'])} written, {summary['unchanged']} already current, {len(summary['failed'])} failed "
+          f"({len(shelf_folders)} Maya shelves folder(s), {time.time() - started:.2f}s)")
+    return 1 if summary["failed"] else 0
+
+
+def parse_when(value):
+    # "7d", "12h" and "30m" count back from now; anything else is a date or date and time
+    if value is None:
+        return None
+    units = {"d": 86400, "h": 3600, "m": 60}
+    if value[-1:] in units and value[:-1].replace(".", "", 1).isdigit():
+        return time.time() - float(value[:-1]) * units[value[-1]]
+    for pattern in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return time.mktime(time.strptime(value, pattern))
+        except ValueError:
+            continue
+    raise ValueError(f"Can't read the time '{value}' (use e.g. 7d, 12h, 2024-05-01 or '2024-05-01 14:30')")
+
+
+def cmd_journal(args):
+    if args.compact:
+        removed = pmt_journal.compact()
+        print(f"Merged away {removed} journal segment(s)")
+        return 0
+    path = args.path
+    if args.project:
+        path = f"PMT Projects/{args.project}"
+    started = time.time()
+    events = pmt_journal.query(since=parse_when(args.since), until=parse_when(args.until), path=path, op=args.op,
+                               user=args.user, limit=args.limit)
+    if args.json:
+        print(json.dumps(events, indent=4))
+        return 0
+    for event in events:
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(event["t"]))
+        target = f"{event['path']} -> {event['dest']}" if event.get("dest") else event["path"]
+        status = "" if event.get("ok", True) else f"  FAILED: {event.get('error')}"
+        print(f"{when}  {event['user']:<12} {event['op']:<16} {target}{status}")
+    print(f"{len(events)} event(s) in {time.time() - started:.2f}s")
+    return 0
+
+
+def cmd_serve(args):
+    host, _, port = args.address.rpartition(":")
+    server = pmt_service.ServiceServer(address=(host, int(port)), root=args.root, max_concurrent=args.max_concurrent)
+    print(f"PMT service on http://{args.address}/rpc, Ctrl+C to stop")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_rpc(args):
+    host, _, port = args.address.rpartition(":")
+    client = pmt_service.ServiceClient(address=(host, int(port)))
+    params = json.loads(args.params) if args.params else {}
+
+    def progress(done, total, name):
+        print(f"[{done}/{total}] {name}")
+
+    try:
+        result = client.call(args.method, progress=progress if args.progress else None, **params)
+    except pmt_service.ServiceError as e:
+        print(f"Error {e.code}: {e}")
+        return 1
+    print(json.dumps(result, indent=4))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="pmt", description="PMT project management tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    archive_parser = subparsers.add_parser("archive", help="Compress a project into a .tar.zst archive")
+    archive_parser.add_argument("project", help="Project name in 'PMT Projects' or a path to a project folder")
+    archive_parser.add_argument("--output", default=ARCHIVED_PROJECTS_PATH, help="Folder to write the archive to")
+    archive_parser.add_argument("--level", type=int, default=pmt_archive.DEFAULT_LEVEL, help="zstd compression level")
+    archive_parser.add_argument("--workers", type=int, default=None, help="Number of files compressed at once")
+    archive_parser.add_argument("--remove", action="store_true", help="Delete the project folder after archiving")
+    archive_parser.add_argument("--force", action="store_true", help="Overwrite an existing archive")
+    archive_parser.add_argument("-v", "--verbose", action="store_true", help="Print each archived file")
+    archive_parser.set_defaults(func=cmd_archive)
+
+    restore_parser = subparsers.add_parser("restore", help="Restore a project (or one file) from an archive")
+    restore_parser.add_argument("archive", help="Path to a .tar.zst project archive")
+    restore_parser.add_argument("--dest", default=PMT_PROJECTS_PATH, help="Folder to restore into")
+    restore_parser.add_argument("--file", help="Extract only this archive member, e.g. 'MyProject/Source/Props/Prop.ma'")
+    restore_parser.set_defaults(func=cmd_restore)
+
+    verify_parser = subparsers.add_parser("verify", help="Check exported files against their checksum manifests")
+    verify_parser.add_argument("projects", nargs="*", help="Projects to check (default: every project)")
+    verify_parser.add_argument("--full", action="store_true", help="Re-hash files even if size and mtime are unchanged")
+    verify_parser.add_argument("--update", action="store_true", help="Record new and changed files in the manifests")
+    verify_parser.add_argument("--workers", type=int, default=None, help="Number of files hashed at once")
+    verify_parser.add_argument("-v", "--verbose", action="store_true", help="Also list files that passed")
+    verify_parser.set_defaults(func=cmd_verify)
+
+    queue_parser = subparsers.add_parser("queue", help="Show, feed or run the background export queue")
+    queue_parser.add_argument("action", nargs="?", choices=["status", "submit", "run"], default="status")
+    queue_parser.add_argument("--scene", help="Saved Maya scene to export (submit)")
+    queue_parser.add_argument("--output", help="FBX file to write (submit)")
+    queue_parser.add_argument("--priority", choices=["low", "normal", "high"], default="normal")
+    queue_parser.add_argument("--workers", type=int, default=None, help="Exports run at once (run)")
+    queue_parser.set_defaults(func=cmd_queue)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Write an Unreal import manifest of new and changed FBX files")
+    ingest_parser.add_argument("project", help="Project name in 'PMT Projects' or a path to a project folder")
+    ingest_parser.add_argument("--batch-size", type=int, default=pmt_unreal_import.DEFAULT_BATCH_SIZE)
+    ingest_parser.add_argument("--all", action="store_true", help="List every exported FBX, not just changed ones")
+    ingest_parser.add_argument("--commit", action="store_true", help="Record the results of the last Unreal import")
+    ingest_parser.set_defaults(func=cmd_ingest)
+
+    metadata_parser = subparsers.add_parser("serve-metadata", help="Run the shared metadata service for the company folder")
+    metadata_parser.add_argument("--root", default=pmt_metadata.COMPANY_PATH, help="Folder to index")
+    metadata_parser.add_argument("--address", default="{}:{}".format(*pmt_metadata.METADATA_BIND_ADDRESS),
+                                 help="host:port to listen on (default PMT_METADATA_BIND, all interfaces)")
+    metadata_parser.add_argument("--refresh", type=float, default=5.0, help="Seconds between folder re-checks")
+    metadata_parser.set_defaults(func=cmd_serve_metadata)
+
+    usage_parser = subparsers.add_parser("usage", help="Show disk usage per project, category and asset library")
+    usage_parser.add_argument("--root", default=COMPANY_PATH, help="Folder to measure")
+    usage_parser.add_argument("--top", type=int, default=20, help="Number of largest files to list")
+    usage_parser.add_argument("--duplicates", action="store_true", help="Also find duplicate files (size, then sha256)")
+    usage_parser.add_argument("--full", action="store_true", help="Re-list every folder instead of trusting the cache")
+    usage_parser.add_argument("--workers", type=int, default=None, help="Number of folders listed at once")
+    usage_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    usage_parser.set_defaults(func=cmd_usage)
+
+    janitor_parser = subparsers.add_parser("janitor", help="Clean the Temp folders by age and size")
+    janitor_parser.add_argument("--dry-run", action="store_true", help="Only list the files that would be removed")
+    janitor_parser.add_argument("--max-age-days", type=float, default=None, help="Override the policy's maximum age")
+    janitor_parser.add_argument("--max-mb", type=int, default=None, help="Override the policy's size limit per Temp folder (0 for no limit)")
+    janitor_parser.add_argument("--watch", action="store_true", help="Keep running on the policy's interval")
+    janitor_parser.add_argument("--log", type=int, nargs="?", const=50, default=None, help="Show the last N evictions")
+    janitor_parser.set_defaults(func=cmd_janitor)
+
+    validate_parser = subparsers.add_parser("validate", help="Check .ma scenes for problems before exporting")
+    validate_parser.add_argument("targets", nargs="+", help="Project names, project folders or .ma files")
+    validate_parser.add_argument("--workers", type=int, default=None, help="Number of scenes checked at once")
+    validate_parser.add_argument("--no-cache", action="store_true", help="Re-read every scene")
+    validate_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    validate_parser.set_defaults(func=cmd_validate)
+
+    history_parser = subparsers.add_parser("history", help="List, record or restore versions of a Maya file")
+    history_parser.add_argument("file", help="Maya file (it doesn't have to exist any more to restore it)")
+    history_parser.add_argument("--restore", type=int, default=None, help="Version number to restore")
+    history_parser.add_argument("--output", help="Write the restored version here instead of over the file")
+    history_parser.add_argument("--snapshot", action="store_true", help="Record the file's current content as a version")
+    history_parser.add_argument("--note", help="Note stored with --snapshot")
+    history_parser.set_defaults(func=cmd_history)
+
+    create_parser = subparsers.add_parser("create", help="Create a project from a project template")
+    create_parser.add_argument("project", nargs="?", help="Name of the new project")
+    create_parser.add_argument("--template", default=pmt_templates.DEFAULT_TEMPLATE, help="Template folder in 'Project Templates'")
+    create_parser.add_argument("--mode", choices=[pmt_templates.MODE_AUTO, pmt_templates.MODE_REFLINK, pmt_templates.MODE_HARDLINK,
+                                                  pmt_templates.MODE_COPY], default=pmt_templates.MODE_AUTO,
+                               help="How template files are cloned (auto: reflink, then hardlinks for shared files, then copy; "
+                                    "hardlink: link the shared files without trying reflinks)")
+    create_parser.add_argument("--workers", type=int, default=None, help="Number of files copied at once")
+    create_parser.add_argument("--list", action="store_true", help="List the available templates")
+    create_parser.set_defaults(func=cmd_create)
+
+    rename_parser = subparsers.add_parser("rename", help="Rename a project or Maya file and fix the scenes that reference it")
+    rename_parser.add_argument("old", help="Project name in 'PMT Projects', project folder or Maya file")
+    rename_parser.add_argument("new_name", help="New project or file name (with the extension for files)")
+    rename_parser.add_argument("--dry-run", action="store_true", help="Only list the scenes that reference the old path")
+    rename_parser.add_argument("--workers", type=int, default=None, help="Number of scenes searched at once (--dry-run)")
+    rename_parser.set_defaults(func=cmd_rename)
+
+    tools_parser = subparsers.add_parser("tools", help="Update the Maya shelf and every Tools folder's copy of the export tool")
+    tools_parser.add_argument("--shelves-only", action="store_true", help="Only update the Maya shelves")
+    tools_parser.add_argument("--documents", nargs="+", help="Documents folders to look for maya/<version>/prefs/shelves in")
+    tools_parser.add_argument("--write-shelf", metavar="PATH", help="Only write the generated shelf_AutoExport.mel to PATH")
+    tools_parser.set_defaults(func=cmd_tools)
+
+    journal_parser = subparsers.add_parser("journal", help="Show who created, copied, renamed or deleted what")
+    journal_parser.add_argument("--project", help="Only events touching this project")
+    journal_parser.add_argument("--path", help="Only events touching this file or folder (absolute or company-relative)")
+    journal_parser.add_argument("--since", help="Start time: 7d, 12h, 30m, YYYY-MM-DD or 'YYYY-MM-DD HH:MM'")
+    journal_parser.add_argument("--until", help="End time, same forms as --since")
+    journal_parser.add_argument("--op", help="Only this operation, e.g. delete_file or rename_project")
+    journal_parser.add_argument("--user", help="Only events recorded by this user")
+    journal_parser.add_argument("--limit", type=int, default=None, help="Stop after this many events")
+    journal_parser.add_argument("--json", action="store_true", help="Print the events as JSON")
+    journal_parser.add_argument("--compact", action="store_true",
+                                help="Merge the small segments finished runs left behind, then exit")
+    journal_parser.set_defaults(func=cmd_journal)
+
+    serve_parser = subparsers.add_parser("serve", help="Run the JSON-RPC service that lets pipeline tools drive PMT")
+    serve_parser.add_argument("--root", default=COMPANY_PATH, help="Folder that paths in requests are relative to")
+    serve_parser.add_argument("--address", default="{}:{}".format(*pmt_service.SERVICE_ADDRESS),
+                              help="host:port to listen on (use 0.0.0.0 to serve the farm, with PMT_SERVICE_TOKEN set)")
+    serve_parser.add_argument("--max-concurrent", type=int, default=4, help="Operations running at once")
+    serve_parser.set_defaults(func=cmd_serve)
+
+    rpc_parser = subparsers.add_parser("rpc", help="Call a method on a running PMT service")
+    rpc_parser.add_argument("method", help="Method name, e.g. list_projects or archive_project")
+    rpc_parser.add_argument("params", nargs="?", help='Params as a JSON object, e.g. \'{"project_path": "PMT Projects/Demo"}\'')
+    rpc_parser.add_argument("--address", default="{}:{}".format(*pmt_service.SERVICE_ADDRESS), help="host:port of the service")
+    rpc_parser.add_argument("--progress", action="store_true", help="Stream progress while the call runs")
+    rpc_parser.set_defaults(func=cmd_rpc)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, RuntimeError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+# Streaming zstd-compressed tar archives for finished projects
+#
+# Every tar member (header + data + padding) is compressed as its own zstd frame. Concatenated
+# frames are still a valid zstd stream, so "zstd -d project.tar.zst | tar x" works, while the
+# side index (project.tar.zst.idx.json) records where each frame starts so one file can be
+# pulled out without decompressing the rest. Members are compressed in a thread pool and written
+# in order; each worker streams its file through a spooled temp file so nothing is held whole in memory.
+import os
+import json
+import shutil
+import tarfile
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_EXTENSION = ".tar.zst"
+INDEX_EXTENSION = ".idx.json"
+CHUNK_SIZE = 1024 * 1024
+SPOOL_SIZE = 16 * 1024 * 1024
+DEFAULT_LEVEL = 10
+
+
+def require_zstandard():
+    if zstandard is None:
+        raise RuntimeError("The 'zstandard' package is required for project archives (pip install zstandard)")
+
+
+def index_path_for(archive_path):
+    return archive_path + INDEX_EXTENSION
+
+
+def collect_members(project_path):
+    # Walk the project in a stable order, keeping empty folders (Temp, Tools) so restore recreates them
+    arc_root = os.path.basename(os.path.normpath(project_path))
+    members = []
+    for root, dirs, files in os.walk(project_path):
+        dirs.sort()
+        rel_root = os.path.relpath(root, project_path)
+        arc_dir = arc_root if rel_root == "." else "/".join([arc_root] + rel_root.split(os.sep))
+        members.append((root, arc_dir, True))
+        for name in sorted(files):
+            members.append((os.path.join(root, name), arc_dir + "/" + name, False))
+    return members
+
+
+def make_tarinfo(path, arcname, is_dir):
+    stat = os.stat(path)
+    info = tarfile.TarInfo(arcname)
+    info.mtime = int(stat.st_mtime)
+    if is_dir:
+        info.type = tarfile.DIRTYPE
+        info.mode = 0o755
+    else:
+        info.type = tarfile.REGTYPE
+        info.mode = 0o644
+        info.size = stat.st_size
+    return info
+
+
+def compress_member(path, arcname, is_dir, level):
+    # Compress one tar member into a spooled temp file as a single zstd frame
+    info = make_tarinfo(path, arcname, is_dir)
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    compressor = zstandard.ZstdCompressor(level=level)
+    with compressor.stream_writer(spool, closefd=False) as writer:
+        writer.write(info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape"))
+        if not is_dir:
+            remaining = info.size
+            with open(path, "rb") as source:
+                while remaining > 0:
+                    chunk = source.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise OSError(f"{path} shrank while it was being archived")
+                    writer.write(chunk)
+                    remaining -= len(chunk)
+            padding = -info.size % tarfile.BLOCKSIZE
+            if padding:
+                writer.write(tarfile.NUL * padding)
+    spool.seek(0)
+    return info, spool
+
+
+def archive_project(project_path, archive_path, level=DEFAULT_LEVEL, workers=None, progress=None):
+    require_zstandard()
+    if not os.path.isdir(project_path):
+        raise FileNotFoundError(f"Project folder does not exist: {project_path}")
+
+    workers = workers or min(8, os.cpu_count() or 1)
+    members = collect_members(project_path)
+    partial_path = archive_path + ".partial"
+    partial_index_path = index_path_for(archive_path) + ".partial"
+    os.makedirs(os.path.dirname(os.path.abspath(archive_path)), exist_ok=True)
+    try:
+        index = write_archive(project_path, members, partial_path, partial_index_path, level, workers, progress)
+        os.replace(partial_path, archive_path)
+        os.replace(partial_index_path, index_path_for(archive_path))
+    except BaseException:
+        # An interrupted run would otherwise leave a multi-GB .partial behind in "Archived Projects"
+        for path in (partial_path, partial_index_path):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    return index
+
+
+def write_archive(project_path, members, partial_path, partial_index_path, level, workers, progress):
+    entries = []
+    total_size = 0
+    with open(partial_path, "wb") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        member_iter = iter(members)
+
+        def submit_next():
+            member = next(member_iter, None)
+            if member is None:
+                return False
+            pending.append(pool.submit(compress_member, *member, level))
+            return True
+
+        # Keep a bounded window of members in flight so memory/temp usage stays flat
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+
+        while pending:
+            info, spool = pending.popleft().result()
+            submit_next()
+            offset = out.tell()
+            with spool:
+                shutil.copyfileobj(spool, out, CHUNK_SIZE)
+            entries.append({
+                "name": info.name,
+                "type": "dir" if info.isdir() else "file",
+                "size": info.size,
+                "mtime": info.mtime,
+                "offset": offset,
+                "length": out.tell() - offset,
+            })
+            total_size += info.size
+            if progress:
+                progress(len(entries), len(members), info.name)
+
+        # End-of-archive marker as its own frame
+        out.write(zstandard.ZstdCompressor(level=level).compress(tarfile.NUL * tarfile.BLOCKSIZE * 2))
+        compressed_size = out.tell()
+
+    index = {
+        "version": 1,
+        "project": os.path.basename(os.path.normpath(project_path)),
+        "source_path": os.path.abspath(project_path),
+        "original_size": total_size,
+        "compressed_size": compressed_size,
+        "members": entries,
+    }
+    with open(partial_index_path, "w") as index_file:
+        json.dump(index, index_file, indent=4)
+    return index
+
+
+def load_index(archive_path):
+    with open(index_path_for(archive_path), "r") as index_file:
+        return json.load(index_file)
+
+
+def safe_destination(destination, member_name):
+    # Refuse member names that would land outside the destination folder
+    target = os.path.abspath(os.path.join(destination, *member_name.split("/")))
+    if os.path.commonpath([target, os.path.abspath(destination)]) != os.path.abspath(destination):
+        raise ValueError(f"Refusing to extract '{member_name}' outside {destination}")
+    return target
+
+
+def restore_project(archive_path, destination, progress=None):
+    require_zstandard()
+    os.makedirs(destination, exist_ok=True)
+    decompressor = zstandard.ZstdDecompressor()
+    restored = 0
+    with open(archive_path, "rb") as archive_file:
+        reader = decompressor.stream_reader(archive_file, read_size=CHUNK_SIZE, read_across_frames=True)
+        with tarfile.open(fileobj=reader, mode="r|") as tar:
+            for member in tar:
+                target = safe_destination(destination, member.name)
+                if member.isdir():
+                    os.makedirs(target, exist_ok=True)
+                elif member.isfile():
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    with tar.extractfile(member) as source, open(target, "wb") as dest:
+                        shutil.copyfileobj(source, dest, CHUNK_SIZE)
+                else:
+                    continue
+                os.utime(target, (member.mtime, member.mtime))
+                restored += 1
+                if progress:
+                    progress(restored, member.name)
+    return restored
+
+
+def extract_file(archive_path, member_name, destination):
+    # Decompress only the frame holding member_name, found through the side index
+    require_zstandard()
+    index = load_index(archive_path)
+    entry = next((m for m in index["members"] if m["name"] == member_name and m["type"] == "file"), None)
+    if entry is None:
+        raise KeyError(f"'{member_name}' is not in {archive_path}")
+
+    target = safe_destination(destination, member_name)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(archive_path, "rb") as archive_file:
+        archive_file.seek(entry["offset"])
+        reader = zstandard.ZstdDecompressor().stream_reader(archive_file, read_size=CHUNK_SIZE, read_across_frames=False)
+        tar = tarfile.open(fileobj=reader, mode="r|")
+        member = tar.next()
+        with tar.extractfile(member) as source, open(target, "wb") as dest:
+            shutil.copyfileobj(source, dest, CHUNK_SIZE)
+    os.utime(target, (entry["mtime"], entry["mtime"]))
+    return target
@@ -0,0 +1,163 @@
+# Checksum manifests for exported files
+#
+# Each folder that holds exports gets a ".pmt_checksums.json" manifest mapping file name to
+# sha256, size and mtime. Files are hashed in a thread pool with a streaming read, and a
+# re-verify skips files whose size and mtime still match the manifest unless a full check is asked for.
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+MANIFEST_NAME = ".pmt_checksums.json"
+# Per-piece mesh content hashes written by split exports, used to skip unchanged pieces
+SPLIT_MANIFEST_NAME = ".pmt_split_hashes.json"
+DEFAULT_EXTENSIONS = (".fbx",)
+CHUNK_SIZE = 1024 * 1024
+
+# First bytes of a valid FBX file, used to catch truncated or half-written exports
+FBX_BINARY_MAGIC = b"Kaydara FBX Binary  \x00"
+FBX_ASCII_MAGIC = b"; FBX"
+
+# Verification results
+STATUS_OK = "ok"
+STATUS_SKIPPED = "skipped"
+STATUS_STALE = "stale"
+STATUS_CORRUPT = "corrupt"
+STATUS_MISSING = "missing"
+STATUS_UNTRACKED = "untracked"
+
+
+def hash_file(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def looks_like_fbx(path):
+    with open(path, "rb") as file:
+        head = file.read(len(FBX_BINARY_MAGIC))
+    return head == FBX_BINARY_MAGIC or head.startswith(FBX_ASCII_MAGIC)
+
+
+def load_manifest(folder, manifest_name=MANIFEST_NAME):
+    try:
+        with open(os.path.join(folder, manifest_name), "r") as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return {"version": 1, "files": {}}
+    manifest.setdefault("files", {})
+    return manifest
+
+
+def save_manifest(folder, manifest, manifest_name=MANIFEST_NAME):
+    # Write to a temp file first so readers never see a half-written manifest
+    path = os.path.join(folder, manifest_name)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=4, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def file_entry(path):
+    stat = os.stat(path)
+    return {"sha256": hash_file(path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def check_file(path, entry, full=False):
+    # Returns (status, new_entry); new_entry is set when the file was hashed
+    if entry is None:
+        return STATUS_UNTRACKED, file_entry(path)
+    stat = os.stat(path)
+    unchanged = stat.st_size == entry["size"] and stat.st_mtime == entry["mtime"]
+    if unchanged and not full:
+        return STATUS_SKIPPED, None
+    current = file_entry(path)
+    if unchanged:
+        return (STATUS_OK if current["sha256"] == entry["sha256"] else STATUS_CORRUPT), current
+    return STATUS_STALE, current
+
+
+class ChecksumService:
+    def __init__(self, workers=None, extensions=DEFAULT_EXTENSIONS):
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.executor = ThreadPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 1))
+        self.folder_locks = {}
+        self.locks_lock = threading.Lock()
+
+    def folder_lock(self, folder):
+        with self.locks_lock:
+            return self.folder_locks.setdefault(os.path.normcase(os.path.abspath(folder)), threading.Lock())
+
+    def record(self, path):
+        # Hash a freshly written file in the background; the future resolves to its manifest entry
+        return self.executor.submit(self.record_now, path)
+
+    def record_now(self, path):
+        if path.lower().endswith(".fbx") and not looks_like_fbx(path):
+            raise ValueError(f"{path} is not a complete FBX file")
+        entry = file_entry(path)
+        folder, name = os.path.split(path)
+        with self.folder_lock(folder):
+            manifest = load_manifest(folder)
+            manifest["files"][name] = entry
+            save_manifest(folder, manifest)
+        return entry
+
+    def record_piece_hash(self, path, content_hash):
+        # Remember the mesh content hash a split export piece was written from
+        folder, name = os.path.split(path)
+        with self.folder_lock(folder):
+            manifest = load_manifest(folder, SPLIT_MANIFEST_NAME)
+            manifest["files"][name] = content_hash
+            save_manifest(folder, manifest, SPLIT_MANIFEST_NAME)
+
+    def tracked_folders(self, root):
+        for folder, dirs, files in os.walk(root):
+            dirs[:] = [d for d in dirs if d not in ['Tools', 'Temp']]
+            names = [f for f in files if f.lower().endswith(self.extensions)]
+            if names or MANIFEST_NAME in files:
+                yield folder, names
+
+    def verify(self, root, full=False, update=False):
+        # Re-verify every tracked folder under root; all files are queued up front so they hash in parallel
+        pending = []
+        for folder, names in self.tracked_folders(root):
+            entries = load_manifest(folder)["files"]
+            futures = {name: self.executor.submit(check_file, os.path.join(folder, name), entries.get(name), full)
+                       for name in names}
+            pending.append((folder, entries, futures))
+
+        results = []
+        for folder, entries, futures in pending:
+            updates = {}
+            for name, future in futures.items():
+                path = os.path.join(folder, name)
+                try:
+                    status, new_entry = future.result()
+                except OSError as e:
+                    results.append((path, STATUS_MISSING, str(e)))
+                    continue
+                if status != STATUS_SKIPPED and path.lower().endswith(".fbx") and not looks_like_fbx(path):
+                    status = STATUS_CORRUPT
+                results.append((path, status, None))
+                if new_entry and status in (STATUS_UNTRACKED, STATUS_STALE):
+                    updates[name] = new_entry
+            for name in sorted(set(entries) - set(futures)):
+                results.append((os.path.join(folder, name), STATUS_MISSING, None))
+                updates[name] = None
+            if update and updates:
+                with self.folder_lock(folder):
+                    manifest = load_manifest(folder)
+                    for name, entry in updates.items():
+                        if entry is None:
+                            manifest["files"].pop(name, None)
+                        else:
+                            manifest["files"][name] = entry
+                    save_manifest(folder, manifest)
+        return results
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
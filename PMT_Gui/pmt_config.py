@@ -0,0 +1,47 @@
+# Shared constants for PMT so the GUI, the CLI and the background services agree on folder locations
+import os
+
+# Define constants for file paths (PMT_BASE_DIRECTORY lets farm machines and scripts point at another root)
+BASE_DIRECTORY_PATH = os.environ.get("PMT_BASE_DIRECTORY", "C:/Autodesk/Autodesk_Maya_2024_1_Update_Windows_64bit_dlm")
+PROJECTS_FOLDER = "PMT_Projects"
+COMPANY_NAME = "Company Name"
+
+# Folders inside the company folder
+COMPANY_PATH = os.path.join(BASE_DIRECTORY_PATH, COMPANY_NAME)
+PMT_PROJECTS_PATH = os.path.join(COMPANY_PATH, "PMT Projects")
+DEPARTMENT_ASSETS_PATH = os.path.join(COMPANY_PATH, "Department Assets")
+ARCHIVED_PROJECTS_PATH = os.path.join(COMPANY_PATH, "Archived Projects")
+VERSION_HISTORY_PATH = os.path.join(COMPANY_PATH, "Version History")
+PROJECT_TEMPLATES_PATH = os.path.join(COMPANY_PATH, "Project Templates")
+JOURNAL_PATH = os.path.join(COMPANY_PATH, "Journal")
+
+# The Temp janitor cleans shared folders, so its policy, eviction log and lock are shared too
+TEMP_JANITOR_PATH = os.path.join(COMPANY_PATH, "Temp Janitor")
+TEMP_JANITOR_POLICY_PATH = os.path.join(TEMP_JANITOR_PATH, "policy.json")
+TEMP_JANITOR_LOG_PATH = os.path.join(TEMP_JANITOR_PATH, "janitor.log")
+TEMP_JANITOR_LOCK_PATH = os.path.join(TEMP_JANITOR_PATH, "janitor.lock")
+TEMP_JANITOR_STATE_PATH = os.path.join(TEMP_JANITOR_PATH, "last_run.json")
+
+# Per-machine data (export queue etc.); LOCALAPPDATA is the same inside Maya and PMT, unlike HOME
+LOCAL_DATA_PATH = os.path.join(os.environ.get("LOCALAPPDATA", os.path.expanduser("~")), "PMT")
+EXPORT_QUEUE_PATH = os.path.join(LOCAL_DATA_PATH, "Export Queue")
+DISK_USAGE_CACHE_PATH = os.path.join(LOCAL_DATA_PATH, "disk_usage_cache.json")
+VALIDATION_CACHE_PATH = os.path.join(LOCAL_DATA_PATH, "validation_cache.json")
+REFERENCE_INDEX_PATH = os.path.join(LOCAL_DATA_PATH, "reference_index.json")
+TOOL_MANIFEST_PATH = os.path.join(LOCAL_DATA_PATH, "tool_deployments.json")
+
+# Maya executables
+MAYA_EXECUTABLE = "C:/Program Files/Autodesk/Maya2024/bin/maya.exe"
+MAYAPY_EXECUTABLE = "C:/Program Files/Autodesk/Maya2024/bin/mayapy.exe"
+
+# Optional shared metadata service ("host:port"); clients fall back to scanning the share when it isn't running
+METADATA_SERVICE_HOST, _, _metadata_port = os.environ.get("PMT_METADATA_SERVICE", "127.0.0.1:47631").rpartition(":")
+METADATA_SERVICE_ADDRESS = (METADATA_SERVICE_HOST, int(_metadata_port))
+# Where the metadata service listens; all interfaces by default so other workstations can reach it
+METADATA_BIND_HOST, _, _metadata_bind_port = os.environ.get("PMT_METADATA_BIND", f"0.0.0.0:{_metadata_port}").rpartition(":")
+METADATA_BIND_ADDRESS = (METADATA_BIND_HOST, int(_metadata_bind_port))
+
+# RPC service for farm and build scripts ("host:port"); a non-empty PMT_SERVICE_TOKEN must be sent as a Bearer token
+SERVICE_HOST, _, _service_port = os.environ.get("PMT_SERVICE", "127.0.0.1:47632").rpartition(":")
+SERVICE_ADDRESS = (SERVICE_HOST, int(_service_port))
+SERVICE_TOKEN = os.environ.get("PMT_SERVICE_TOKEN", "")
@@ -0,0 +1,204 @@
+# Disk usage per project, per category and per asset library
+#
+# DiskUsageScanner lists the company folder with os.scandir, one folder per task in a thread pool,
+# and caches every folder listing by the folder's mtime in a local JSON file. A rescan re-stats each
+# folder once and only re-lists folders whose mtime moved, so repeat scans of a large share take
+# seconds. Folder mtimes don't move when a file is rewritten in place, so full=True re-lists everything.
+# Duplicates are found by grouping files by size first and only hashing the groups with more than one file.
+import os
+import json
+import time
+import heapq
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import pmt_checksums
+from pmt_config import COMPANY_PATH, DISK_USAGE_CACHE_PATH
+
+CATEGORIES = ['Characters', 'Environments', 'Props']
+LIBRARIES = ['Department Assets', 'Project Assets', 'Archived Projects', 'Version History', 'Project Templates', 'Journal']
+
+# Files smaller than this are left out of the duplicate search; hashing thousands of tiny files isn't worth it
+DEFAULT_MIN_DUPLICATE_SIZE = 64 * 1024
+
+
+def format_size(size):
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def child_path(rel_path, name):
+    return f"{rel_path}/{name}" if rel_path else name
+
+
+class DiskUsageScanner:
+    def __init__(self, root=COMPANY_PATH, cache_path=DISK_USAGE_CACHE_PATH, workers=None):
+        self.root = root
+        self.cache_path = cache_path
+        # Listing is I/O bound (and slow on network shares), so use more threads than cores
+        self.workers = workers or min(32, (os.cpu_count() or 2) * 4)
+        self.folders = self.load_cache()
+
+    def absolute(self, rel_path):
+        return os.path.join(self.root, *rel_path.split("/")) if rel_path else self.root
+
+    def load_cache(self):
+        try:
+            with open(self.cache_path, "r") as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+        if cache.get("root") != self.root:
+            return {}
+        return cache.get("folders", {})
+
+    def save_cache(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with open(self.cache_path + ".tmp", "w") as cache_file:
+            json.dump({"version": 1, "root": self.root, "scanned": time.time(), "folders": self.folders}, cache_file)
+        os.replace(self.cache_path + ".tmp", self.cache_path)
+
+    def scan_folder(self, rel_path, full):
+        # Returns (rel_path, entry, reused); entry is None if the folder disappeared during the scan
+        cached = self.folders.get(rel_path)
+        path = self.absolute(rel_path)
+        try:
+            mtime = os.stat(path).st_mtime
+            if cached and cached["mtime"] == mtime and not full:
+                return rel_path, cached, True
+            dirs = []
+            files = {}
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dirs.append(entry.name)
+                        elif entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            files[entry.name] = [stat.st_size, stat.st_mtime, None]
+                    except OSError:
+                        continue
+        except OSError:
+            return rel_path, None, False
+
+        # Keep hashes from the last scan for files that haven't changed
+        if cached:
+            for name, info in files.items():
+                old = cached["files"].get(name)
+                if old and old[0] == info[0] and old[1] == info[1]:
+                    info[2] = old[2]
+        return rel_path, {"mtime": mtime, "dirs": sorted(dirs), "files": files}, False
+
+    def scan(self, full=False):
+        # Walk the tree breadth-first across the pool; returns (folders listed, folders reused from the cache)
+        folders = {}
+        listed = 0
+        reused = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {pool.submit(self.scan_folder, "", full)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rel_path, entry, was_cached = future.result()
+                    if entry is None:
+                        continue
+                    folders[rel_path] = entry
+                    if was_cached:
+                        reused += 1
+                    else:
+                        listed += 1
+                    for name in entry["dirs"]:
+                        pending.add(pool.submit(self.scan_folder, child_path(rel_path, name), full))
+        self.folders = folders
+        self.save_cache()
+        return listed, reused
+
+    def iter_files(self):
+        for rel_path, entry in self.folders.items():
+            for name, info in entry["files"].items():
+                yield rel_path, name, info
+
+    def find_duplicates(self, min_size=DEFAULT_MIN_DUPLICATE_SIZE):
+        # Group by size, then hash only the files that share a size with another file
+        by_size = {}
+        for rel_path, name, info in self.iter_files():
+            if info[0] >= min_size:
+                by_size.setdefault(info[0], []).append((rel_path, name, info))
+        candidates = [item for group in by_size.values() if len(group) > 1 for item in group]
+
+        def hash_candidate(item):
+            rel_path, name, info = item
+            if info[2] is None:
+                try:
+                    info[2] = pmt_checksums.hash_file(os.path.join(self.absolute(rel_path), name))
+                except OSError:
+                    pass
+            return item
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            hashed = list(pool.map(hash_candidate, candidates))
+        self.save_cache()
+
+        by_hash = {}
+        for rel_path, name, info in hashed:
+            if info[2] is not None:
+                by_hash.setdefault((info[0], info[2]), []).append(child_path(rel_path, name))
+        duplicates = [{"size": size, "sha256": sha, "paths": sorted(paths), "wasted": size * (len(paths) - 1)}
+                      for (size, sha), paths in by_hash.items() if len(paths) > 1]
+        duplicates.sort(key=lambda d: d["wasted"], reverse=True)
+        return duplicates
+
+    def summarize(self, top=20):
+        # Totals per project (split into Source/Exported categories) and per library, plus the largest files
+        projects = {}
+        libraries = {name: 0 for name in LIBRARIES}
+        other = 0
+        total = 0
+        count = 0
+        for rel_path, name, info in self.iter_files():
+            size = info[0]
+            total += size
+            count += 1
+            parts = rel_path.split("/") if rel_path else []
+            if len(parts) > 1 and parts[0] == "PMT Projects" and parts[1] in LIBRARIES:
+                libraries[parts[1]] += size
+            elif len(parts) > 1 and parts[0] == "PMT Projects":
+                project = projects.setdefault(parts[1], {"total": 0, "Source": {}, "Exported": {}, "other": 0})
+                project["total"] += size
+                if len(parts) > 2 and parts[2] in ("Source", "Exported"):
+                    category = parts[3] if len(parts) > 3 else "(top level)"
+                    project[parts[2]][category] = project[parts[2]].get(category, 0) + size
+                else:
+                    project["other"] += size
+            elif parts and parts[0] in LIBRARIES:
+                libraries[parts[0]] += size
+            else:
+                other += size
+
+        largest = heapq.nlargest(top, ((info[0], child_path(rel_path, name)) for rel_path, name, info in self.iter_files()))
+        return {
+            "root": self.root,
+            "total": total,
+            "files": count,
+            "folders": len(self.folders),
+            "projects": dict(sorted(projects.items(), key=lambda p: p[1]["total"], reverse=True)),
+            "libraries": libraries,
+            "other": other,
+            "largest": [{"size": size, "path": path} for size, path in largest],
+        }
+
+
+def disk_usage(root=COMPANY_PATH, top=20, duplicates=False, full=False, workers=None):
+    # One-call scan + report used by the CLI and the GUI
+    scanner = DiskUsageScanner(root, workers=workers)
+    started = time.time()
+    listed, reused = scanner.scan(full=full)
+    report = scanner.summarize(top)
+    if duplicates:
+        report["duplicates"] = scanner.find_duplicates()
+    report["listed_folders"] = listed
+    report["cached_folders"] = reused
+    report["seconds"] = time.time() - started
+    return report
@@ -0,0 +1,350 @@
+# Local export job scheduler
+#
+# Maya drops job files into "<queue>/incoming" and moves on; the scheduler picks them up, runs them
+# highest priority first with a per-machine concurrency limit, retries failures with a backoff and
+# keeps every job's state in "<queue>/jobs.json" so a restart carries on where it left off. Only one
+# scheduler per queue folder runs at a time (the GUI and `pmt queue run` would overwrite each other's
+# state); it holds "<queue>/scheduler.lock" until it stops.
+import os
+import json
+import time
+import uuid
+import heapq
+import threading
+import subprocess
+
+import pmt_checksums
+import pmt_journal
+import pmt_locks
+import pmt_validate
+from pmt_config import EXPORT_QUEUE_PATH, MAYAPY_EXECUTABLE
+
+INCOMING_FOLDER = "incoming"
+JOBS_FILE = "jobs.json"
+LOCK_FILE = "scheduler.lock"
+
+PRIORITY_LOW = -10
+PRIORITY_NORMAL = 0
+PRIORITY_HIGH = 10
+
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+# Finished jobs kept in jobs.json for the dashboard
+HISTORY_LIMIT = 200
+
+# Run inside mayapy: open the scene and export all meshes like export_to_subfolder in the export tool,
+# or only the given nodes (JSON list in argv[3]) for split export pieces
+MAYA_EXPORT_SCRIPT = """
+import sys
+import json
+import maya.standalone
+maya.standalone.initialize(name='python')
+import maya.cmds as cmds
+cmds.loadPlugin('fbxmaya', quiet=True)
+scene_path, output_path = sys.argv[1], sys.argv[2]
+nodes = json.loads(sys.argv[3]) if len(sys.argv) > 3 else None
+cmds.file(scene_path, open=True, force=True)
+if nodes:
+    missing = [n for n in nodes if not cmds.objExists(n)]
+    if missing:
+        sys.exit('Nodes not found in the saved scene: ' + ', '.join(missing))
+    cmds.select(nodes, replace=True)
+else:
+    all_meshes = cmds.ls(geometry=True)
+    if not all_meshes:
+        sys.exit('No meshes found in the scene!')
+    cmds.select(all_meshes)
+cmds.file(output_path, force=True, options='v=0', typ='FBX export', pr=True, es=True)
+maya.standalone.uninitialize()
+"""
+
+
+def new_job(scene, output, priority=PRIORITY_NORMAL, submitted_by=None, nodes=None, piece_hash=None):
+    return {
+        "id": uuid.uuid4().hex,
+        "scene": scene,
+        "output": output,
+        "priority": priority,
+        "submitted_by": submitted_by,
+        "state": STATE_QUEUED,
+        "attempts": 0,
+        "submitted": time.time(),
+        "started": None,
+        "finished": None,
+        "not_before": 0,
+        "error": None,
+        "nodes": nodes,
+        "piece_hash": piece_hash,
+    }
+
+
+def submit_job_file(scene, output, priority=PRIORITY_NORMAL, queue_path=EXPORT_QUEUE_PATH, submitted_by=None,
+                    nodes=None, piece_hash=None):
+    # Used by processes that don't own the scheduler (Maya, the CLI): write the job and let the scheduler pick it up
+    incoming_path = os.path.join(queue_path, INCOMING_FOLDER)
+    os.makedirs(incoming_path, exist_ok=True)
+    job = new_job(scene, output, priority, submitted_by, nodes, piece_hash)
+    temp_path = os.path.join(incoming_path, job["id"] + ".tmp")
+    with open(temp_path, "w") as job_file:
+        json.dump(job, job_file, indent=4)
+    os.replace(temp_path, os.path.join(incoming_path, job["id"] + ".json"))
+    return job
+
+
+class MayaBatchExecutor:
+    def __init__(self, mayapy=MAYAPY_EXECUTABLE, timeout=60 * 60):
+        self.mayapy = mayapy
+        self.timeout = timeout
+        self.checksums = pmt_checksums.ChecksumService(workers=1)
+        # One scene per job, so validate in-process rather than starting a pool
+        self.validator = pmt_validate.SceneValidator(workers=1)
+
+    def run(self, job):
+        # Catch broken .ma scenes before paying for a mayapy start
+        if job["scene"].lower().endswith(".ma"):
+            issues = self.validator.validate([job["scene"]])[job["scene"]]
+            errors = [i for i in issues if i["severity"] == pmt_validate.SEVERITY_ERROR]
+            if errors:
+                raise RuntimeError("Scene failed validation: " + "; ".join(f"line {i['line']}: {i['message']}" for i in errors[:5]))
+        os.makedirs(os.path.dirname(job["output"]), exist_ok=True)
+        command = [self.mayapy, "-c", MAYA_EXPORT_SCRIPT, job["scene"], job["output"]]
+        if job.get("nodes"):
+            command.append(json.dumps(job["nodes"]))
+        result = subprocess.run(command, capture_output=True, text=True, timeout=self.timeout)
+        if result.returncode != 0:
+            raise RuntimeError((result.stderr or result.stdout).strip()[-2000:] or f"mayapy exited with {result.returncode}")
+        self.checksums.record_now(job["output"])
+        # Only remember the piece hash once the piece is really written, so a failed job is retried next export
+        if job.get("piece_hash"):
+            self.checksums.record_piece_hash(job["output"], job["piece_hash"])
+
+
+class StubExecutor:
+    # Stand-in for tests and dry runs: sleeps instead of exporting and can fail the first attempts of a job
+    def __init__(self, duration=0.0, failures=0):
+        self.duration = duration
+        self.failures = failures
+        self.runs = []
+        self.lock = threading.Lock()
+
+    def run(self, job):
+        with self.lock:
+            self.runs.append(job["id"])
+            attempt = self.runs.count(job["id"])
+        time.sleep(self.duration)
+        if attempt <= self.failures:
+            raise RuntimeError(f"Stub failure {attempt} of {self.failures}")
+
+
+class ExportScheduler:
+    def __init__(self, executor=None, queue_path=EXPORT_QUEUE_PATH, max_concurrent=None, max_retries=2,
+                 retry_delay=30.0, poll_interval=1.0):
+        self.executor = executor or MayaBatchExecutor()
+        self.queue_path = queue_path
+        self.max_concurrent = max_concurrent or max(1, (os.cpu_count() or 2) // 4)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.jobs = {}
+        self.heap = []
+        self.condition = threading.Condition()
+        self.threads = []
+        self.stopping = False
+        os.makedirs(os.path.join(queue_path, INCOMING_FOLDER), exist_ok=True)
+        try:
+            self.lock_file = pmt_locks.acquire(os.path.join(queue_path, LOCK_FILE))
+        except BlockingIOError:
+            raise BlockingIOError(f"Another PMT process is already running the export queue in {queue_path}") from None
+        self.load()
+
+    def load(self):
+        # Jobs that were running when PMT stopped go back in the queue
+        try:
+            with open(os.path.join(self.queue_path, JOBS_FILE), "r") as jobs_file:
+                jobs = json.load(jobs_file)
+        except (OSError, ValueError):
+            jobs = []
+        for job in jobs:
+            if job["state"] == STATE_RUNNING:
+                job["state"] = STATE_QUEUED
+                job["started"] = None
+            self.jobs[job["id"]] = job
+            if job["state"] == STATE_QUEUED:
+                self.push(job)
+
+    def save(self):
+        # Caller holds self.condition
+        finished = sorted((j for j in self.jobs.values() if j["state"] in (STATE_DONE, STATE_FAILED)),
+                          key=lambda j: j["finished"])
+        for job in finished[:-HISTORY_LIMIT]:
+            del self.jobs[job["id"]]
+        path = os.path.join(self.queue_path, JOBS_FILE)
+        with open(path + ".tmp", "w") as jobs_file:
+            json.dump(list(self.jobs.values()), jobs_file, indent=4)
+        os.replace(path + ".tmp", path)
+
+    def push(self, job):
+        heapq.heappush(self.heap, (-job["priority"], job["submitted"], job["id"]))
+
+    def submit(self, scene, output, priority=PRIORITY_NORMAL, submitted_by=None, nodes=None, piece_hash=None):
+        job = new_job(scene, output, priority, submitted_by, nodes, piece_hash)
+        with self.condition:
+            self.jobs[job["id"]] = job
+            self.push(job)
+            self.save()
+            self.condition.notify()
+        return job
+
+    def collect_incoming(self):
+        incoming_path = os.path.join(self.queue_path, INCOMING_FOLDER)
+        for name in sorted(os.listdir(incoming_path)):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(incoming_path, name)
+            try:
+                with open(path, "r") as job_file:
+                    job = json.load(job_file)
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable export job {path}: {e}")
+                continue
+            # The job file is only removed once jobs.json holds the job, so a crash in between can't lose it
+            with self.condition:
+                if job["id"] not in self.jobs:
+                    self.jobs[job["id"]] = job
+                    self.push(job)
+                    self.save()
+                    self.condition.notify()
+            os.remove(path)
+
+    def next_job(self):
+        # Caller holds self.condition; returns the best job that is ready to run, or None
+        now = time.time()
+        delayed = []
+        job = None
+        while self.heap:
+            entry = heapq.heappop(self.heap)
+            candidate = self.jobs.get(entry[2])
+            if candidate is None or candidate["state"] != STATE_QUEUED:
+                continue
+            if candidate["not_before"] > now:
+                delayed.append(entry)
+                continue
+            job = candidate
+            break
+        for entry in delayed:
+            heapq.heappush(self.heap, entry)
+        return job
+
+    def worker(self):
+        while True:
+            with self.condition:
+                job = self.next_job()
+                while job is None and not self.stopping:
+                    self.condition.wait(self.poll_interval)
+                    job = self.next_job()
+                if self.stopping:
+                    return
+                job["state"] = STATE_RUNNING
+                job["attempts"] += 1
+                job["started"] = time.time()
+                job["error"] = None
+                self.save()
+
+            try:
+                self.executor.run(job)
+                error = None
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            pmt_journal.record("export", job["scene"], job["output"], ok=error is None, error=error, job=job["id"],
+                               attempt=job["attempts"])
+
+            with self.condition:
+                job["finished"] = time.time()
+                if error is None:
+                    job["state"] = STATE_DONE
+                elif job["attempts"] <= self.max_retries:
+                    job["state"] = STATE_QUEUED
+                    job["error"] = error
+                    job["not_before"] = job["finished"] + self.retry_delay * job["attempts"]
+                    self.push(job)
+                else:
+                    job["state"] = STATE_FAILED
+                    job["error"] = error
+                self.save()
+                self.condition.notify_all()
+
+    def poller(self):
+        while not self.stopping:
+            try:
+                self.collect_incoming()
+            except OSError as e:
+                print(f"Failed to read export queue: {e}")
+            with self.condition:
+                self.condition.wait(self.poll_interval)
+
+    def start(self):
+        self.stopping = False
+        self.threads = [threading.Thread(target=self.worker, daemon=True) for _ in range(self.max_concurrent)]
+        self.threads.append(threading.Thread(target=self.poller, daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self, wait=True):
+        # Running jobs finish in the background; anything still running is re-queued on the next load
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        if wait:
+            for thread in self.threads:
+                thread.join()
+            # Without waiting, running jobs still save their state, so the lock is kept until the process exits
+            if self.lock_file is not None:
+                pmt_locks.release(self.lock_file)
+                self.lock_file = None
+        self.threads = []
+
+    def wait_idle(self, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        with self.condition:
+            while any(j["state"] in (STATE_QUEUED, STATE_RUNNING) for j in self.jobs.values()):
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining if remaining is not None else self.poll_interval)
+        return True
+
+    def status(self):
+        # Snapshot for the dashboard: queue depth plus per-job timings, newest first
+        now = time.time()
+        with self.condition:
+            jobs = [dict(j) for j in self.jobs.values()]
+        for job in jobs:
+            if job["started"]:
+                job["wait_seconds"] = job["started"] - job["submitted"]
+                job["run_seconds"] = (job["finished"] if job["state"] in (STATE_DONE, STATE_FAILED) else now) - job["started"]
+            else:
+                job["wait_seconds"] = now - job["submitted"]
+                job["run_seconds"] = None
+        jobs.sort(key=lambda j: j["submitted"], reverse=True)
+        counts = {state: sum(1 for j in jobs if j["state"] == state)
+                  for state in (STATE_QUEUED, STATE_RUNNING, STATE_DONE, STATE_FAILED)}
+        return {"counts": counts, "max_concurrent": self.max_concurrent, "jobs": jobs}
+
+
+def load_status(queue_path=EXPORT_QUEUE_PATH):
+    # Read-only view of the persisted queue for processes that don't run the scheduler
+    try:
+        with open(os.path.join(queue_path, JOBS_FILE), "r") as jobs_file:
+            jobs = json.load(jobs_file)
+    except (OSError, ValueError):
+        jobs = []
+    incoming = [n for n in os.listdir(os.path.join(queue_path, INCOMING_FOLDER)) if n.endswith(".json")] \
+        if os.path.isdir(os.path.join(queue_path, INCOMING_FOLDER)) else []
+    counts = {state: sum(1 for j in jobs if j["state"] == state)
+              for state in (STATE_QUEUED, STATE_RUNNING, STATE_DONE, STATE_FAILED)}
+    counts[STATE_QUEUED] += len(incoming)
+    return {"counts": counts, "jobs": sorted(jobs, key=lambda j: j["submitted"], reverse=True)}
+
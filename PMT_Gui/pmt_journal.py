@@ -0,0 +1,424 @@
+# Append-only journal of every file operation done through PMT
+#
+# Each event is one JSON line: time, operation, company-relative path (and destination for copies and
+# renames), whether it succeeded and a few details. record() only appends to an in-memory buffer; a
+# background thread writes the buffer out once a second (or as soon as it holds FLUSH_EVENTS events),
+# so journaling adds microseconds to an operation. Every process writes its own segment files in the
+# shared "Journal" folder, so 50 workstations never append to the same file over SMB; a segment is
+# closed once it passes SEGMENT_BYTES. Next to each segment a small index records its time range, the
+# user and host that wrote it, event counts per project (or top-level library) and per operation, and
+# the byte offset of every OFFSET_EVERY-th event. query() uses the indexes to skip segments outside
+# the time range or without the project, seeks into the rest by time and only parses candidate lines.
+# Short runs (every `pmt` command) each leave a small segment, so compact() merges finished segments
+# into ones of up to SEGMENT_BYTES, under a lock file so one machine at a time does it. Long-running
+# processes (the GUI) compact every COMPACT_INTERVAL; `pmt journal --compact` runs it by hand. Path
+# matching is case-insensitive where the filesystem is.
+import os
+import json
+import time
+import atexit
+import bisect
+import heapq
+import socket
+import getpass
+import itertools
+import threading
+from contextlib import contextmanager
+
+import pmt_locks
+from pmt_config import COMPANY_PATH, JOURNAL_PATH
+
+SEGMENT_EXTENSION = ".jsonl"
+INDEX_EXTENSION = ".idx.json"
+SEGMENT_BYTES = 8 * 1024 * 1024
+FLUSH_INTERVAL = 1.0
+FLUSH_EVENTS = 512
+# Index one byte offset per this many events so queries can seek to a start time
+OFFSET_EVERY = 256
+COMPACT_LOCK = "compact.lock"
+COMPACT_INTERVAL = 3600
+# Writers move to a new segment once theirs is this old, so a segment never closed (its process was
+# killed) is safe to compact after twice as long
+SEGMENT_AGE = 24 * 3600
+
+# Keeps segment names unique when a process opens two in the same millisecond
+segment_numbers = itertools.count()
+
+
+def relative(path, root=COMPANY_PATH):
+    # Company-relative "/" path; paths outside the company folder are kept absolute
+    if path is None:
+        return None
+    path = os.path.abspath(path)
+    root = os.path.abspath(root)
+    if os.path.normcase(path) == os.path.normcase(root):
+        return ""
+    if not os.path.normcase(path).startswith(os.path.normcase(root) + os.sep):
+        return path.replace(os.sep, "/")
+    return os.path.relpath(path, root).replace(os.sep, "/")
+
+
+def index_key(rel_path):
+    # What the index counts events under: "PMT Projects/<project>", or the first folder for everything else
+    parts = rel_path.split("/")
+    if parts[0] == "PMT Projects" and len(parts) > 1:
+        return "/".join(parts[:2])
+    return parts[0]
+
+
+def under(value, prefix):
+    # Whether the "/" path value is prefix or lies below it, compared the way the filesystem does
+    value = os.path.normcase(value)
+    return value == os.path.normcase(prefix) or value.startswith(os.path.normcase(prefix + "/"))
+
+
+def key_matches(key, prefix):
+    # Whether events counted under an index key can lie under prefix ("" is the whole company folder)
+    return not prefix or under(key, prefix) or under(prefix, key)
+
+
+def touches(event, prefix):
+    for key in ("path", "dest"):
+        value = event.get(key)
+        if value is not None and under(value, prefix):
+            return True
+    return False
+
+
+def finished(index, now):
+    return index.get("closed") or now - index.get("opened", index["start"] or now) >= 2 * SEGMENT_AGE
+
+
+class Journal:
+    def __init__(self, path=JOURNAL_PATH, root=COMPANY_PATH, segment_bytes=SEGMENT_BYTES, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.root = root
+        self.segment_bytes = segment_bytes
+        self.flush_interval = flush_interval
+        self.user = getpass.getuser()
+        self.host = socket.gethostname()
+        self.buffer = []
+        self.lock = threading.Lock()
+        # Held while writing, so a flush from the thread and one from atexit don't interleave
+        self.write_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        self.segment = None
+        self.index = None
+        self.segment_file = None
+        self.last_compact = time.time()
+
+    # Writing
+
+    def record(self, op, path, dest=None, ok=True, error=None, **details):
+        event = {"op": op, "path": relative(path, self.root)}
+        if dest is not None:
+            event["dest"] = relative(dest, self.root)
+        if not ok:
+            event["ok"] = False
+            event["error"] = error
+        if details:
+            event.update(details)
+        with self.lock:
+            # Stamped under the lock so each segment stays in time order
+            event["t"] = time.time()
+            self.buffer.append(event)
+            size = len(self.buffer)
+            if self.thread is None:
+                self.start()
+        if size >= FLUSH_EVENTS:
+            self.wake.set()
+
+    @contextmanager
+    def operation(self, op, path, dest=None, **details):
+        # Records op once the block finishes, with the error if it raised
+        started = time.time()
+        try:
+            yield details
+        except Exception as e:
+            self.record(op, path, dest, ok=False, error=str(e), ms=int((time.time() - started) * 1000), **details)
+            raise
+        self.record(op, path, dest, ms=int((time.time() - started) * 1000), **details)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.flush_loop, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def flush_loop(self):
+        while True:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            try:
+                self.flush()
+            except OSError as e:
+                # Events stay buffered and are retried on the next flush
+                print(f"Failed to write the PMT journal: {e}")
+            if time.time() - self.last_compact >= COMPACT_INTERVAL:
+                self.last_compact = time.time()
+                try:
+                    self.compact()
+                except BlockingIOError:
+                    pass  # Another machine is compacting
+                except OSError as e:
+                    print(f"Failed to compact the PMT journal: {e}")
+
+    def new_index(self, segment):
+        return {"version": 1, "segment": segment + SEGMENT_EXTENSION, "user": self.user, "host": self.host,
+                "pid": os.getpid(), "opened": time.time(), "start": None, "end": None, "count": 0, "bytes": 0,
+                "keys": {}, "ops": {}, "offsets": []}
+
+    def open_segment(self):
+        os.makedirs(self.path, exist_ok=True)
+        self.segment = f"{int(time.time() * 1000):015d}-{self.host}-{os.getpid()}-{next(segment_numbers)}"
+        self.index = self.new_index(self.segment)
+        self.segment_file = open(os.path.join(self.path, self.segment + SEGMENT_EXTENSION), "ab")
+
+    def write_index(self, index):
+        index_path = os.path.join(self.path, index["segment"][:-len(SEGMENT_EXTENSION)] + INDEX_EXTENSION)
+        with open(index_path + ".tmp", "w") as index_file:
+            json.dump(index, index_file)
+        os.replace(index_path + ".tmp", index_path)
+
+    def close_segment(self, done=True):
+        # done marks the segment closed in its index, so compact() can merge it; a segment abandoned after a
+        # failed write is left until it is old enough
+        if self.segment_file:
+            self.segment_file.close()
+            if done:
+                self.index["closed"] = True
+                try:
+                    self.write_index(self.index)
+                except OSError as e:
+                    print(f"Failed to close the PMT journal segment: {e}")
+        self.segment_file = None
+        self.segment = None
+
+    def flush(self):
+        with self.write_lock:
+            with self.lock:
+                events, self.buffer = self.buffer, []
+            if not events:
+                return
+            try:
+                self.write_events(events)
+            except OSError:
+                with self.lock:
+                    self.buffer[:0] = events
+                self.close_segment(done=False)
+                raise
+
+    @staticmethod
+    def encode(index, events):
+        # The lines for events, counted into index as if appended to its segment
+        lines = []
+        offset = index["bytes"]
+        for event in events:
+            line = (json.dumps(event, separators=(",", ":")) + "\n").encode("utf-8")
+            if index["count"] % OFFSET_EVERY == 0:
+                index["offsets"].append([event["t"], offset])
+            index["count"] += 1
+            index["start"] = event["t"] if index["start"] is None else min(index["start"], event["t"])
+            index["end"] = event["t"] if index["end"] is None else max(index["end"], event["t"])
+            index["ops"][event["op"]] = index["ops"].get(event["op"], 0) + 1
+            for key in {index_key(event[k]) for k in ("path", "dest") if event.get(k) is not None}:
+                index["keys"][key] = index["keys"].get(key, 0) + 1
+            lines.append(line)
+            offset += len(line)
+        index["bytes"] = offset
+        return b"".join(lines)
+
+    def write_events(self, events):
+        if self.segment_file is not None and time.time() - self.index["opened"] >= SEGMENT_AGE:
+            self.close_segment()
+        if self.segment_file is None:
+            self.open_segment()
+        self.segment_file.write(self.encode(self.index, events))
+        self.segment_file.flush()
+        self.write_index(self.index)
+        if self.index["bytes"] >= self.segment_bytes:
+            self.close_segment()
+
+    def close(self):
+        try:
+            self.flush()
+        except OSError as e:
+            print(f"Failed to write the PMT journal: {e}")
+        self.close_segment()
+
+    # Compaction
+
+    def remove_segment(self, segment):
+        for name in (segment, segment[:-len(SEGMENT_EXTENSION)] + INDEX_EXTENSION):
+            try:
+                os.remove(os.path.join(self.path, name))
+            except FileNotFoundError:
+                pass
+
+    def merge(self, batch):
+        # One segment holding every event of batch in time order. Its index lists the segments it replaces,
+        # so readers ignore them from the moment it is written, even if removing them fails.
+        segment = f"{batch[0]['segment'][:15]}-merged-{self.host}-{os.getpid()}-{next(segment_numbers)}"
+        index = self.new_index(segment)
+        index.update(user=None, host=None, pid=None, closed=True, merged=[i["segment"] for i in batch])
+        users = set()
+        hosts = set()
+        events = heapq.merge(*(self.read_segment(i) for i in batch), key=lambda e: e["t"])
+        with open(os.path.join(self.path, index["segment"]), "wb") as segment_file:
+            chunk = []
+            for event in events:
+                users.add(event["user"])
+                hosts.add(event["host"])
+                chunk.append(event)
+                if len(chunk) >= FLUSH_EVENTS:
+                    segment_file.write(self.encode(index, chunk))
+                    chunk = []
+            segment_file.write(self.encode(index, chunk))
+        index["users"] = sorted(users)
+        index["hosts"] = sorted(hosts)
+        self.write_index(index)
+        for merged in index["merged"]:
+            self.remove_segment(merged)
+
+    def compact(self):
+        # Merges finished segments smaller than segment_bytes, oldest first; returns how many segments went.
+        # Raises BlockingIOError while another process is compacting.
+        with pmt_locks.locked(os.path.join(self.path, COMPACT_LOCK)):
+            indexes, replaced = self.load_indexes()
+            for segment in replaced:
+                self.remove_segment(segment)  # Left by a compaction that was interrupted
+            now = time.time()
+            batches = [[]]
+            size = 0
+            for index in indexes:
+                if not finished(index, now) or index["bytes"] >= self.segment_bytes:
+                    continue
+                if size + index["bytes"] > self.segment_bytes:
+                    batches.append([])
+                    size = 0
+                batches[-1].append(index)
+                size += index["bytes"]
+            removed = 0
+            for batch in batches:
+                if len(batch) > 1:
+                    self.merge(batch)
+                    removed += len(batch) - 1
+            return removed
+
+    # Reading
+
+    def load_indexes(self):
+        # (indexes in segment order, segments replaced by a merged one but not removed yet)
+        try:
+            names = sorted(n for n in os.listdir(self.path) if n.endswith(INDEX_EXTENSION))
+        except OSError:
+            return [], set()
+        indexes = []
+        for name in names:
+            try:
+                with open(os.path.join(self.path, name), "r") as index_file:
+                    indexes.append(json.load(index_file))
+            except (OSError, ValueError):
+                continue
+        replaced = {segment for index in indexes for segment in index.get("merged", [])}
+        return [i for i in indexes if i["segment"] not in replaced], replaced
+
+    def segments(self, since=None, until=None, prefix=None, user=None):
+        # Indexes of the segments that can hold matching events
+        selected = []
+        for index in self.load_indexes()[0]:
+            if not index["count"]:
+                continue
+            if since is not None and index["end"] < since or until is not None and index["start"] > until:
+                continue
+            if prefix is not None and not any(key_matches(k, prefix) for k in index["keys"]):
+                continue
+            if user is not None and user not in index.get("users", [index["user"]]):
+                continue
+            selected.append(index)
+        return selected
+
+    def read_segment(self, index, since=None, until=None, prefix=None, op=None, user=None):
+        # Events of one segment in time order; seeks past the events before since
+        offset = 0
+        if since is not None and index["offsets"]:
+            times = [t for t, _ in index["offsets"]]
+            position = bisect.bisect_left(times, since) - 1
+            if position >= 0:
+                offset = index["offsets"][position][1]
+        # Compare against the JSON-escaped form the line holds (lowercased where paths ignore case; the
+        # escapes of non-ASCII letters don't lowercase with them, so those prefixes skip the quick check)
+        fold_case = os.path.normcase("A") == "a"
+        needle = json.dumps(prefix.lower() if fold_case else prefix)[1:-1].encode("utf-8") if prefix else None
+        if fold_case and prefix and not prefix.isascii():
+            needle = None
+        op_needle = f'"op":{json.dumps(op)}'.encode("utf-8") if op else None
+        try:
+            segment_file = open(os.path.join(self.path, index["segment"]), "rb")
+        except OSError:
+            return
+        with segment_file:
+            segment_file.seek(offset)
+            # Stop at the bytes the index covers; the writer may be halfway through the next line
+            remaining = index["bytes"] - offset
+            for line in segment_file:
+                remaining -= len(line)
+                if remaining < 0:
+                    break
+                if needle is not None and needle not in (line.lower() if fold_case else line) \
+                        or op_needle is not None and op_needle not in line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if since is not None and event["t"] < since:
+                    continue
+                if until is not None and event["t"] > until:
+                    break
+                if prefix is not None and not touches(event, prefix):
+                    continue
+                event.setdefault("user", index["user"])
+                event.setdefault("host", index["host"])
+                if user is not None and event["user"] != user:
+                    continue
+                yield event
+
+    def query(self, since=None, until=None, path=None, op=None, user=None, limit=None):
+        # Matching events from every writer, oldest first; path (absolute or company-relative) matches
+        # the file or folder and everything below it
+        self.flush()
+        if path is None:
+            prefix = None
+        elif os.path.isabs(path):
+            prefix = relative(path, self.root)
+        else:
+            prefix = path.replace("\\", "/").strip("/")
+        streams = [self.read_segment(index, since, until, prefix, op, user)
+                   for index in self.segments(since, until, prefix, user)]
+        events = []
+        for event in heapq.merge(*streams, key=lambda e: e["t"]):
+            events.append(event)
+            if limit and len(events) >= limit:
+                break
+        return events
+
+
+# Shared journal used by pmt_operations, the export queue and the CLI
+default_journal = Journal()
+
+
+def record(op, path, dest=None, ok=True, error=None, **details):
+    default_journal.record(op, path, dest, ok, error, **details)
+
+
+def operation(op, path, dest=None, **details):
+    return default_journal.operation(op, path, dest, **details)
+
+
+def query(since=None, until=None, path=None, op=None, user=None, limit=None):
+    return default_journal.query(since, until, path, op, user, limit)
+
+
+def compact():
+    return default_journal.compact()
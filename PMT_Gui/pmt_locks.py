@@ -0,0 +1,54 @@
+# Exclusive lock files for the background services
+#
+# A lock is an OS lock on an open file (msvcrt on Windows, flock elsewhere), so it is released by the OS
+# when the process holding it dies and a crash never leaves a stale lock behind. Byte-range locks also
+# work on the SMB share, so the same helper guards per-machine and shared folders.
+import os
+import time
+import errno
+from contextlib import contextmanager
+
+RETRY_INTERVAL = 0.05
+
+
+def lock_region(lock_file):
+    if os.name == "nt":
+        import msvcrt
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def acquire(path, timeout=0.0):
+    # Returns the open lock file; raises BlockingIOError if another process still holds it after timeout seconds
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    lock_file = open(path, "a+")
+    deadline = time.time() + timeout
+    while True:
+        try:
+            lock_region(lock_file)
+            return lock_file
+        except OSError:
+            if time.time() >= deadline:
+                lock_file.close()
+                raise BlockingIOError(errno.EWOULDBLOCK, "Locked by another process", path) from None
+            time.sleep(RETRY_INTERVAL)
+
+
+def release(lock_file):
+    if os.name == "nt":
+        import msvcrt
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+    lock_file.close()
+
+
+@contextmanager
+def locked(path, timeout=0.0):
+    lock_file = acquire(path, timeout)
+    try:
+        yield lock_file
+    finally:
+        release(lock_file)
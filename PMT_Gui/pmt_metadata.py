@@ -0,0 +1,391 @@
+# Shared metadata service for the company tree
+#
+# One MetadataServer (asyncio) keeps an index of every folder under the company folder and answers
+# newline-delimited JSON requests over TCP, so 50 workstations ask it instead of each walking the
+# share. After the first walk it only re-stats folders (one stat per folder) and re-lists the ones
+# whose mtime moved, then pushes the changed paths to subscribed clients. MetadataClient is the
+# blocking client used by the GUI with a small connection pool; list_dir() falls back to a direct
+# scan whenever the service isn't reachable.
+import os
+import json
+import time
+import queue
+import socket
+import asyncio
+import threading
+
+from pmt_config import COMPANY_PATH, METADATA_SERVICE_ADDRESS, METADATA_BIND_ADDRESS
+
+# Folders listed but never indexed inside; their contents churn and nobody browses them through PMT
+SKIPPED_FOLDERS = ['Temp', 'Version History', 'Journal']
+
+
+class ServiceUnavailable(Exception):
+    pass
+
+
+def scan_folder(path):
+    dirs = []
+    files = {}
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    dirs.append(entry.name)
+                else:
+                    stat = entry.stat()
+                    files[entry.name] = [stat.st_size, stat.st_mtime]
+            except OSError:
+                continue
+    return {"mtime": os.stat(path).st_mtime, "dirs": sorted(dirs), "files": files}
+
+
+def child_path(rel_path, name):
+    return f"{rel_path}/{name}" if rel_path else name
+
+
+class MetadataIndex:
+    # Maps "/"-separated paths relative to the root ("" is the root) to folder listings.
+    # The server reads self.folders on the event loop while refreshes run in executor threads, so refreshes
+    # work on a snapshot and return their updates ({path: listing, or None for a removed folder}), which the
+    # loop then applies.
+    def __init__(self, root):
+        self.root = root
+        self.folders = {}
+
+    def absolute(self, rel_path):
+        return os.path.join(self.root, *rel_path.split("/")) if rel_path else self.root
+
+    def scan_tree(self, rel_path, folders=None):
+        folders = self.folders if folders is None else folders
+        pending = [rel_path]
+        while pending:
+            current = pending.pop()
+            try:
+                entry = scan_folder(self.absolute(current))
+            except OSError:
+                continue
+            folders[current] = entry
+            pending.extend(child_path(current, d) for d in entry["dirs"] if d not in SKIPPED_FOLDERS)
+
+    def drop_tree(self, rel_path, folders, updates):
+        prefix = rel_path + "/"
+        for key in folders:
+            if key == rel_path or key.startswith(prefix):
+                updates[key] = None
+
+    def full_scan(self):
+        self.folders = {}
+        self.scan_tree("")
+        return list(self.folders)
+
+    def folder_updates(self, rel_path, folders, force=False):
+        # Re-list one folder of the snapshot if its mtime moved (or always with force)
+        updates = {}
+        old = folders.get(rel_path)
+        if old is None:
+            return updates
+        try:
+            mtime = os.stat(self.absolute(rel_path)).st_mtime
+        except OSError:
+            self.drop_tree(rel_path, folders, updates)
+            return updates
+        if mtime == old["mtime"] and not force:
+            return updates
+        try:
+            entry = scan_folder(self.absolute(rel_path))
+        except OSError:
+            return updates
+        if entry != old:
+            updates[rel_path] = entry
+        for name in set(old["dirs"]) - set(entry["dirs"]):
+            self.drop_tree(child_path(rel_path, name), folders, updates)
+        for name in set(entry["dirs"]) - set(old["dirs"]) - set(SKIPPED_FOLDERS):
+            self.scan_tree(child_path(rel_path, name), updates)
+        return updates
+
+    def updates(self, folders):
+        # Updates for every folder of the snapshot whose mtime changed
+        updates = {}
+        for rel_path in sorted(folders):
+            if rel_path not in updates:  # Already dropped with a removed parent
+                updates.update(self.folder_updates(rel_path, folders))
+        return updates
+
+    def apply(self, updates):
+        # Runs on the event loop; returns the changed folder paths. A listing older than the one already
+        # in the index (another refresh finished first) is ignored.
+        changed = []
+        for rel_path, entry in updates.items():
+            current = self.folders.get(rel_path)
+            if entry is None:
+                if self.folders.pop(rel_path, None) is not None:
+                    changed.append(rel_path)
+            elif current is None or current["mtime"] <= entry["mtime"]:
+                self.folders[rel_path] = entry
+                changed.append(rel_path)
+        return sorted(changed)
+
+    def walk(self, rel_path):
+        prefix = rel_path + "/" if rel_path else ""
+        return {k: v for k, v in list(self.folders.items()) if k == rel_path or k.startswith(prefix)}
+
+
+class MetadataServer:
+    def __init__(self, root=COMPANY_PATH, address=METADATA_BIND_ADDRESS, refresh_interval=5.0,
+                 full_rescan_interval=600.0):
+        # Folder mtimes don't move when a file is rewritten in place, so file sizes are refreshed by a slow full rescan
+        self.index = MetadataIndex(root)
+        self.address = address
+        self.refresh_interval = refresh_interval
+        self.full_rescan_interval = full_rescan_interval
+        self.subscribers = set()
+        self.server = None
+        self.tasks = []
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        started = time.time()
+        await loop.run_in_executor(None, self.index.full_scan)
+        print(f"Indexed {len(self.index.folders)} folders under {self.index.root} in {time.time() - started:.1f}s")
+        self.server = await asyncio.start_server(self.handle_client, *self.address)
+        self.tasks = [asyncio.create_task(self.refresh_loop())]
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        for writer in list(self.subscribers):
+            writer.close()
+
+    async def refresh_loop(self):
+        loop = asyncio.get_running_loop()
+        last_full_scan = time.time()
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                if time.time() - last_full_scan >= self.full_rescan_interval:
+                    # Build the new index off to the side so requests keep being answered from the old one
+                    fresh = MetadataIndex(self.index.root)
+                    await loop.run_in_executor(None, fresh.full_scan)
+                    changed = [k for k in set(fresh.folders) | set(self.index.folders)
+                               if fresh.folders.get(k) != self.index.folders.get(k)]
+                    self.index = fresh
+                    last_full_scan = time.time()
+                else:
+                    updates = await loop.run_in_executor(None, self.index.updates, dict(self.index.folders))
+                    changed = self.index.apply(updates)
+            except OSError as e:
+                # Usually the share dropping out for a moment; the old index keeps being served until the next pass
+                print(f"Failed to refresh the PMT metadata index: {e}")
+                continue
+            if changed:
+                await self.broadcast({"event": "changed", "paths": sorted(changed)})
+
+    async def broadcast(self, message):
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        for writer in list(self.subscribers):
+            try:
+                writer.write(data)
+                await writer.drain()
+            except (ConnectionError, OSError):
+                self.subscribers.discard(writer)
+
+    def dispatch(self, method, params):
+        path = params.get("path", "")
+        if method == "ping":
+            return {"root": self.index.root, "folders": len(self.index.folders)}
+        if method == "listdir":
+            entry = self.index.folders.get(path)
+            if entry is None:
+                raise FileNotFoundError(path)
+            return entry
+        if method == "walk":
+            return self.index.walk(path)
+        raise ValueError(f"Unknown method '{method}'")
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    params = request.get("params", {})
+                    if request.get("method") == "subscribe":
+                        self.subscribers.add(writer)
+                        response = {"id": request.get("id"), "result": True}
+                    elif request.get("method") == "listdir" and params.get("fresh"):
+                        # The client just changed this folder itself, so re-list it before answering
+                        loop = asyncio.get_running_loop()
+                        updates = await loop.run_in_executor(None, self.index.folder_updates, params.get("path", ""),
+                                                             dict(self.index.folders), True)
+                        changed = self.index.apply(updates)
+                        if changed:
+                            await self.broadcast({"event": "changed", "paths": changed})
+                        response = {"id": request.get("id"), "result": self.dispatch("listdir", params)}
+                    else:
+                        response = {"id": request.get("id"), "result": self.dispatch(request["method"], params)}
+                except FileNotFoundError as e:
+                    response = {"id": request.get("id"), "error": "not_found", "message": str(e)}
+                except (ValueError, KeyError) as e:
+                    response = {"id": None, "error": "bad_request", "message": str(e)}
+                writer.write((json.dumps(response) + "\n").encode("utf-8"))
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.subscribers.discard(writer)
+            writer.close()
+
+
+class MetadataClient:
+    def __init__(self, address=METADATA_SERVICE_ADDRESS, root=COMPANY_PATH, pool_size=4, timeout=2.0, retry_after=30.0):
+        self.address = address
+        self.root = os.path.normcase(os.path.abspath(root))
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.pool = queue.LifoQueue(maxsize=pool_size)
+        self.unavailable_until = 0
+        self.dirty = set()
+        self.next_id = 0
+        self.lock = threading.Lock()
+
+    def relative(self, path):
+        # Company-relative "/" path, or None for paths outside the indexed tree
+        path = os.path.normcase(os.path.abspath(path))
+        if path != self.root and not path.startswith(self.root + os.sep):
+            return None
+        rel_path = os.path.relpath(path, self.root)
+        return "" if rel_path == "." else rel_path.replace(os.sep, "/")
+
+    def connect(self):
+        sock = socket.create_connection(self.address, timeout=self.timeout)
+        return sock, sock.makefile("rwb")
+
+    def acquire(self):
+        try:
+            return self.pool.get_nowait()
+        except queue.Empty:
+            return self.connect()
+
+    def release(self, connection):
+        try:
+            self.pool.put_nowait(connection)
+        except queue.Full:
+            self.close(connection)
+
+    def close(self, connection):
+        sock, stream = connection
+        try:
+            stream.close()  # Flushes anything unsent, which fails on a broken connection
+        except OSError:
+            pass
+        sock.close()
+
+    def request(self, method, **params):
+        # Don't keep paying the connect timeout while the service is down
+        if time.time() < self.unavailable_until:
+            raise ServiceUnavailable("Metadata service is not running")
+        with self.lock:
+            self.next_id += 1
+            request_id = self.next_id
+        connection = None
+        try:
+            connection = self.acquire()
+            stream = connection[1]
+            stream.write((json.dumps({"id": request_id, "method": method, "params": params}) + "\n").encode("utf-8"))
+            stream.flush()
+            line = stream.readline()
+            if not line:
+                raise ConnectionError("Metadata service closed the connection")
+            response = json.loads(line)
+        except (OSError, ValueError) as e:
+            # A connection that failed mid-request can't go back to the pool
+            if connection is not None:
+                self.close(connection)
+            self.unavailable_until = time.time() + self.retry_after
+            raise ServiceUnavailable(str(e))
+        self.release(connection)
+        if response.get("error") == "not_found":
+            raise FileNotFoundError(response.get("message"))
+        if "error" in response:
+            raise ServiceUnavailable(response.get("message"))
+        return response["result"]
+
+    def listdir(self, path):
+        rel_path = self.relative(path)
+        if rel_path is None:
+            raise ServiceUnavailable(f"{path} is outside the indexed tree")
+        with self.lock:
+            fresh = rel_path in self.dirty
+            self.dirty.discard(rel_path)
+        return self.request("listdir", path=rel_path, fresh=fresh)
+
+    def invalidate(self, path):
+        # Called after this process changes a folder so the next listing doesn't wait for the service's refresh
+        rel_path = self.relative(path)
+        if rel_path is not None:
+            with self.lock:
+                self.dirty.add(rel_path)
+
+    def subscribe(self, callback):
+        # Call callback(absolute_paths) from a background thread whenever the service reports changes
+        def listen():
+            while True:
+                try:
+                    sock, stream = self.connect()
+                    sock.settimeout(None)
+                    stream.write((json.dumps({"id": 0, "method": "subscribe"}) + "\n").encode("utf-8"))
+                    stream.flush()
+                    for line in stream:
+                        message = json.loads(line)
+                        if message.get("event") == "changed":
+                            callback([os.path.join(self.root, *p.split("/")) if p else self.root for p in message["paths"]])
+                except (OSError, ValueError):
+                    pass
+                time.sleep(self.retry_after)
+
+        thread = threading.Thread(target=listen, daemon=True)
+        thread.start()
+        return thread
+
+
+# Shared client used by list_dir() and the GUI
+default_client = MetadataClient()
+
+
+def list_dir(path):
+    # (dirs, files) for a folder, from the metadata service when it's running, otherwise from disk
+    try:
+        entry = default_client.listdir(path)
+        return entry["dirs"], sorted(entry["files"])
+    except (ServiceUnavailable, FileNotFoundError):
+        pass  # not running, or a folder it doesn't index
+    dirs = []
+    files = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            (dirs if entry.is_dir() else files).append(entry.name)
+    return sorted(dirs), sorted(files)
+
+
+def invalidate(*paths):
+    for path in paths:
+        default_client.invalidate(path)
+
+
+def list_subfolders(path):
+    return list_dir(path)[0]
+
+
+def list_files(path):
+    return list_dir(path)[1]
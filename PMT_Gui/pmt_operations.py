@@ -0,0 +1,225 @@
+# PMT file operations without any Qt
+#
+# Everything the GUI does to projects and Maya files (create, copy, rename, delete, archive) lives
+# here so the GUI slots, the CLI and the RPC service (pmt_service) run the same code. Each function
+# does the work, records versions and tells the metadata service which folders changed; errors are
+# raised (OSError, ValueError) for the caller to show however it shows errors. Long operations take
+# an optional progress(done, total, name) callback. Every operation is recorded in the journal
+# (pmt_journal), failed ones with their error.
+import os
+import shutil
+
+import pmt_archive
+import pmt_journal
+import pmt_metadata
+import pmt_references
+import pmt_templates
+import pmt_versions
+from pmt_config import PMT_PROJECTS_PATH, ARCHIVED_PROJECTS_PATH, DEPARTMENT_ASSETS_PATH
+
+MAYA_EXTENSIONS = ('.ma', '.mb')
+MAYA_FILE_HEADER = "//Maya ASCII 2023 scene\n"
+# Folders inside "PMT Projects" that aren't projects; "."-prefixed ones (pmt_templates.STAGING_FOLDER) are hidden too
+NON_PROJECT_FOLDERS = ['Project Assets', 'Tools']
+# Asset libraries Maya files may be created, copied, renamed and deleted in, besides the projects
+ASSET_LIBRARIES = [DEPARTMENT_ASSETS_PATH, os.path.join(PMT_PROJECTS_PATH, 'Project Assets')]
+
+
+def check_name(name, what="name"):
+    # New names come from users and scripts; keep them to a single path component
+    if not name or name in ('.', '..') or '/' in name or '\\' in name:
+        raise ValueError(f"Invalid {what}: '{name}'")
+    return name
+
+
+def check_project_path(project_path, projects_path=PMT_PROJECTS_PATH):
+    # Project operations move and delete whole folders; only ever let them touch a project folder itself
+    project_path = os.path.abspath(project_path)
+    name = os.path.basename(project_path)
+    if os.path.normcase(os.path.dirname(project_path)) != os.path.normcase(os.path.abspath(projects_path)) \
+            or name in NON_PROJECT_FOLDERS or name.startswith('.'):
+        raise ValueError(f"Not a project folder: {project_path}")
+    return project_path
+
+
+def is_inside(path, folder):
+    return os.path.normcase(path).startswith(os.path.normcase(os.path.abspath(folder)) + os.sep)
+
+
+def check_maya_file(file_path, projects_path=PMT_PROJECTS_PATH, libraries=None):
+    # The file operations are exposed over RPC; keep them to Maya files in a project or an asset library,
+    # so they can never touch the journal, the version history or the Temp janitor's files
+    file_path = os.path.abspath(file_path)
+    if not file_path.lower().endswith(MAYA_EXTENSIONS):
+        raise ValueError(f"Not a Maya file: {file_path}")
+    if any(is_inside(file_path, library) for library in libraries or ASSET_LIBRARIES):
+        return file_path
+    if is_inside(file_path, projects_path):
+        project_path = os.path.join(os.path.abspath(projects_path),
+                                    os.path.relpath(file_path, os.path.abspath(projects_path)).split(os.sep)[0])
+        if project_path != file_path:  # A file loose in "PMT Projects" isn't in a project
+            check_project_path(project_path, projects_path)
+            return file_path
+    raise ValueError(f"Not inside a project or an asset library: {file_path}")
+
+
+def list_projects(projects_path=PMT_PROJECTS_PATH):
+    return [d for d in pmt_metadata.list_subfolders(projects_path) if d not in NON_PROJECT_FOLDERS and not d.startswith('.')]
+
+
+def list_source_folders(project_path):
+    return pmt_metadata.list_subfolders(os.path.join(project_path, 'Source'))
+
+
+def list_maya_files(folder_path, extensions=MAYA_EXTENSIONS):
+    return [f for f in pmt_metadata.list_files(folder_path) if f.endswith(tuple(extensions))]
+
+
+def create_project(project_name, template=pmt_templates.DEFAULT_TEMPLATE, projects_path=PMT_PROJECTS_PATH,
+                   mode=pmt_templates.MODE_AUTO, workers=None, progress=None):
+    check_name(project_name, "project name")
+    check_name(template, "template")
+    with pmt_journal.operation("create_project", os.path.join(projects_path, project_name), template=template):
+        summary = pmt_templates.create_project(project_name, template, projects_path=projects_path, mode=mode,
+                                               workers=workers, progress=progress)
+    pmt_metadata.invalidate(projects_path)
+    return summary
+
+
+def rename_references(old_path, new_path, processes=True, progress=None):
+    # Rename old_path and fix every scene that referenced it; returns the number of scenes rewritten
+    rewritten = pmt_references.ReferenceRewriter(processes=processes).rename(old_path, new_path, progress=progress)
+    pmt_metadata.invalidate(*{os.path.dirname(scene) for scene, _ in rewritten})
+    if rewritten:
+        print(f"Rewrote references to {old_path} in {len(rewritten)} scene(s)")
+    return len(rewritten)
+
+
+def rename_project(project_path, new_project_name, processes=True, progress=None):
+    # processes=False keeps the reference rewrite in this process (the GUI can't start worker processes)
+    project_path = check_project_path(project_path)
+    check_name(new_project_name, "project name")
+    new_project_path = os.path.join(os.path.dirname(project_path), new_project_name)
+    if os.path.exists(new_project_path):
+        raise FileExistsError(f"Project '{new_project_name}' already exists")
+    with pmt_journal.operation("rename_project", project_path, new_project_path) as details:
+        details["scenes_rewritten"] = rename_references(project_path, new_project_path, processes, progress)
+    pmt_versions.move(project_path, new_project_path)
+    pmt_metadata.invalidate(os.path.dirname(project_path))
+    return new_project_path
+
+
+def delete_project(project_path):
+    project_path = check_project_path(project_path)
+    if not os.path.isdir(project_path):
+        raise FileNotFoundError(f"Project folder does not exist: {project_path}")
+    with pmt_journal.operation("delete_project", project_path):
+        shutil.rmtree(project_path, onerror=pmt_templates.clear_readonly)
+    pmt_metadata.invalidate(os.path.dirname(project_path))
+
+
+def archive_project(project_path, archive_folder=ARCHIVED_PROJECTS_PATH, remove=False, overwrite=False,
+                    level=pmt_archive.DEFAULT_LEVEL, workers=None, progress=None):
+    # Returns the archive's size summary; the member list stays in the archive's index file.
+    # An existing archive of the project is only replaced with overwrite=True.
+    project_path = check_project_path(project_path)
+    project_name = os.path.basename(project_path)
+    archive_path = os.path.join(archive_folder, project_name + pmt_archive.ARCHIVE_EXTENSION)
+    if os.path.exists(archive_path) and not overwrite:
+        raise FileExistsError(f"Archive already exists: {archive_path}")
+    with pmt_journal.operation("archive_project", project_path, archive_path, removed=remove) as details:
+        index = pmt_archive.archive_project(project_path, archive_path, level=level, workers=workers, progress=progress)
+        details["size"] = index["compressed_size"]
+        if remove:
+            shutil.rmtree(project_path, onerror=pmt_templates.clear_readonly)
+    if remove:
+        pmt_metadata.invalidate(os.path.dirname(project_path))
+    return {"archive_path": archive_path, "original_size": index["original_size"],
+            "compressed_size": index["compressed_size"], "members": len(index["members"]), "removed": remove}
+
+
+def restore_project(archive_path, destination=PMT_PROJECTS_PATH, progress=None):
+    # Restores an archived project as a new folder in destination; an existing project is never written over.
+    # The archive is unpacked in the staging folder and renamed into place once complete, like a new project.
+    try:
+        index = pmt_archive.load_index(archive_path)
+        project_name, total = index["project"], len(index["members"])
+    except (OSError, ValueError, KeyError):
+        project_name, total = os.path.basename(archive_path)[:-len(pmt_archive.ARCHIVE_EXTENSION)], 0
+    check_name(project_name, "project name")
+    project_path = os.path.join(destination, project_name)
+    if os.path.exists(project_path):
+        raise FileExistsError(f"Project folder already exists: {project_path}")
+    staging_path = os.path.join(destination, pmt_templates.STAGING_FOLDER, f"{project_name}.{os.getpid()}")
+    report = (lambda done, name: progress(done, total, name)) if progress else None
+    with pmt_journal.operation("restore_project", archive_path, project_path) as details:
+        try:
+            details["entries"] = pmt_archive.restore_project(archive_path, staging_path, report)
+            os.rename(os.path.join(staging_path, project_name), project_path)
+        finally:
+            if os.path.exists(staging_path):
+                shutil.rmtree(staging_path, onerror=pmt_templates.clear_readonly)
+    # Start the history of the restored scenes, so later edits can be compared against the archived state
+    for folder, dirs, files in os.walk(project_path):
+        for name in files:
+            if name.lower().endswith(MAYA_EXTENSIONS):
+                pmt_versions.record(os.path.join(folder, name), 'restore')
+    pmt_metadata.invalidate(destination)
+    return {"project_path": project_path, "entries": details["entries"]}
+
+
+def create_maya_file(folder_path, file_name, header=MAYA_FILE_HEADER):
+    # file_name is given without the .ma extension, like the GUI asks for it
+    check_name(file_name, "file name")
+    file_path = check_maya_file(os.path.join(folder_path, file_name + '.ma'))
+    pmt_versions.record(file_path, 'overwrite')
+    with pmt_journal.operation("create_file", file_path):
+        with open(file_path, 'w') as file:
+            file.write(header)
+    pmt_versions.record(file_path, 'create')
+    pmt_metadata.invalidate(folder_path)
+    return file_path
+
+
+def copy_maya_file(source_path, destination_folder, overwrite=False):
+    # The source only has to be a Maya file; it is read, never changed
+    if not source_path.lower().endswith(MAYA_EXTENSIONS):
+        raise ValueError(f"Not a Maya file: {source_path}")
+    if not os.path.isdir(destination_folder):
+        raise FileNotFoundError(f"Destination folder does not exist: {destination_folder}")
+    destination_path = check_maya_file(os.path.join(destination_folder, os.path.basename(source_path)))
+    if os.path.exists(destination_path):
+        if not overwrite:
+            raise FileExistsError(f"File already exists: {destination_path}")
+        pmt_versions.record(destination_path, 'overwrite')  # Keep the file being replaced
+    with pmt_journal.operation("copy_file", source_path, destination_path):
+        shutil.copy(source_path, destination_path)
+    pmt_versions.record(destination_path, 'copy')
+    pmt_metadata.invalidate(destination_folder)
+    return destination_path
+
+
+def rename_maya_file(file_path, new_file_name, processes=True, progress=None):
+    # new_file_name includes the extension
+    file_path = check_maya_file(file_path)
+    check_name(new_file_name, "file name")
+    new_file_path = check_maya_file(os.path.join(os.path.dirname(file_path), new_file_name))
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"File does not exist: {file_path}")
+    # A case-only rename finds the file itself on case-insensitive filesystems
+    if os.path.exists(new_file_path) and not os.path.samefile(file_path, new_file_path):
+        raise FileExistsError(f"File already exists: {new_file_path}")
+    pmt_versions.record(file_path, 'rename')
+    with pmt_journal.operation("rename_file", file_path, new_file_path) as details:
+        details["scenes_rewritten"] = rename_references(file_path, new_file_path, processes, progress)
+    pmt_versions.move(file_path, new_file_path)
+    pmt_metadata.invalidate(os.path.dirname(file_path))
+    return new_file_path
+
+
+def delete_maya_file(file_path):
+    file_path = check_maya_file(file_path)
+    pmt_versions.record(file_path, 'delete')  # Deleted files can still be restored from their history
+    with pmt_journal.operation("delete_file", file_path):
+        os.remove(file_path)
+    pmt_metadata.invalidate(os.path.dirname(file_path))
@@ -0,0 +1,361 @@
+# Rewrite path references in .ma scenes when a project or Maya file is renamed
+#
+# A rename used to break every scene that referenced the old path. ReferenceRewriter finds the scenes
+# that mention the old location and rewrites their quoted path strings (file references, texture and
+# cache paths) to the new one: absolute paths in any scene, project-relative paths in scenes of the same
+# project and bare file names in scenes of the same folder. A per-machine reference index keeps, for
+# each scene (keyed by its size and mtime, so any write makes the entry stale), every quoted string a
+# rewrite could touch that is a path or a Maya file name; a rename reads only the scenes whose entry is
+# stale or mentions the old path. Old paths the index can't answer for (neither a path nor a Maya file
+# name) fall back to checking every scene. Candidate scenes are checked in large chunks for the raw old
+# path and only those with a match are rewritten, line by line, into a temp file next to them, so a
+# multi-hundred-MB scene is never held in memory. Indexing and rewriting run in a process pool.
+# Rewritten files replace the originals (os.replace) only once every scene is ready, with a hardlink
+# backup of each original; if a replace or the rename itself fails, everything is rolled back.
+import os
+import re
+import json
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pmt_validate
+from pmt_config import PMT_PROJECTS_PATH, DEPARTMENT_ASSETS_PATH, REFERENCE_INDEX_PATH
+
+# Folders never searched for scenes that reference a renamed path
+SKIPPED_FOLDERS = ['Temp', 'Tools', 'Version History']
+
+TEMP_SUFFIX = ".pmtrefs.tmp"
+BACKUP_SUFFIX = ".pmtrefs.bak"
+CHUNK_SIZE = 1024 * 1024
+# Maya adds {n} to the second and later references to the same file
+COPY_NUMBER = re.compile(r"\{\d+\}$")
+# Quoted strings without a "/" are only indexed when they name a Maya file
+INDEXED_EXTENSIONS = ('.ma', '.mb')
+
+
+def forward(path):
+    return os.path.normpath(path).replace("\\", "/")
+
+
+def escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def moved(path, old_path, new_path):
+    # Where path ends up once old_path has been renamed to new_path
+    if path == old_path or path.startswith(old_path + os.sep):
+        return new_path + path[len(old_path):]
+    return path
+
+
+def matches(value, old):
+    # value and old use forward slashes; Windows paths compare case-insensitively
+    value = value.lower()
+    old = old.lower()
+    return value == old or value.startswith(old + "/")
+
+
+def normalize(value):
+    # A quoted .ma string the way the index keeps it: unescaped, without Maya's copy number, "/" separated, lowercase
+    text = pmt_validate.unescape(value)
+    copy_number = COPY_NUMBER.search(text)
+    if copy_number:
+        text = text[:copy_number.start()]
+    return text.replace("\\", "/").lower()
+
+
+def indexable(old):
+    # Whether the index can rule a scene out for this old path
+    return "/" in old or old.lower().endswith(INDEXED_EXTENSIONS)
+
+
+def scene_references(path):
+    # (path, size, mtime, indexed strings), or None if the scene is gone; runs in the worker processes.
+    # Stat first, so a write during the read leaves the entry stale rather than wrong.
+    try:
+        stat = os.stat(path)
+        references = set()
+        with open(path, "rb") as scene_file:
+            for raw in scene_file:
+                if b'"' not in raw:
+                    continue
+                for match in pmt_validate.QUOTED.finditer(raw.decode("utf-8", errors="surrogateescape")):
+                    value = normalize(match.group(1))
+                    if "/" in value or value.endswith(INDEXED_EXTENSIONS):
+                        references.add(value)
+    except FileNotFoundError:
+        return None
+    return path, stat.st_size, stat.st_mtime, sorted(references)
+
+
+class ReferenceIndex:
+    def __init__(self, path=REFERENCE_INDEX_PATH):
+        self.path = path
+        self.scenes = self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as index_file:
+                index = json.load(index_file)
+            if index.get("version") == 1:
+                return index["scenes"]
+        except (OSError, ValueError, KeyError):
+            pass
+        return {}
+
+    def save(self):
+        folder = os.path.dirname(self.path)
+        os.makedirs(folder, exist_ok=True)
+        # A temp file per save, so PMT processes saving at the same time don't write into each other's
+        fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(self.path) + ".", suffix=".tmp", dir=folder)
+        try:
+            with os.fdopen(fd, "w") as index_file:
+                json.dump({"version": 1, "scenes": self.scenes}, index_file)
+            os.replace(temp_path, self.path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def lookup(self, scene):
+        # The scene's indexed strings, or None when it has changed since it was indexed
+        entry = self.scenes.get(scene)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(scene)
+        except OSError:
+            return None
+        return entry[2] if entry[0] == stat.st_size and entry[1] == stat.st_mtime else None
+
+    def update(self, scene, size, mtime, references):
+        self.scenes[scene] = [size, mtime, references]
+
+    def move(self, old_path, new_path):
+        # A rename keeps size and mtime, so the entries stay valid under their new paths
+        for scene in [s for s in self.scenes if moved(s, old_path, new_path) != s]:
+            self.scenes[moved(scene, old_path, new_path)] = self.scenes.pop(scene)
+
+    def prune(self, roots, scenes):
+        # Forget scenes under roots that no longer exist
+        listed = set(scenes)
+        roots = [os.path.abspath(r) + os.sep for r in roots]
+        for scene in [s for s in self.scenes if s not in listed and any(s.startswith(r) for r in roots)]:
+            del self.scenes[scene]
+
+
+def rewrite_value(value, replacements):
+    # New escaped value for a quoted .ma string, or None when it doesn't point under an old path
+    text = pmt_validate.unescape(value)
+    copy_number = COPY_NUMBER.search(text)
+    suffix = copy_number.group() if copy_number else ""
+    text = text[:len(text) - len(suffix)]
+    normalized = text.replace("\\", "/")
+    for old, new in replacements:
+        if matches(normalized, old):
+            result = new + normalized[len(old):]
+            if "\\" in text and "/" not in text:
+                result = result.replace("/", "\\")  # Keep the separator style the scene used
+            return escape(result + suffix)
+    return None
+
+
+def search_pattern(replacements):
+    # Raw bytes any mention of an old path contains, whichever separator and escaping the scene used
+    variants = set()
+    for old, _ in replacements:
+        for separator in ("/", "\\", "\\\\"):
+            variants.add(re.escape(old.replace("/", separator).encode("utf-8")))
+    return re.compile(b"|".join(sorted(variants, key=len, reverse=True)), re.IGNORECASE)
+
+
+def contains(path, pattern, overlap):
+    with open(path, "rb") as scene_file:
+        tail = b""
+        while True:
+            chunk = scene_file.read(CHUNK_SIZE)
+            if not chunk:
+                return False
+            if pattern.search(tail + chunk):
+                return True
+            tail = chunk[-overlap:]
+
+
+def rewrite_scene(path, replacements, write=True):
+    # Returns (path, temp path or None, strings rewritten); runs in the worker processes
+    pattern = search_pattern(replacements)
+    try:
+        if not contains(path, pattern, max(len(old) for old, _ in replacements) * 2):
+            return path, None, 0
+    except FileNotFoundError:
+        return path, None, 0  # Deleted since the scenes were listed
+
+    count = 0
+
+    def replace(match):
+        nonlocal count
+        new_value = rewrite_value(match.group(1), replacements)
+        if new_value is None:
+            return match.group(0)
+        count += 1
+        return f'"{new_value}"'
+
+    temp_path = path + TEMP_SUFFIX
+    try:
+        with open(path, "rb") as scene_file, open(temp_path if write else os.devnull, "wb") as out:
+            for raw in scene_file:
+                if pattern.search(raw):
+                    # surrogateescape keeps any bytes that aren't UTF-8 exactly as they were
+                    line = raw.decode("utf-8", errors="surrogateescape")
+                    raw = pmt_validate.QUOTED.sub(replace, line).encode("utf-8", errors="surrogateescape")
+                out.write(raw)
+        if write and count:
+            shutil.copymode(path, temp_path)
+    except BaseException:
+        if write and os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    if write and not count:
+        os.remove(temp_path)
+    return path, temp_path if write and count else None, count
+
+
+def find_scenes(roots):
+    scenes = []
+    for root in roots:
+        for folder, dirs, files in os.walk(root):
+            dirs[:] = sorted(d for d in dirs if d not in SKIPPED_FOLDERS)
+            scenes.extend(os.path.join(folder, f) for f in sorted(files) if f.lower().endswith(".ma"))
+    return scenes
+
+
+def project_root(path, projects_path=PMT_PROJECTS_PATH):
+    # The project folder path is in, or None outside "PMT Projects/<project>"
+    rel_path = os.path.relpath(os.path.abspath(path), os.path.abspath(projects_path))
+    if rel_path.startswith("..") or rel_path == ".":
+        return None
+    return os.path.join(os.path.abspath(projects_path), rel_path.split(os.sep)[0])
+
+
+class ReferenceRewriter:
+    def __init__(self, workers=None, processes=True, roots=None, projects_path=PMT_PROJECTS_PATH,
+                 index_path=REFERENCE_INDEX_PATH):
+        # processes=False uses threads, for callers (the GUI) that can't start worker processes
+        self.workers = workers or os.cpu_count() or 1
+        self.processes = processes
+        self.roots = roots or [projects_path, DEPARTMENT_ASSETS_PATH]
+        self.projects_path = projects_path
+        self.index = ReferenceIndex(index_path)
+
+    def executor(self, count):
+        executor = ProcessPoolExecutor if self.processes and count > 1 else ThreadPoolExecutor
+        return executor(max_workers=min(self.workers, count))
+
+    def refresh_index(self, scenes):
+        # Read the scenes whose entry is missing or stale; returns the scenes that still exist
+        stale = [s for s in scenes if self.index.lookup(s) is None]
+        gone = set()
+        if stale:
+            with self.executor(len(stale)) as pool:
+                for scene, result in zip(stale, pool.map(scene_references, stale)):
+                    if result is None:
+                        gone.add(scene)
+                    else:
+                        self.index.update(*result)
+        self.index.prune(self.roots, scenes)
+        try:
+            self.index.save()
+        except OSError as e:
+            print(f"Failed to save the reference index: {e}")
+        return [s for s in scenes if s not in gone]
+
+    def replacements_for(self, scene, old_path, new_path):
+        replacements = [(forward(os.path.abspath(old_path)), forward(os.path.abspath(new_path)))]
+        project = project_root(old_path, self.projects_path)
+        if project and project != os.path.abspath(old_path) and project_root(scene, self.projects_path) == project:
+            replacements.append((forward(os.path.relpath(old_path, project)), forward(os.path.relpath(new_path, project))))
+        if os.path.dirname(os.path.abspath(scene)) == os.path.dirname(os.path.abspath(old_path)):
+            replacements.append((os.path.basename(old_path), os.path.basename(new_path)))
+        return replacements
+
+    def plan(self, old_path, new_path):
+        # [(scene, replacements)] for every scene that may mention old_path; run() reads each one for a match
+        plan = []
+        for scene in self.refresh_index(find_scenes(self.roots)):
+            replacements = self.replacements_for(scene, old_path, new_path)
+            references = self.index.lookup(scene)
+            if references is not None and all(indexable(old) for old, _ in replacements) \
+                    and not any(matches(r, old) for r in references for old, _ in replacements):
+                continue
+            plan.append((scene, replacements))
+        return plan
+
+    def run(self, plan, write, progress=None):
+        if not plan:
+            return []
+        results = []
+        with self.executor(len(plan)) as pool:
+            futures = [pool.submit(rewrite_scene, scene, replacements, write) for scene, replacements in plan]
+            try:
+                for future in futures:
+                    results.append(future.result())
+                    if progress:
+                        progress(len(results), len(plan), results[-1][0])
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                # Remove the temp files of the scenes that did finish
+                for future in futures:
+                    if not future.cancelled() and future.exception() is None and future.result()[1]:
+                        os.remove(future.result()[1])
+                raise
+        return [r for r in results if r[2]]
+
+    def find(self, old_path, new_path, progress=None):
+        # Dry run: [(scene, strings that would be rewritten)]
+        return [(scene, count) for scene, _, count in self.run(self.plan(old_path, new_path), False, progress)]
+
+    def rename(self, old_path, new_path, rename=os.rename, progress=None):
+        # Rewrite every reference, then rename; returns [(scene path after the rename, strings rewritten)]
+        old_path = os.path.abspath(old_path)
+        new_path = os.path.abspath(new_path)
+        prepared = self.run(self.plan(old_path, new_path), True, progress)
+
+        committed = []
+        try:
+            for scene, temp_path, count in prepared:
+                backup_path = scene + BACKUP_SUFFIX
+                if os.path.exists(backup_path):
+                    os.remove(backup_path)  # Left over from an interrupted rename
+                try:
+                    os.link(scene, backup_path)
+                except OSError:
+                    shutil.copy2(scene, backup_path)  # Filesystems without hardlinks
+                os.replace(temp_path, scene)
+                committed.append((scene, backup_path))
+            rename(old_path, new_path)
+        except BaseException:
+            for scene, backup_path in reversed(committed):
+                os.replace(backup_path, scene)
+            for scene, temp_path, _ in prepared:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            raise
+
+        for scene, backup_path in committed:
+            try:
+                os.remove(moved(backup_path, old_path, new_path))
+            except OSError as e:
+                print(f"Failed to remove backup {backup_path}: {e}")
+        # Keep the index current: scenes that moved keep their entries, rewritten ones are indexed again
+        self.index.move(old_path, new_path)
+        for scene, _, _ in prepared:
+            result = scene_references(moved(scene, old_path, new_path))
+            if result is not None:
+                self.index.update(*result)
+        try:
+            self.index.save()
+        except OSError as e:
+            print(f"Failed to save the reference index: {e}")
+        return [(moved(scene, old_path, new_path), count) for scene, _, count in prepared]
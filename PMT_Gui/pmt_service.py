@@ -0,0 +1,347 @@
+# PMT operations over HTTP for pipeline tools
+#
+# ServiceServer (asyncio) exposes pmt_operations as JSON-RPC 2.0 over plain HTTP: POST /rpc with a
+# single request or a batch (a JSON list), GET /methods for the method names. The requests in a batch
+# run concurrently. Operations run on a thread pool, behind a limit on the total running at once and
+# tighter per-method limits (one archive at a time), so a render farm can't swamp the file server.
+# A client sending "Accept: application/x-ndjson" gets a chunked stream instead: "progress"
+# notifications while long operations run, then each response as soon as it is ready. Paths in params
+# are relative to the company folder; absolute paths must be inside it and can't be the company folder
+# itself. ServiceClient is the blocking client for farm and build scripts.
+import os
+import hmac
+import json
+import time
+import inspect
+import asyncio
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+
+import pmt_operations
+import pmt_templates
+from pmt_config import COMPANY_PATH, SERVICE_ADDRESS, SERVICE_TOKEN
+
+# JSON-RPC 2.0 error codes, plus our own in the server error range
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+OPERATION_FAILED = -32000
+NOT_FOUND = -32001
+ALREADY_EXISTS = -32002
+
+METHODS = {
+    "list_projects": pmt_operations.list_projects,
+    "list_source_folders": pmt_operations.list_source_folders,
+    "list_maya_files": pmt_operations.list_maya_files,
+    "list_templates": pmt_templates.list_templates,
+    "create_project": pmt_operations.create_project,
+    "rename_project": pmt_operations.rename_project,
+    "delete_project": pmt_operations.delete_project,
+    "archive_project": pmt_operations.archive_project,
+    "restore_project": pmt_operations.restore_project,
+    "create_maya_file": pmt_operations.create_maya_file,
+    "copy_maya_file": pmt_operations.copy_maya_file,
+    "rename_maya_file": pmt_operations.rename_maya_file,
+    "delete_maya_file": pmt_operations.delete_maya_file,
+}
+
+# How many calls of these methods may run at once, on top of the server-wide limit
+METHOD_LIMITS = {"archive_project": 1, "restore_project": 1, "create_project": 2, "delete_project": 2}
+
+# Params holding paths; they are resolved against the company folder and must stay inside it
+PATH_PARAMS = {"projects_path", "project_path", "folder_path", "source_path", "destination_folder", "file_path",
+               "archive_folder", "templates_path", "archive_path", "destination"}
+
+NDJSON = "application/x-ndjson"
+# At most one progress notification per call in this many seconds (plus the last one)
+PROGRESS_INTERVAL = 0.25
+MAX_BODY_SIZE = 16 * 1024 * 1024
+REASONS = {200: "OK", 204: "No Content", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+class ServiceError(Exception):
+    def __init__(self, code, message, data=None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
+def error_response(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class ServiceServer:
+    def __init__(self, address=SERVICE_ADDRESS, root=COMPANY_PATH, max_concurrent=4, token=SERVICE_TOKEN, methods=None):
+        self.address = address
+        self.root = os.path.normpath(os.path.abspath(root))
+        self.max_concurrent = max_concurrent
+        self.token = token
+        self.methods = methods or METHODS
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent)
+        self.server = None
+        self.port = None
+        self.limit = None
+        self.method_limits = {}
+
+    async def start(self):
+        # Semaphores are made here so they belong to the running loop
+        self.limit = asyncio.Semaphore(self.max_concurrent)
+        self.method_limits = {m: asyncio.Semaphore(n) for m, n in METHOD_LIMITS.items()}
+        self.server = await asyncio.start_server(self.handle_client, *self.address)
+        # Port 0 picks a free port, which is what tests want
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+    def resolve(self, path):
+        if not isinstance(path, str):
+            raise ValueError(f"Expected a path, got {path!r}")
+        full_path = os.path.normpath(path if os.path.isabs(path) else os.path.join(self.root, path))
+        root = os.path.normcase(self.root)
+        if not os.path.normcase(full_path).startswith(root + os.sep):
+            raise ValueError(f"Path is outside the company folder: {path}")
+        return full_path
+
+    def authorized(self, headers):
+        # Constant-time comparison so the token can't be guessed from response times
+        expected = f"Bearer {self.token}".encode("utf-8")
+        return hmac.compare_digest(headers.get("authorization", "").encode("utf-8"), expected)
+
+    async def run(self, method, params, request_id, send_event):
+        function = self.methods[method]
+        kwargs = {k: self.resolve(v) if k in PATH_PARAMS else v for k, v in params.items()}
+        signature = inspect.signature(function)
+        if "progress" in kwargs:
+            raise ServiceError(INVALID_PARAMS, "'progress' can't be passed as a param")
+        if "progress" in signature.parameters and send_event:
+            loop = asyncio.get_running_loop()
+            last_sent = [0.0]
+
+            def progress(done, total, name):
+                # Called from the worker thread
+                now = time.monotonic()
+                if done < total and now - last_sent[0] < PROGRESS_INTERVAL:
+                    return
+                last_sent[0] = now
+                event = {"jsonrpc": "2.0", "method": "progress",
+                         "params": {"id": request_id, "method": method, "done": done, "total": total, "name": name}}
+                loop.call_soon_threadsafe(send_event, event)
+
+            kwargs["progress"] = progress
+        try:
+            signature.bind(**kwargs)
+        except TypeError as e:
+            raise ServiceError(INVALID_PARAMS, str(e))
+
+        # Wait for the method's own limit first so queued archives don't hold server-wide slots
+        method_limit = self.method_limits.get(method)
+        if method_limit:
+            await method_limit.acquire()
+        try:
+            async with self.limit:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.executor, lambda: function(**kwargs))
+        finally:
+            if method_limit:
+                method_limit.release()
+
+    async def call(self, request, send_event=None):
+        # Returns the response, or None for a notification (a request without an id)
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" or not isinstance(request.get("method"), str):
+            return error_response(None, INVALID_REQUEST, "Invalid request")
+        request_id = request.get("id")
+        method = request["method"]
+        params = request.get("params", {})
+        try:
+            if method not in self.methods:
+                raise ServiceError(METHOD_NOT_FOUND, f"Unknown method '{method}'")
+            if not isinstance(params, dict):
+                raise ServiceError(INVALID_PARAMS, "params must be an object")
+            response = {"jsonrpc": "2.0", "id": request_id, "result": await self.run(method, params, request_id, send_event)}
+        except ServiceError as e:
+            response = error_response(request_id, e.code, str(e))
+        except FileNotFoundError as e:
+            response = error_response(request_id, NOT_FOUND, str(e))
+        except FileExistsError as e:
+            response = error_response(request_id, ALREADY_EXISTS, str(e))
+        except (OSError, RuntimeError) as e:
+            response = error_response(request_id, OPERATION_FAILED, str(e))
+        except (ValueError, KeyError) as e:
+            response = error_response(request_id, INVALID_PARAMS, str(e))
+        except Exception as e:
+            print(f"Service call {method} failed: {e!r}")
+            response = error_response(request_id, INTERNAL_ERROR, f"Internal error: {e}")
+        return response if "id" in request else None
+
+    async def read_request(self, reader):
+        # (method, target, headers, body), or None when the client closed the connection
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split()
+        except ValueError:
+            raise ServiceError(400, "Malformed request line")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY_SIZE:
+            raise ServiceError(413, f"Request body is larger than {MAX_BODY_SIZE} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return method, target, headers, body
+
+    def write_response(self, writer, status, payload=None, keep_alive=True):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        head = (f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+
+    async def handle_rpc(self, writer, payload, stream, keep_alive):
+        requests = payload if isinstance(payload, list) else [payload]
+        if isinstance(payload, list) and not payload:
+            self.write_response(writer, 200, error_response(None, INVALID_REQUEST, "Empty batch"), keep_alive)
+            return
+
+        if not stream:
+            responses = [r for r in await asyncio.gather(*(self.call(r) for r in requests)) if r is not None]
+            if not responses:
+                self.write_response(writer, 204, None, keep_alive)
+            else:
+                self.write_response(writer, 200, responses if isinstance(payload, list) else responses[0], keep_alive)
+            return
+
+        head = (f"HTTP/1.1 200 OK\r\nContent-Type: {NDJSON}\r\nTransfer-Encoding: chunked\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1"))
+
+        def send(message):
+            data = (json.dumps(message) + "\n").encode("utf-8")
+            writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+
+        async def call_and_send(request):
+            response = await self.call(request, send)
+            if response is not None:
+                send(response)
+                await writer.drain()
+
+        await asyncio.gather(*(call_and_send(r) for r in requests))
+        writer.write(b"0\r\n\r\n")
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except ServiceError as e:
+                    self.write_response(writer, e.code, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                path = target.split("?", 1)[0]
+                if self.token and not self.authorized(headers):
+                    self.write_response(writer, 401, {"error": "Missing or wrong service token"}, keep_alive)
+                elif path == "/methods" and method == "GET":
+                    self.write_response(writer, 200, {"methods": sorted(self.methods)}, keep_alive)
+                elif path != "/rpc":
+                    self.write_response(writer, 404, {"error": f"No such endpoint: {path}"}, keep_alive)
+                elif method != "POST":
+                    self.write_response(writer, 405, {"error": "Use POST for /rpc"}, keep_alive)
+                else:
+                    try:
+                        payload = json.loads(body)
+                    except ValueError as e:
+                        self.write_response(writer, 200, error_response(None, PARSE_ERROR, f"Parse error: {e}"), keep_alive)
+                    else:
+                        await self.handle_rpc(writer, payload, NDJSON in headers.get("accept", ""), keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, OSError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+class ServiceClient:
+    def __init__(self, address=SERVICE_ADDRESS, token=SERVICE_TOKEN, timeout=None):
+        # No timeout by default; archiving a big project takes a while
+        self.address = address
+        self.token = token
+        self.timeout = timeout
+        self.next_id = 0
+
+    def post(self, payload, stream=False):
+        connection = http.client.HTTPConnection(*self.address, timeout=self.timeout)
+        headers = {"Content-Type": "application/json", "Connection": "close"}
+        if stream:
+            headers["Accept"] = NDJSON
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        connection.request("POST", "/rpc", json.dumps(payload).encode("utf-8"), headers)
+        response = connection.getresponse()
+        if response.status not in (200, 204):
+            raise ServiceError(response.status, f"Service answered {response.status}: {response.read().decode('utf-8', 'replace')}")
+        return connection, response
+
+    def request(self, method, params):
+        self.next_id += 1
+        return {"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params}
+
+    @staticmethod
+    def result(response):
+        if "error" in response:
+            error = response["error"]
+            raise ServiceError(error["code"], error["message"], error.get("data"))
+        return response["result"]
+
+    def call(self, method, progress=None, **params):
+        # progress(done, total, name) switches to the streaming response
+        request = self.request(method, params)
+        connection, response = self.post(request, stream=progress is not None)
+        try:
+            if progress is None:
+                return self.result(json.loads(response.read()))
+            for line in response:
+                message = json.loads(line)
+                if message.get("method") == "progress":
+                    progress(message["params"]["done"], message["params"]["total"], message["params"]["name"])
+                elif message.get("id") == request["id"]:
+                    return self.result(message)
+            raise ServiceError(INTERNAL_ERROR, "Service closed the stream without a response")
+        finally:
+            connection.close()
+
+    def batch(self, calls):
+        # calls is [(method, params)]; returns results in the same order, with a ServiceError in place of each failure
+        requests = [self.request(method, params) for method, params in calls]
+        connection, response = self.post(requests)
+        try:
+            responses = {r.get("id"): r for r in json.loads(response.read())}
+        finally:
+            connection.close()
+        results = []
+        for request in requests:
+            try:
+                results.append(self.result(responses[request["id"]]))
+            except ServiceError as e:
+                results.append(e)
+        return results
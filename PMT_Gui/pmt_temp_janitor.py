@@ -0,0 +1,274 @@
+# Background cleanup of the Temp folders PMT creates
+#
+# Every Source/<category>/Temp folder, Department Assets/Temp and Project Assets/Temp collects Maya
+# autosaves and intermediate exports. TempJanitor applies a policy to each of them on a worker
+# thread running at background priority: files unused for longer than max_age_days are removed,
+# then the least recently used files go until the folder is under max_bytes. Files touched in the
+# last few minutes are never removed so an autosave in progress survives. Every eviction (or, in a
+# dry run, every file that would have been evicted) is appended to a JSON-lines log.
+#
+# Every workstation's PMT runs a janitor against the same shared Temp folders, so the policy, the log and
+# the time of the last pass are kept on the share ("Temp Janitor" in the company folder). A pass holds the
+# shared lock while it deletes; the background loop skips its pass if another machine holds the lock or
+# ran one less than interval_minutes ago, so there is one pass per interval across the whole studio.
+import os
+import sys
+import json
+import time
+import fnmatch
+import threading
+
+import pmt_locks
+from pmt_config import COMPANY_PATH, PMT_PROJECTS_PATH, DEPARTMENT_ASSETS_PATH, TEMP_JANITOR_POLICY_PATH, TEMP_JANITOR_LOG_PATH, \
+    TEMP_JANITOR_LOCK_PATH, TEMP_JANITOR_STATE_PATH
+
+# Policy values; TEMP_JANITOR_POLICY_PATH can override them, and "folders" maps company-relative
+# fnmatch patterns (e.g. "PMT Projects/*/Source/Characters/Temp") to per-folder overrides
+DEFAULT_POLICY = {
+    "max_age_days": 14,
+    "max_bytes": 5 * 1024 ** 3,
+    "min_age_minutes": 30,
+    "interval_minutes": 60,
+    "folders": {},
+}
+
+# Start a new log file once the current one passes this size
+LOG_ROTATE_BYTES = 5 * 1024 * 1024
+
+REASON_AGE = "age"
+REASON_SIZE = "size"
+
+
+def load_policy(path=TEMP_JANITOR_POLICY_PATH):
+    policy = dict(DEFAULT_POLICY)
+    try:
+        with open(path, "r") as policy_file:
+            policy.update(json.load(policy_file))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable Temp janitor policy {path}: {e}")
+    return policy
+
+
+def policy_for(policy, rel_path):
+    # Folder-specific overrides on top of the global values; the first matching pattern wins
+    folder_policy = {k: v for k, v in policy.items() if k != "folders"}
+    for pattern, overrides in policy.get("folders", {}).items():
+        if fnmatch.fnmatch(rel_path, pattern):
+            folder_policy.update(overrides)
+            break
+    return folder_policy
+
+
+def find_temp_folders(projects_path=PMT_PROJECTS_PATH, department_assets_path=DEPARTMENT_ASSETS_PATH):
+    # Only the places PMT creates Temp folders, so there's no need to walk whole projects
+    candidates = [os.path.join(department_assets_path, 'Temp'), os.path.join(projects_path, 'Project Assets', 'Temp')]
+    try:
+        projects = sorted(os.listdir(projects_path))
+    except OSError:
+        projects = []
+    for project in projects:
+        source_path = os.path.join(projects_path, project, 'Source')
+        if project in ['Project Assets', 'Tools'] or not os.path.isdir(source_path):
+            continue
+        for category in sorted(os.listdir(source_path)):
+            candidates.append(os.path.join(source_path, category, 'Temp'))
+    return [c for c in candidates if os.path.isdir(c)]
+
+
+def list_temp_files(folder):
+    # (path, size, last_used) for every file below folder; atime is often not updated, so use the later of atime and mtime
+    files = []
+    for current, dirs, names in os.walk(folder):
+        for name in names:
+            path = os.path.join(current, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((path, stat.st_size, max(stat.st_atime, stat.st_mtime)))
+    return files
+
+
+def plan_evictions(files, folder_policy, now=None):
+    # Returns [(path, size, reason)]; files newer than min_age_minutes are always kept
+    now = time.time() if now is None else now
+    max_age = folder_policy["max_age_days"] * 24 * 3600
+    min_age = folder_policy["min_age_minutes"] * 60
+    evictions = []
+    kept = []
+    for path, size, last_used in files:
+        if max_age and now - last_used > max_age:
+            evictions.append((path, size, REASON_AGE))
+        else:
+            kept.append((path, size, last_used))
+
+    total = sum(size for _, size, _ in kept)
+    if folder_policy["max_bytes"] and total > folder_policy["max_bytes"]:
+        for path, size, last_used in sorted(kept, key=lambda f: f[2]):
+            if total <= folder_policy["max_bytes"]:
+                break
+            if now - last_used < min_age:
+                continue
+            evictions.append((path, size, REASON_SIZE))
+            total -= size
+    return evictions
+
+
+def remove_empty_folders(folder):
+    # Clear out subfolders emptied by an eviction but keep the Temp folder itself
+    for current, dirs, names in os.walk(folder, topdown=False):
+        if current != folder and not dirs and not names:
+            try:
+                os.rmdir(current)
+            except OSError:
+                pass
+
+
+def lower_thread_priority():
+    # Background mode lowers both CPU and I/O priority of the calling thread on Windows;
+    # on Linux a thread's nice value also sets its I/O priority when none was set explicitly
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+        elif hasattr(os, "setpriority"):
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (OSError, AttributeError) as e:
+        print(f"Could not lower Temp janitor priority: {e}")
+
+
+def load_last_run(state_path=TEMP_JANITOR_STATE_PATH):
+    try:
+        with open(state_path, "r") as state_file:
+            return json.load(state_file)["time"]
+    except (OSError, ValueError, KeyError):
+        return 0
+
+
+def save_last_run(state_path=TEMP_JANITOR_STATE_PATH, when=None):
+    with open(state_path + ".tmp", "w") as state_file:
+        json.dump({"time": time.time() if when is None else when}, state_file)
+    os.replace(state_path + ".tmp", state_path)
+
+
+class TempJanitor:
+    def __init__(self, policy=None, log_path=TEMP_JANITOR_LOG_PATH, root=COMPANY_PATH, find_folders=find_temp_folders,
+                 lock_path=TEMP_JANITOR_LOCK_PATH, state_path=TEMP_JANITOR_STATE_PATH):
+        # Without an explicit policy the shared policy file is re-read before every pass
+        self.reload_policy = policy is None
+        self.policy = policy or load_policy()
+        self.log_path = log_path
+        self.lock_path = lock_path
+        self.state_path = state_path
+        self.root = root
+        self.find_folders = find_folders
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+
+    def write_log(self, records):
+        if not records:
+            return
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        try:
+            if os.path.getsize(self.log_path) > LOG_ROTATE_BYTES:
+                os.replace(self.log_path, self.log_path + ".1")
+        except OSError:
+            pass
+        with open(self.log_path, "a") as log_file:
+            for record in records:
+                log_file.write(json.dumps(record) + "\n")
+
+    def clean_folder(self, folder, dry_run=False, now=None):
+        rel_path = os.path.relpath(folder, self.root).replace(os.sep, "/")
+        evictions = plan_evictions(list_temp_files(folder), policy_for(self.policy, rel_path), now)
+        records = []
+        for path, size, reason in evictions:
+            if self.stop_event.is_set():
+                break
+            record = {"time": time.time(), "path": path, "size": size, "reason": reason, "dry_run": dry_run}
+            if not dry_run:
+                try:
+                    os.remove(path)
+                    record["result"] = "removed"
+                except OSError as e:
+                    # Usually a file Maya still has open on Windows; try again next run
+                    record["result"] = f"failed: {e}"
+            records.append(record)
+        if not dry_run and evictions:
+            remove_empty_folders(folder)
+        return records
+
+    def clean_all(self, dry_run):
+        records = []
+        for folder in self.find_folders():
+            if self.stop_event.is_set():
+                break
+            try:
+                records.extend(self.clean_folder(folder, dry_run))
+            except OSError as e:
+                print(f"Failed to clean Temp folder {folder}: {e}")
+        self.write_log(records)
+        return records
+
+    def run_once(self, dry_run=False, due_only=False):
+        # One pass over every Temp folder; returns the log records. Raises BlockingIOError while another
+        # machine is cleaning; with due_only the pass is skipped (returns None) if the last one is too recent.
+        with self.lock:
+            if self.reload_policy:
+                self.policy = load_policy()
+            if dry_run:
+                return self.clean_all(dry_run)  # Deletes nothing, so no need to wait for other machines
+            with pmt_locks.locked(self.lock_path):
+                if due_only and time.time() - load_last_run(self.state_path) < self.policy["interval_minutes"] * 60:
+                    return None
+                records = self.clean_all(dry_run)
+                if not self.stop_event.is_set():
+                    save_last_run(self.state_path)
+                return records
+
+    def loop(self):
+        lower_thread_priority()
+        while not self.stop_event.is_set():
+            try:
+                records = self.run_once(due_only=True) or []
+            except BlockingIOError:
+                records = []  # Another workstation is cleaning right now
+            except OSError as e:
+                print(f"Temp janitor could not run: {e}")
+                records = []
+            removed = [r for r in records if r.get("result") == "removed"]
+            if removed:
+                print(f"Temp janitor removed {len(removed)} file(s), {sum(r['size'] for r in removed)} bytes")
+            self.stop_event.wait(self.policy["interval_minutes"] * 60)
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.loop, daemon=True)
+        self.thread.start()
+
+    def stop(self, wait=True):
+        self.stop_event.set()
+        if wait and self.thread:
+            self.thread.join()
+        self.thread = None
+
+
+def read_log(log_path=TEMP_JANITOR_LOG_PATH, limit=100):
+    # Newest records last, for the CLI
+    try:
+        with open(log_path, "r") as log_file:
+            lines = log_file.readlines()[-limit:]
+    except OSError:
+        return []
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
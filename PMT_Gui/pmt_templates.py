@@ -0,0 +1,246 @@
+# Project templates
+#
+# A template is a folder under "Project Templates" laid out like a project (Source/<category>,
+# Exported/<category>, starter scenes, rigs...). New projects are cloned from it file by file:
+# reflink (copy-on-write clone, Linux FICLONE / macOS clonefile) where the filesystem supports it,
+# otherwise a hardlink for files the template marks as shared, otherwise a plain copy. Only shared files
+# are ever linked, so starter scenes are always a project's own. Copies run in a thread pool. A linked
+# file is the template's own inode, so its permissions are left alone (a read-only file would make every
+# project that links it impossible to delete on Windows); the template's folders are made read-only
+# instead, so nothing in them is replaced or removed by accident.
+# The clone is built in a hidden staging folder inside "PMT Projects" (same volume, so the move is a
+# rename) and renamed into place once it is complete, so a failed clone never leaves a half-made
+# project that blocks the next attempt or shows up in the project list.
+import os
+import sys
+import json
+import stat
+import time
+import errno
+import shutil
+import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+
+import pmt_tools
+from pmt_config import PMT_PROJECTS_PATH, PROJECT_TEMPLATES_PATH, DEPARTMENT_ASSETS_PATH
+
+DEFAULT_TEMPLATE = "Default"
+# Optional file in a template's root: {"description": "...", "link": ["Rigs/*", "*.png"]}
+TEMPLATE_MANIFEST = "template.json"
+
+CATEGORIES = ['Characters', 'Environments', 'Props']
+STARTER_SCENES = {'Characters': 'Character.ma', 'Environments': 'Environment.ma', 'Props': 'Prop.ma'}
+# Projects are cloned in here; project listings skip "."-prefixed folders
+STAGING_FOLDER = ".PMT Staging"
+
+MODE_AUTO = "auto"
+MODE_REFLINK = "reflink"
+MODE_HARDLINK = "hardlink"
+MODE_COPY = "copy"
+
+# Linux ioctl that makes dst share src's extents (btrfs, XFS with reflink=1, bcachefs)
+FICLONE = 0x40049409
+REFLINK_UNSUPPORTED = {errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EPERM}
+
+
+def reflink(src, dst):
+    if sys.platform.startswith("linux"):
+        import fcntl
+        with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+        shutil.copystat(src, dst)
+    elif sys.platform == "darwin":
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), dst)
+    else:
+        raise OSError(errno.EOPNOTSUPP, "Reflinks are not supported on this platform", dst)
+
+
+def list_templates(templates_path=PROJECT_TEMPLATES_PATH):
+    try:
+        return sorted(d for d in os.listdir(templates_path) if os.path.isdir(os.path.join(templates_path, d)))
+    except OSError:
+        return []
+
+
+def template_folder(template, templates_path=PROJECT_TEMPLATES_PATH):
+    # The template's folder. Template names come from users and RPC callers, so anything that doesn't resolve
+    # to a folder directly inside templates_path ("..", separators, absolute paths, links elsewhere) is refused.
+    if not template or template in ('.', '..') or '/' in template or '\\' in template:
+        raise ValueError(f"Invalid template: '{template}'")
+    template_path = os.path.realpath(os.path.join(templates_path, template))
+    if os.path.normcase(os.path.dirname(template_path)) != os.path.normcase(os.path.realpath(templates_path)):
+        raise ValueError(f"Invalid template: '{template}'")
+    return template_path
+
+
+def load_manifest(template_path):
+    try:
+        with open(os.path.join(template_path, TEMPLATE_MANIFEST), "r") as manifest_file:
+            return json.load(manifest_file)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable {TEMPLATE_MANIFEST} in {template_path}: {e}")
+        return {}
+
+
+def ensure_default_template(templates_path=PROJECT_TEMPLATES_PATH):
+    # The layout createproject always built, so there is something to clone before anyone makes a template
+    template_path = os.path.join(templates_path, DEFAULT_TEMPLATE)
+    if os.path.isdir(template_path):
+        return template_path
+    for category in CATEGORIES:
+        os.makedirs(os.path.join(template_path, 'Exported', category), exist_ok=True)
+        source_path = os.path.join(template_path, 'Source', category)
+        os.makedirs(os.path.join(source_path, 'Tools', 'Config'), exist_ok=True)
+        os.makedirs(os.path.join(source_path, 'Temp'), exist_ok=True)
+        with open(os.path.join(source_path, STARTER_SCENES[category]), 'w') as file:
+            file.write("//Maya ASCII 2023 scene\n")
+    with open(os.path.join(template_path, TEMPLATE_MANIFEST), "w") as manifest_file:
+        json.dump({"description": "Empty project with stub scenes", "link": []}, manifest_file, indent=4)
+    print(f"Created default project template at {template_path}")
+    return template_path
+
+
+def protect_template(template_path):
+    # Clears the write bits on the template's folders; an admin editing the template puts them back
+    read_only = stat.S_IRUSR | stat.S_IXUSR | stat.S_IRGRP | stat.S_IXGRP | stat.S_IROTH | stat.S_IXOTH
+    for folder, dirs, names in os.walk(template_path):
+        try:
+            if os.stat(folder).st_mode & 0o777 != read_only:
+                os.chmod(folder, read_only)
+        except OSError as e:
+            print(f"Failed to protect template folder {folder}: {e}")
+
+
+def clear_readonly(function, path, exc_info):
+    # shutil.rmtree onerror handler: Windows refuses to delete read-only files, so clear the bit and retry
+    if not os.access(path, os.W_OK):
+        os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+        function(path)
+    else:
+        raise exc_info[1]
+
+
+class TemplateCloner:
+    def __init__(self, mode=MODE_AUTO, workers=None):
+        self.mode = mode
+        self.workers = workers or min(16, (os.cpu_count() or 2) * 2)
+        # Cleared after the first refusal so a filesystem without reflinks isn't asked again for every file
+        self.try_reflink = mode in (MODE_AUTO, MODE_REFLINK)
+        self.counts = {"reflinked": 0, "hardlinked": 0, "copied": 0}
+
+    def clone_file(self, src, dst, shared):
+        if self.try_reflink:
+            try:
+                reflink(src, dst)
+                return "reflinked"
+            except OSError as e:
+                if os.path.exists(dst):
+                    os.remove(dst)
+                if self.mode == MODE_REFLINK or e.errno not in REFLINK_UNSUPPORTED:
+                    raise
+                self.try_reflink = False
+        if shared and self.mode != MODE_COPY:
+            try:
+                os.link(src, dst)
+                return "hardlinked"
+            except OSError as e:
+                if self.mode == MODE_HARDLINK:
+                    raise
+                print(f"Copying {src} instead of linking it: {e}")
+        shutil.copy2(src, dst)
+        return "copied"
+
+    def clone(self, template_path, project_path, progress=None):
+        link_patterns = load_manifest(template_path).get("link", [])
+        files = []
+        for folder, dirs, names in os.walk(template_path):
+            dirs.sort()
+            rel_folder = os.path.relpath(folder, template_path)
+            os.makedirs(os.path.normpath(os.path.join(project_path, rel_folder)), exist_ok=True)
+            for name in sorted(names):
+                rel_path = os.path.normpath(os.path.join(rel_folder, name))
+                if rel_path == TEMPLATE_MANIFEST:
+                    continue
+                shared = any(fnmatch.fnmatch(rel_path.replace(os.sep, "/"), p) for p in link_patterns)
+                files.append((os.path.join(folder, name), os.path.join(project_path, rel_path), shared))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for done, result in enumerate(pool.map(lambda f: self.clone_file(*f), files), 1):
+                self.counts[result] += 1
+                if progress:
+                    progress(done, len(files), files[done - 1][1])
+        return self.counts
+
+
+def install_tools(project_path, tool_path=None, config_path=None):
+    # Put the current ConfigInfo.json and export tool in every Source category; templates may hold stale copies
+    tool_path = tool_path or pmt_tools.TOOL_SOURCE_PATH
+    config_path = config_path or os.path.join(DEPARTMENT_ASSETS_PATH, 'Tools', 'Config', 'ConfigInfo.json')
+    warnings = []
+    tools_folders = []
+    source_path = os.path.join(project_path, 'Source')
+    for category in sorted(os.listdir(source_path)) if os.path.isdir(source_path) else []:
+        category_path = os.path.join(source_path, category)
+        if not os.path.isdir(category_path):
+            continue
+        tools_folder_path = os.path.join(category_path, 'Tools')
+        config_folder_path = os.path.join(tools_folder_path, 'Config')
+        os.makedirs(config_folder_path, exist_ok=True)
+        os.makedirs(os.path.join(category_path, 'Temp'), exist_ok=True)
+        if not os.path.exists(os.path.join(config_folder_path, 'ConfigInfo.json')):
+            if os.path.exists(config_path):
+                shutil.copy(config_path, config_folder_path)
+            else:
+                warnings.append(f"ConfigInfo.json not found at {config_path}")
+        tools_folders.append(tools_folder_path)
+
+    # Written only where it differs; a hardlinked copy from the template is replaced, not written through
+    try:
+        tool_data = pmt_tools.read_tool(tool_path)
+    except OSError:
+        warnings.append(f"PMT Export Tool.txt not found at {tool_path}")
+    else:
+        summary = pmt_tools.default_distributor.deploy(pmt_tools.tool_artifacts(tools_folders, tool_data))
+        warnings.extend(f"Failed to copy PMT Export Tool.txt to {path}: {error}" for path, error in summary['failed'])
+    return sorted(set(warnings))
+
+
+def create_project(project_name, template=DEFAULT_TEMPLATE, projects_path=PMT_PROJECTS_PATH,
+                   templates_path=PROJECT_TEMPLATES_PATH, mode=MODE_AUTO, workers=None, progress=None):
+    # Returns a summary with per-method file counts, timing and any warnings
+    if template == DEFAULT_TEMPLATE:
+        ensure_default_template(templates_path)
+    template_path = template_folder(template, templates_path)
+    if not os.path.isdir(template_path):
+        raise FileNotFoundError(f"Project template '{template}' does not exist in {templates_path}")
+    project_path = os.path.join(projects_path, project_name)
+    if os.path.isdir(project_path) and os.listdir(project_path):
+        raise FileExistsError(f"Project '{project_name}' already exists at {project_path}")
+
+    started = time.time()
+    temp_path = os.path.join(projects_path, STAGING_FOLDER, f"{project_name}.{os.getpid()}")
+    try:
+        counts = TemplateCloner(mode, workers).clone(template_path, temp_path, progress)
+        if os.path.isdir(project_path):
+            os.rmdir(project_path)  # Empty (checked above); Windows can't rename onto an existing folder
+        os.rename(temp_path, project_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            try:
+                shutil.rmtree(temp_path, onerror=clear_readonly)
+            except OSError as e:
+                print(f"Failed to remove the partial project at {temp_path}: {e}")
+        raise
+    if counts["hardlinked"]:
+        protect_template(template_path)
+    warnings = install_tools(project_path)
+    summary = dict(counts)
+    summary.update({"project_path": project_path, "template": template, "seconds": time.time() - started,
+                    "warnings": warnings})
+    return summary
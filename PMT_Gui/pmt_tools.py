@@ -0,0 +1,238 @@
+# Distribution of the PMT Export Tool to Maya shelves and Tools folders
+#
+# "PMT Export Tool.txt" is the only source: the Maya shelf (shelf_AutoExport.mel) is generated from it
+# with the script embedded as the button's command, so the two can't drift apart. ToolDistributor
+# writes each artifact to its targets only where the content differs. A local manifest remembers the
+# sha256, size and mtime of every copy it wrote, so an unchanged target costs one stat and is never
+# read; unknown or modified targets are hashed, and only a real difference is written (temp file +
+# os.replace, which also replaces hardlinked copies from project templates instead of writing through
+# them). Targets are handled in parallel on a thread pool.
+import os
+import glob
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pmt_config import PMT_PROJECTS_PATH, DEPARTMENT_ASSETS_PATH, TOOL_MANIFEST_PATH
+
+TOOL_NAME = 'PMT Export Tool.txt'
+SHELF_NAME = 'shelf_AutoExport.mel'
+TOOL_SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), TOOL_NAME)
+
+# Documents folders Maya may keep its prefs in (OneDrive moves Documents on managed machines)
+DOCUMENTS_FOLDERS = [
+    os.path.join(os.path.expanduser('~'), 'OneDrive - University of Central Florida', 'Documents'),
+    os.path.join(os.path.expanduser('~'), 'OneDrive', 'Documents'),
+    os.path.join(os.path.expanduser('~'), 'Documents'),
+]
+MAYA_VERSIONS = ['2024']
+
+SHELF_TEMPLATE = '''// Generated by PMT from {source_name} (sha256 {version}); edit the tool, not this file
+global proc shelf_AutoExport () {{
+    global string $gBuffStr;
+    global string $gBuffStr0;
+    global string $gBuffStr1;
+
+
+    shelfButton
+        -enableCommandRepeat 1
+        -flexibleWidthType 3
+        -flexibleWidthValue 32
+        -enable 1
+        -width 35
+        -height 34
+        -manage 1
+        -visible 1
+        -preventOverride 0
+        -annotation "PMT Export Tool {short_version}"
+        -enableBackground 0
+        -backgroundColor 0 0 0
+        -highlightColor 0.321569 0.521569 0.65098
+        -align "center"
+        -label "PMT Export"
+        -labelOffset 0
+        -rotation 0
+        -flipX 0
+        -flipY 0
+        -useAlpha 1
+        -imageOverlayLabel "Export"
+        -overlayLabelColor 0.8 0.8 0.8
+        -overlayLabelBackColor 0 0 0 0.5
+        -image "pythonFamily.png"
+        -image1 "pythonFamily.png"
+        -style "iconOnly"
+        -marginWidth 0
+        -marginHeight 1
+        -command "{command}"
+        -sourceType "python"
+        -commandRepeatable 1
+        -flat 1
+    ;
+
+}}
+'''
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def mel_string(text):
+    # Body of a double-quoted MEL string
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\t', '\\t')
+
+
+def read_tool(tool_path=TOOL_SOURCE_PATH):
+    with open(tool_path, 'rb') as tool_file:
+        return tool_file.read()
+
+
+def build_shelf(tool_data, source_name=TOOL_NAME):
+    # The shelf MEL for a given export tool; bytes, like the tool itself
+    version = content_hash(tool_data)
+    command = mel_string(tool_data.decode('utf-8'))
+    return SHELF_TEMPLATE.format(source_name=source_name, version=version, short_version=version[:12],
+                                 command=command).encode('utf-8')
+
+
+def find_shelf_folders(documents_folders=None, maya_versions=MAYA_VERSIONS):
+    # Existing Maya shelves folders for the current user; Maya creates them on its first start
+    folders = []
+    for documents_folder in documents_folders or DOCUMENTS_FOLDERS:
+        for version in maya_versions:
+            folders.extend(glob.glob(os.path.join(glob.escape(documents_folder), 'maya', version, 'prefs', 'shelves')))
+    return sorted(set(folders))
+
+
+def find_tools_folders(projects_path=PMT_PROJECTS_PATH, department_assets_path=DEPARTMENT_ASSETS_PATH):
+    # Every Tools folder PMT keeps a copy of the export tool in
+    folders = [os.path.join(department_assets_path, 'Tools'), os.path.join(projects_path, 'Project Assets', 'Tools')]
+    try:
+        projects = sorted(os.listdir(projects_path))
+    except OSError:
+        projects = []
+    for project in projects:
+        source_path = os.path.join(projects_path, project, 'Source')
+        if project in ['Project Assets', 'Tools'] or not os.path.isdir(source_path):
+            continue
+        for category in sorted(os.listdir(source_path)):
+            if os.path.isdir(os.path.join(source_path, category)):
+                folders.append(os.path.join(source_path, category, 'Tools'))
+    return folders
+
+
+class ToolDistributor:
+    def __init__(self, manifest_path=TOOL_MANIFEST_PATH, workers=None):
+        self.manifest_path = manifest_path
+        # Mostly stats and small writes to a share, so more threads than cores
+        self.workers = workers or min(32, (os.cpu_count() or 2) * 4)
+        self.lock = threading.Lock()
+        self.manifest = self.load_manifest()
+        self.dirty = False
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r') as manifest_file:
+                return json.load(manifest_file).get('targets', {})
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self):
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        with self.lock:
+            data = json.dumps({'version': 1, 'targets': self.manifest})
+            self.dirty = False
+        with open(self.manifest_path + '.tmp', 'w') as manifest_file:
+            manifest_file.write(data)
+        os.replace(self.manifest_path + '.tmp', self.manifest_path)
+
+    def remember(self, key, sha, stat):
+        with self.lock:
+            self.manifest[key] = [sha, stat.st_size, stat.st_mtime]
+            self.dirty = True
+
+    def deploy_one(self, target_path, data, sha):
+        # Returns 'unchanged' or 'written'
+        key = os.path.normcase(os.path.abspath(target_path))
+        try:
+            stat = os.stat(target_path)
+        except FileNotFoundError:
+            stat = None
+        if stat is not None:
+            with self.lock:
+                known = self.manifest.get(key)
+            if known and known[0] == sha and known[1] == stat.st_size and known[2] == stat.st_mtime:
+                return 'unchanged'
+            if stat.st_size == len(data):
+                with open(target_path, 'rb') as target_file:
+                    if content_hash(target_file.read()) == sha:
+                        self.remember(key, sha, stat)
+                        return 'unchanged'
+
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        temp_path = f'{target_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, target_path)
+        self.remember(key, sha, os.stat(target_path))
+        return 'written'
+
+    def deploy(self, artifacts):
+        # artifacts is [(target path, bytes)]; returns {'written': [...], 'unchanged': n, 'failed': [(path, error)]}
+        hashes = {}
+        jobs = []
+        for target_path, data in artifacts:
+            if id(data) not in hashes:
+                hashes[id(data)] = content_hash(data)
+            jobs.append((target_path, data, hashes[id(data)]))
+
+        def run(job):
+            try:
+                return job[0], self.deploy_one(*job)
+            except OSError as e:
+                return job[0], e
+
+        summary = {'written': [], 'unchanged': 0, 'failed': []}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for target_path, result in pool.map(run, jobs):
+                if isinstance(result, OSError):
+                    summary['failed'].append((target_path, str(result)))
+                elif result == 'written':
+                    summary['written'].append(target_path)
+                else:
+                    summary['unchanged'] += 1
+        if self.dirty:
+            self.save_manifest()
+        return summary
+
+
+# Shared distributor used by the GUI, project creation and the CLI
+default_distributor = ToolDistributor()
+
+
+def tool_artifacts(folders, tool_data=None):
+    tool_data = tool_data if tool_data is not None else read_tool()
+    return [(os.path.join(folder, TOOL_NAME), tool_data) for folder in folders]
+
+
+def shelf_artifacts(shelf_folders, tool_data=None):
+    shelf_data = build_shelf(tool_data if tool_data is not None else read_tool())
+    return [(os.path.join(folder, SHELF_NAME), shelf_data) for folder in shelf_folders]
+
+
+def deploy_tools(folders):
+    return default_distributor.deploy(tool_artifacts(folders))
+
+
+def deploy_shelves(shelf_folders=None):
+    return default_distributor.deploy(shelf_artifacts(shelf_folders if shelf_folders is not None else find_shelf_folders()))
+
+
+def deploy_all(shelf_folders=None, projects_path=PMT_PROJECTS_PATH, department_assets_path=DEPARTMENT_ASSETS_PATH):
+    # Shelves and every Tools folder in one parallel pass
+    tool_data = read_tool()
+    shelf_folders = shelf_folders if shelf_folders is not None else find_shelf_folders()
+    artifacts = shelf_artifacts(shelf_folders, tool_data) + tool_artifacts(find_tools_folders(projects_path, department_assets_path), tool_data)
+    return default_distributor.deploy(artifacts)
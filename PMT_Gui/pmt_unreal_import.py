@@ -0,0 +1,151 @@
+# Batched Unreal import manifests for a project's Exported folder
+#
+# build_manifest() lists the FBX files that are new or changed since the last ingest, with the
+# /Game content path and import settings for each, split into batches. unreal_import_manifest.py
+# runs inside the UE 5.3 editor, imports the batches and writes a results file; commit_results()
+# then records what was imported so the next ingest only touches assets that changed again.
+import os
+import re
+import json
+import time
+
+import pmt_checksums
+
+MANIFEST_NAME = "unreal_import_manifest.json"
+RESULTS_NAME = "unreal_import_manifest.results.json"
+STATE_NAME = ".pmt_ingest_state.json"
+DEFAULT_BATCH_SIZE = 25
+CONTENT_ROOT = "/Game"
+
+# Import settings per Exported category; anything else imports as a static mesh
+IMPORT_SETTINGS = {
+    "Characters": {
+        "mesh_type": "skeletal",
+        "import_materials": True,
+        "import_textures": True,
+        "import_animations": True,
+        "combine_meshes": False,
+    },
+    "Environments": {
+        "mesh_type": "static",
+        "import_materials": True,
+        "import_textures": True,
+        "import_animations": False,
+        "combine_meshes": False,
+        "generate_lightmap_uvs": True,
+    },
+    "Props": {
+        "mesh_type": "static",
+        "import_materials": True,
+        "import_textures": True,
+        "import_animations": False,
+        "combine_meshes": True,
+        "generate_lightmap_uvs": True,
+    },
+}
+DEFAULT_IMPORT_SETTINGS = IMPORT_SETTINGS["Props"]
+
+
+def content_name(name):
+    # Unreal asset and folder names can't contain spaces or most punctuation
+    return re.sub(r"[^A-Za-z0-9_]", "_", name)
+
+
+def exported_path_for(project_path):
+    return os.path.join(project_path, "Exported")
+
+
+def load_json(path, default):
+    try:
+        with open(path, "r") as json_file:
+            return json.load(json_file)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path, data):
+    with open(path + ".tmp", "w") as json_file:
+        json.dump(data, json_file, indent=4)
+    os.replace(path + ".tmp", path)
+
+
+def load_state(project_path):
+    return load_json(os.path.join(exported_path_for(project_path), STATE_NAME), {"version": 1, "assets": {}})
+
+
+def current_hashes(exported_path):
+    # sha256 of every exported FBX, reusing checksum manifest entries whose size and mtime still match
+    hashes = {}
+    for folder, dirs, files in os.walk(exported_path):
+        dirs[:] = sorted(d for d in dirs if d not in ['Tools', 'Temp'])
+        entries = pmt_checksums.load_manifest(folder)["files"]
+        for name in sorted(files):
+            if not name.lower().endswith(".fbx"):
+                continue
+            path = os.path.join(folder, name)
+            stat = os.stat(path)
+            entry = entries.get(name)
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                sha = entry["sha256"]
+            else:
+                sha = pmt_checksums.hash_file(path)
+            rel_path = os.path.relpath(path, exported_path).replace(os.sep, "/")
+            hashes[rel_path] = sha
+    return hashes
+
+
+def asset_for(project_name, exported_path, rel_path, sha):
+    parts = rel_path.split("/")
+    category = parts[0] if len(parts) > 1 else ""
+    folders = [content_name(p) for p in parts[:-1]]
+    return {
+        "source": os.path.join(exported_path, *parts),
+        "relative_path": rel_path,
+        "sha256": sha,
+        "destination_path": "/".join([CONTENT_ROOT, content_name(project_name)] + folders),
+        "destination_name": content_name(os.path.splitext(parts[-1])[0]),
+        "settings": IMPORT_SETTINGS.get(category, DEFAULT_IMPORT_SETTINGS),
+    }
+
+
+def build_manifest(project_path, batch_size=DEFAULT_BATCH_SIZE, everything=False):
+    project_name = os.path.basename(os.path.normpath(project_path))
+    exported_path = exported_path_for(project_path)
+    if not os.path.isdir(exported_path):
+        raise FileNotFoundError(f"Exported folder does not exist: {exported_path}")
+
+    ingested = load_state(project_path)["assets"]
+    assets = [asset_for(project_name, exported_path, rel_path, sha)
+              for rel_path, sha in current_hashes(exported_path).items()
+              if everything or ingested.get(rel_path) != sha]
+    return {
+        "version": 1,
+        "project": project_name,
+        "generated": time.time(),
+        "asset_count": len(assets),
+        "batches": [assets[i:i + batch_size] for i in range(0, len(assets), batch_size)],
+    }
+
+
+def write_manifest(project_path, batch_size=DEFAULT_BATCH_SIZE, everything=False):
+    manifest = build_manifest(project_path, batch_size, everything)
+    manifest_path = os.path.join(exported_path_for(project_path), MANIFEST_NAME)
+    save_json(manifest_path, manifest)
+    return manifest_path, manifest
+
+
+def commit_results(project_path):
+    # Record assets the Unreal script reports as imported; returns (imported, failed) counts
+    exported_path = exported_path_for(project_path)
+    results_path = os.path.join(exported_path, RESULTS_NAME)
+    results = load_json(results_path, None)
+    if results is None:
+        raise FileNotFoundError(f"No Unreal import results at {results_path}")
+
+    state = load_state(project_path)
+    for item in results.get("imported", []):
+        state["assets"][item["relative_path"]] = item["sha256"]
+    state["last_ingest"] = results.get("finished", time.time())
+    save_json(os.path.join(exported_path, STATE_NAME), state)
+    os.remove(results_path)
+    return len(results.get("imported", [])), len(results.get("failed", []))
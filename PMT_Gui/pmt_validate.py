@@ -0,0 +1,297 @@
+# Pre-export validation of Maya ASCII scenes without Maya
+#
+# scan_scene() streams a .ma file once, hashing it and picking out the statements that matter:
+# createNode (node types and names), file references and string attributes holding file paths.
+# Everything that depends only on the file's content (node types, naming) is checked during the
+# scan and cached by sha256 together with the paths found; path checks (outside the company folder,
+# missing on disk) depend on the disk and are redone on every run. SceneValidator spreads cache
+# misses over a process pool so a whole project is checked in seconds. One validator can be shared by
+# threads (the export queue's workers): the cache is only touched under a lock and saved through a
+# temp file of its own.
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from pmt_config import COMPANY_PATH, VALIDATION_CACHE_PATH
+
+SEVERITY_ERROR = "error"
+SEVERITY_WARNING = "warning"
+
+# Node types that don't survive the FBX export to Unreal
+UNSUPPORTED_NODE_TYPES = {
+    "nurbsSurface": "NURBS surfaces don't export to Unreal, convert them to polygons",
+    "subdiv": "Subdivision surfaces don't export to Unreal, convert them to polygons",
+    "fluidShape": "Maya fluids don't export to FBX",
+    "particle": "Particles don't export to FBX",
+    "nParticle": "nParticles don't export to FBX",
+    "pfxHair": "Paint Effects don't export to FBX",
+    "pfxToon": "Paint Effects don't export to FBX",
+    "hairSystem": "Hair systems don't export to FBX",
+    "xgmDescription": "XGen descriptions don't export to FBX",
+    "xgmPalette": "XGen collections don't export to FBX",
+    "bifrostGraphShape": "Bifrost graphs don't export to FBX",
+    "gpuCache": "GPU caches don't export to FBX, import the Alembic instead",
+    "aiStandIn": "Arnold stand-ins don't export to FBX",
+}
+
+# Node types whose names are checked against the naming rules
+NAMED_NODE_TYPES = {"transform", "joint"}
+NAME_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+# Names Maya gives new geometry; these should be renamed before export
+DEFAULT_NAME_PATTERN = re.compile(r"^(pCube|pSphere|pCylinder|pCone|pPlane|pTorus|pPipe|pHelix|pDisc|polySurface|group|joint|transform|null)\d*$")
+PASTED_PREFIX = "pasted__"
+
+# String attribute values with these extensions are treated as file paths
+PATH_EXTENSIONS = {".ma", ".mb", ".fbx", ".abc", ".obj", ".png", ".jpg", ".jpeg", ".tga", ".tif", ".tiff",
+                   ".exr", ".hdr", ".psd", ".tx", ".dds", ".bmp"}
+
+STATEMENT_START = re.compile(r"^\s*(createNode|file|setAttr|requires)\b")
+QUOTED = re.compile(r'"((?:[^"\\]|\\.)*)"')
+FLAG_VALUE = re.compile(r'-(\w+)\s+"((?:[^"\\]|\\.)*)"')
+ABSOLUTE_PATH = re.compile(r'^([A-Za-z]:[/\\]|/|\\\\)')
+
+# Changing any of the content rules above must invalidate cached scans
+RULES_VERSION = hashlib.sha256(json.dumps([sorted(UNSUPPORTED_NODE_TYPES), sorted(NAMED_NODE_TYPES), NAME_PATTERN.pattern,
+                                           DEFAULT_NAME_PATTERN.pattern, sorted(PATH_EXTENSIONS)]).encode("utf-8")).hexdigest()[:16]
+
+# Cached scans kept between runs
+CACHE_LIMIT = 20000
+
+
+def issue(severity, rule, line, message):
+    return {"severity": severity, "rule": rule, "line": line, "message": message}
+
+
+def unescape(value):
+    return value.replace('\\"', '"').replace("\\\\", "\\")
+
+
+def statements(lines):
+    # Yield (line number, statement) for the statements we care about; the mesh data that makes up most
+    # of a scene is skipped line by line without being joined
+    pending = None
+    start_line = 0
+    for number, line in enumerate(lines, 1):
+        if pending is None:
+            if not STATEMENT_START.match(line):
+                continue
+            pending = []
+            start_line = number
+        pending.append(line.strip())
+        if line.rstrip().endswith(";"):
+            yield start_line, " ".join(pending)
+            pending = None
+        elif len(pending) > 200:
+            # A setAttr with a big data block; nothing in it is a path
+            pending = None
+
+
+def check_node(line, statement, issues):
+    parts = statement.split(None, 2)
+    if len(parts) < 2:
+        return
+    node_type = parts[1].rstrip(";")
+    flags = dict(FLAG_VALUE.findall(statement))
+    name = unescape(flags.get("n", ""))
+    if node_type in UNSUPPORTED_NODE_TYPES:
+        issues.append(issue(SEVERITY_ERROR, "unsupported_node", line, f"{node_type} '{name}': {UNSUPPORTED_NODE_TYPES[node_type]}"))
+    # Shared nodes (-s) are Maya's default cameras and such
+    if node_type not in NAMED_NODE_TYPES or not name or " -s " in f" {statement} ":
+        return
+    if not NAME_PATTERN.match(name):
+        issues.append(issue(SEVERITY_ERROR, "naming", line, f"{node_type} '{name}' may only use letters, digits and underscores and must start with a letter"))
+    elif name.startswith(PASTED_PREFIX):
+        issues.append(issue(SEVERITY_WARNING, "naming", line, f"{node_type} '{name}' still has the '{PASTED_PREFIX}' prefix"))
+    elif DEFAULT_NAME_PATTERN.match(name):
+        issues.append(issue(SEVERITY_WARNING, "naming", line, f"{node_type} '{name}' still has Maya's default name"))
+
+
+def scan_scene(path):
+    # Returns (sha256, scan); runs in the worker processes, so it only takes and returns plain data
+    sha = hashlib.sha256()
+
+    def lines():
+        with open(path, "rb") as scene_file:
+            for raw in scene_file:
+                sha.update(raw)
+                yield raw.decode("utf-8", errors="replace")
+
+    issues = []
+    paths = []
+    for line, statement in statements(lines()):
+        keyword = statement.split(None, 1)[0]
+        if keyword == "createNode":
+            check_node(line, statement, issues)
+        elif keyword == "file" and (" -r " in statement or " -rdi " in statement):
+            values = QUOTED.findall(statement)
+            if values:
+                paths.append({"line": line, "kind": "reference", "path": unescape(values[-1])})
+        elif keyword == "setAttr" and '-type "string"' in statement:
+            values = QUOTED.findall(statement)
+            value = unescape(values[-1]) if len(values) >= 3 else ""
+            if os.path.splitext(value)[1].lower() in PATH_EXTENSIONS:
+                paths.append({"line": line, "kind": values[0], "path": value})
+    return sha.hexdigest(), {"rules": RULES_VERSION, "issues": issues, "paths": paths}
+
+
+def normalized(path):
+    # Maya writes Windows paths with either slash; compare case-insensitively like Windows does
+    return path.replace("\\", "/").rstrip("/").lower()
+
+
+def resolve_path(scene_path, value):
+    value = os.path.expandvars(value)
+    if ABSOLUTE_PATH.match(value):
+        return value
+    # Relative paths are relative to the scene, or to the project for workspace-style paths
+    scene_folder = os.path.dirname(os.path.abspath(scene_path))
+    candidates = [os.path.join(scene_folder, value), os.path.join(scene_folder, "..", "..", value)]
+    for candidate in candidates:
+        if os.path.exists(candidate):
+            return os.path.normpath(candidate)
+    return os.path.normpath(candidates[0])
+
+
+def check_paths(scene_path, scan, company_root=COMPANY_PATH):
+    issues = []
+    root = normalized(os.path.abspath(company_root))
+    for item in scan["paths"]:
+        resolved = resolve_path(scene_path, item["path"])
+        what = "Reference" if item["kind"] == "reference" else f"Path in {item['kind']}"
+        target = normalized(resolved)
+        if target != root and not target.startswith(root + "/"):
+            issues.append(issue(SEVERITY_ERROR, "outside_company", item["line"], f"{what} points outside the company folder: {item['path']}"))
+        if not os.path.exists(resolved):
+            severity = SEVERITY_ERROR if item["kind"] == "reference" else SEVERITY_WARNING
+            issues.append(issue(severity, "missing_file", item["line"], f"{what} does not exist: {item['path']}"))
+    return issues
+
+
+class SceneValidator:
+    def __init__(self, workers=None, cache_path=VALIDATION_CACHE_PATH, company_root=COMPANY_PATH):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_path = cache_path
+        self.company_root = company_root
+        self.lock = threading.Lock()
+        self.cache = self.load_cache()
+
+    def load_cache(self):
+        try:
+            with open(self.cache_path, "r") as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError):
+            cache = {}
+        if cache.get("rules") != RULES_VERSION:
+            cache = {"version": 1, "rules": RULES_VERSION, "scans": {}, "files": {}}
+        return cache
+
+    def save_cache(self):
+        with self.lock:
+            scans = self.cache["scans"]
+            if len(scans) > CACHE_LIMIT:
+                for sha in sorted(scans, key=lambda s: scans[s]["used"])[:len(scans) - CACHE_LIMIT]:
+                    del scans[sha]
+            live = set(scans)
+            self.cache["files"] = {p: v for p, v in self.cache["files"].items() if v[2] in live}
+            data = json.dumps(self.cache)
+        cache_folder = os.path.dirname(self.cache_path)
+        os.makedirs(cache_folder, exist_ok=True)
+        # A temp file per save, so threads (or PMT processes) saving at the same time don't write into each other's
+        fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(self.cache_path) + ".", suffix=".tmp", dir=cache_folder)
+        try:
+            with os.fdopen(fd, "w") as cache_file:
+                cache_file.write(data)
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def cached_scan(self, path):
+        # Unchanged size and mtime means the hash recorded last time still holds, so the file isn't read at all.
+        # A file that can't be stat'ed is a miss; scanning it then reports it as unreadable.
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self.lock:
+            known = self.cache["files"].get(path)
+            if known and known[0] == stat.st_size and known[1] == stat.st_mtime:
+                scan = self.cache["scans"].get(known[2])
+                if scan is not None:
+                    scan["used"] = time.time()
+                return scan
+        return None
+
+    def store(self, path, sha, scan):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return  # Gone since it was scanned; nothing to cache it under
+        with self.lock:
+            scan["used"] = time.time()
+            self.cache["scans"][sha] = scan
+            self.cache["files"][path] = [stat.st_size, stat.st_mtime, sha]
+
+    def validate(self, paths, use_cache=True):
+        # Returns {path: [issues]} in the order given; unreadable files get a single error
+        scans = {}
+        misses = []
+        for path in paths:
+            scan = self.cached_scan(path) if use_cache else None
+            if scan is None:
+                misses.append(path)
+            else:
+                scans[path] = scan
+
+        if misses:
+            # A process pool only pays off for several files (and can't be started from inside the GUI process)
+            if self.workers > 1 and len(misses) > 1:
+                with ProcessPoolExecutor(max_workers=min(self.workers, len(misses))) as pool:
+                    futures = {path: pool.submit(scan_scene, path) for path in misses}
+                    results = {}
+                    for path, future in futures.items():
+                        try:
+                            results[path] = future.result()
+                        except OSError as e:
+                            results[path] = e
+            else:
+                results = {}
+                for path in misses:
+                    try:
+                        results[path] = scan_scene(path)
+                    except OSError as e:
+                        results[path] = e
+            for path, result in results.items():
+                if isinstance(result, OSError):
+                    scans[path] = {"issues": [issue(SEVERITY_ERROR, "unreadable", 0, f"Could not read scene: {result}")], "paths": []}
+                    continue
+                sha, scan = result
+                # Files with the same content (copies between projects) share one cached scan
+                self.store(path, sha, scan)
+                scans[path] = scan
+
+        self.save_cache()
+        report = {}
+        for path in paths:
+            scan = scans[path]
+            report[path] = sorted(scan["issues"] + check_paths(path, scan, self.company_root), key=lambda i: i["line"])
+        return report
+
+
+def find_scenes(project_path):
+    # .ma files under the project's Source folder, skipping Temp and Tools like the export tool does
+    scenes = []
+    for folder, dirs, files in os.walk(os.path.join(project_path, "Source")):
+        dirs[:] = sorted(d for d in dirs if d not in ['Tools', 'Temp'])
+        scenes.extend(os.path.join(folder, f) for f in sorted(files) if f.lower().endswith(".ma"))
+    return scenes
+
+
+def has_errors(issues):
+    return any(i["severity"] == SEVERITY_ERROR for i in issues)
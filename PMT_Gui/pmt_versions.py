@@ -0,0 +1,385 @@
+# Version history for Maya files written, copied, renamed or deleted through PMT
+#
+# Every snapshot splits the file into content-defined chunks and stores each chunk once in a shared
+# object store, so unchanged parts of a scene cost nothing in later versions. Chunks start at node
+# boundaries ("createNode" lines in .ma files, FOR4/FOR8 groups in .mb files), so an edit to one node
+# doesn't shift the chunks of the nodes after it; huge nodes (mesh data) are cut further, at lines
+# picked by a hash of their content for .ma and at fixed sizes for .mb. A new .ma chunk is stored as
+# a zstd delta against the chunk it replaces in the previous version when that is smaller, which
+# keeps small edits inside big mesh blocks cheap. Any version is rebuilt by streaming its chunk list.
+# Every workstation writes to the same store, so the per-file version indexes are only read and
+# rewritten under a store-wide lock file.
+import os
+import re
+import json
+import mmap
+import time
+import zlib
+import getpass
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pmt_locks
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from pmt_config import COMPANY_PATH, VERSION_HISTORY_PATH
+
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+# Inside an oversized .ma block, cut after lines whose crc32 has these bits clear (about every 1024 lines)
+LINE_CUT_MASK = 0x3FF
+# Delta chains are capped so rebuilding a chunk never decodes more than this many objects
+MAX_DELTA_DEPTH = 8
+ZSTD_LEVEL = 6
+ZLIB_LEVEL = 6
+# Chunks in flight per worker while snapshotting or restoring, so a big scene is never queued in memory as a whole
+CHUNKS_PER_WORKER = 2
+INDEX_LOCK = "index.lock"
+# Index updates take milliseconds, so waiting this long for the lock means something is stuck
+INDEX_LOCK_TIMEOUT = 30.0
+
+NODE_BOUNDARY_MA = re.compile(rb"\n(?=createNode )")
+NODE_BOUNDARY_MB = re.compile(rb"FOR[48]")
+
+# Object header: kind + codec for full chunks, kind + base sha + depth for deltas
+KIND_FULL = b"F"
+KIND_DELTA = b"D"
+CODEC_ZSTD = b"z"
+CODEC_ZLIB = b"l"
+
+
+def is_text_scene(path):
+    return path.lower().endswith(".ma")
+
+
+def split_lines_by_content(block):
+    # Cut an oversized text block after lines chosen by their content, so inserting lines only changes nearby chunks
+    pieces = []
+    start = 0
+    offset = 0
+    for line in block.split(b"\n"):
+        offset += len(line) + 1
+        size = offset - start
+        if size >= MAX_CHUNK_SIZE or (size >= MIN_CHUNK_SIZE and zlib.crc32(line) & LINE_CUT_MASK == 0):
+            pieces.append((start, min(offset, len(block))))
+            start = offset
+    if start < len(block):
+        pieces.append((start, len(block)))
+    return pieces
+
+
+def chunk_boundaries(data, text):
+    # Returns [(start, end)] covering data
+    boundary = NODE_BOUNDARY_MA if text else NODE_BOUNDARY_MB
+    cuts = [0] + [m.start() + (1 if text else 0) for m in boundary.finditer(data)] + [len(data)]
+
+    # Merge small nodes together, then break up oversized ones
+    merged = []
+    start = 0
+    for cut in cuts[1:]:
+        if cut - start >= MIN_CHUNK_SIZE or cut == len(data):
+            if cut > start:
+                merged.append((start, cut))
+            start = cut
+
+    chunks = []
+    for start, end in merged:
+        if end - start <= MAX_CHUNK_SIZE:
+            chunks.append((start, end))
+        elif text:
+            chunks.extend((start + a, start + b) for a, b in split_lines_by_content(data[start:end]))
+        else:
+            chunks.extend((s, min(s + MAX_CHUNK_SIZE, end)) for s in range(start, end, MAX_CHUNK_SIZE))
+    return chunks
+
+
+def anchor_for(chunk):
+    # Identifies "the same place" in two versions of a scene: the chunk's first line (e.g. its createNode)
+    return zlib.crc32(chunk[:chunk.find(b"\n") + 1 or 256])
+
+
+def compress(data):
+    if zstandard is not None:
+        return CODEC_ZSTD + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return CODEC_ZLIB + zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress(codec, payload):
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("The 'zstandard' package is required to read this version (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return zlib.decompress(payload)
+
+
+class VersionStore:
+    def __init__(self, root=VERSION_HISTORY_PATH, company_root=COMPANY_PATH, workers=None):
+        self.root = root
+        self.company_root = os.path.abspath(company_root)
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+
+    # Layout helpers
+
+    def relative(self, path):
+        path = os.path.abspath(path)
+        if os.path.normcase(path).startswith(os.path.normcase(self.company_root) + os.sep):
+            return os.path.relpath(path, self.company_root).replace(os.sep, "/")
+        return path.replace(os.sep, "/")
+
+    def index_path(self, path):
+        key = hashlib.sha1(self.relative(path).lower().encode("utf-8")).hexdigest()
+        return os.path.join(self.root, "assets", key[:2], key + ".json")
+
+    def object_path(self, sha):
+        return os.path.join(self.root, "objects", sha[:2], sha)
+
+    def recipe_path(self, sha):
+        return os.path.join(self.root, "recipes", sha[:2], sha + ".json")
+
+    def write_atomic(self, path, data):
+        # Several workstations share the store; unique temp names keep concurrent writers apart
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as out_file:
+            out_file.write(data)
+        os.replace(temp_path, path)
+
+    def load_index(self, path):
+        try:
+            with open(self.index_path(path), "r") as index_file:
+                return json.load(index_file)
+        except (OSError, ValueError):
+            return {"path": self.relative(path), "versions": []}
+
+    def index_lock(self):
+        return pmt_locks.locked(os.path.join(self.root, INDEX_LOCK), INDEX_LOCK_TIMEOUT)
+
+    def save_index(self, path, index):
+        self.write_atomic(self.index_path(path), json.dumps(index, indent=4).encode("utf-8"))
+
+    def load_recipe(self, sha):
+        with open(self.recipe_path(sha), "r") as recipe_file:
+            return json.load(recipe_file)
+
+    # Objects
+
+    def read_object(self, sha):
+        with self.cache_lock:
+            if sha in self.cache:
+                self.cache.move_to_end(sha)
+                return self.cache[sha]
+        with open(self.object_path(sha), "rb") as object_file:
+            raw = object_file.read()
+        if raw[:1] == KIND_DELTA:
+            base = self.read_object(raw[1:65].decode("ascii"))
+            if zstandard is None:
+                raise RuntimeError("The 'zstandard' package is required to read this version (pip install zstandard)")
+            dictionary = zstandard.ZstdCompressionDict(base, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+            data = zstandard.ZstdDecompressor(dict_data=dictionary).decompress(raw[66:])
+        else:
+            data = decompress(raw[1:2], raw[2:])
+        with self.cache_lock:
+            self.cache[sha] = data
+            while len(self.cache) > 32:
+                self.cache.popitem(last=False)
+        return data
+
+    def object_depth(self, sha):
+        with open(self.object_path(sha), "rb") as object_file:
+            header = object_file.read(66)
+        return header[65] if header[:1] == KIND_DELTA else 0
+
+    def store_chunk(self, chunk, sha, base_sha):
+        if os.path.exists(self.object_path(sha)):
+            return
+        encoded = KIND_FULL + compress(chunk)
+        if base_sha and zstandard is not None:
+            try:
+                depth = self.object_depth(base_sha) + 1
+                if depth <= MAX_DELTA_DEPTH:
+                    dictionary = zstandard.ZstdCompressionDict(self.read_object(base_sha), dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+                    delta = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dictionary).compress(chunk)
+                    if len(delta) + 66 < len(encoded):
+                        encoded = KIND_DELTA + base_sha.encode("ascii") + bytes([depth]) + delta
+            except (OSError, zstandard.ZstdError) as e:
+                print(f"Storing chunk {sha[:12]} without delta: {e}")
+        self.write_atomic(self.object_path(sha), encoded)
+
+    # Versions
+
+    def snapshot(self, path, action="write", note=None):
+        # Record the file's current content; returns the new version entry, or None if it matches the latest version
+        size = os.path.getsize(path)
+        index = self.load_index(path)
+        latest = index["versions"][-1] if index["versions"] else None
+        previous = {}
+        if latest and is_text_scene(path):
+            try:
+                previous = {anchor: sha for sha, _, anchor in self.load_recipe(latest["sha256"])["chunks"]}
+            except (OSError, ValueError):
+                previous = {}
+
+        with open(path, "rb") as scene_file:
+            data = mmap.mmap(scene_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            try:
+                file_sha = hashlib.sha256(data).hexdigest()
+                if latest and latest["sha256"] == file_sha:
+                    return None
+                chunks = []
+                with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                    # A bounded window of chunks in flight, like restore, so only a few are copied out at a time
+                    pending = deque()
+                    for start, end in chunk_boundaries(data, is_text_scene(path)):
+                        chunk = bytes(data[start:end])
+                        sha = hashlib.sha256(chunk).hexdigest()
+                        anchor = anchor_for(chunk)
+                        chunks.append([sha, end - start, anchor])
+                        base_sha = previous.get(anchor)
+                        pending.append(pool.submit(self.store_chunk, chunk, sha, base_sha if base_sha != sha else None))
+                        if len(pending) >= self.workers * CHUNKS_PER_WORKER:
+                            pending.popleft().result()
+                    while pending:
+                        pending.popleft().result()
+            finally:
+                if size:
+                    data.close()
+
+        if not os.path.exists(self.recipe_path(file_sha)):
+            self.write_atomic(self.recipe_path(file_sha), json.dumps({"size": size, "chunks": chunks}).encode("utf-8"))
+        with self.index_lock():
+            # Read again: another workstation may have added a version while the chunks were stored
+            index = self.load_index(path)
+            latest = index["versions"][-1] if index["versions"] else None
+            if latest and latest["sha256"] == file_sha:
+                return None
+            entry = {
+                "version": latest["version"] + 1 if latest else 1,
+                "time": time.time(),
+                "sha256": file_sha,
+                "size": size,
+                "action": action,
+                "user": getpass.getuser(),
+            }
+            if note:
+                entry["note"] = note
+            index["path"] = self.relative(path)
+            index["versions"].append(entry)
+            self.save_index(path, index)
+        return entry
+
+    def versions(self, path):
+        return self.load_index(path)["versions"]
+
+    def restore(self, path, version, output_path=None):
+        # Write version of path to output_path (default: back over path); returns the written path
+        entry = next((v for v in self.versions(path) if v["version"] == version), None)
+        if entry is None:
+            raise KeyError(f"No version {version} of {path}")
+        recipe = self.load_recipe(entry["sha256"])
+        output_path = output_path or path
+        temp_path = output_path + ".pmt_restore.tmp"
+        sha = hashlib.sha256()
+        with open(temp_path, "wb") as out_file, ThreadPoolExecutor(max_workers=self.workers) as pool:
+            # Read ahead in parallel over a bounded window of chunks, writing them in order
+            pending = deque()
+            chunk_shas = iter(c[0] for c in recipe["chunks"])
+            for chunk_sha in chunk_shas:
+                pending.append(pool.submit(self.read_object, chunk_sha))
+                if len(pending) >= self.workers * CHUNKS_PER_WORKER:
+                    break
+            while pending:
+                chunk = pending.popleft().result()
+                sha.update(chunk)
+                out_file.write(chunk)
+                chunk_sha = next(chunk_shas, None)
+                if chunk_sha is not None:
+                    pending.append(pool.submit(self.read_object, chunk_sha))
+        if sha.hexdigest() != entry["sha256"]:
+            os.remove(temp_path)
+            raise RuntimeError(f"Version {version} of {path} failed its checksum; the history store is damaged")
+        os.replace(temp_path, output_path)
+        return output_path
+
+    def move(self, old_path, new_path):
+        # Keep the history with the file when it is renamed
+        with self.index_lock():
+            self.move_index(old_path, new_path)
+
+    def move_index(self, old_path, new_path):
+        index = self.load_index(old_path)
+        if not index["versions"]:
+            return
+        if self.index_path(old_path) == self.index_path(new_path):
+            # Case-only rename: same index file, only the recorded path changes
+            index["path"] = self.relative(new_path)
+            self.save_index(new_path, index)
+            return
+        existing = self.load_index(new_path)
+        offset = existing["versions"][-1]["version"] if existing["versions"] else 0
+        for entry in index["versions"]:
+            entry["version"] += offset
+        index["versions"] = existing["versions"] + index["versions"]
+        index["path"] = self.relative(new_path)
+        self.save_index(new_path, index)
+        try:
+            os.remove(self.index_path(old_path))
+        except OSError:
+            pass
+
+    def move_tree(self, old_folder, new_folder):
+        # A renamed project or folder: move the history of every file that lived under it
+        old_prefix = self.relative(old_folder).lower() + "/"
+        moves = []
+        for folder, dirs, files in os.walk(os.path.join(self.root, "assets")):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(folder, name), "r") as index_file:
+                        rel_path = json.load(index_file)["path"]
+                except (OSError, ValueError, KeyError):
+                    continue
+                if rel_path.lower().startswith(old_prefix):
+                    moves.append(rel_path[len(old_prefix):])
+        for rel_path in moves:
+            self.move(os.path.join(old_folder, *rel_path.split("/")), os.path.join(new_folder, *rel_path.split("/")))
+        return len(moves)
+
+    def stored_size(self):
+        total = 0
+        for folder, dirs, files in os.walk(self.root):
+            total += sum(os.path.getsize(os.path.join(folder, f)) for f in files)
+        return total
+
+
+default_store = VersionStore()
+
+
+def record(path, action="write"):
+    # Snapshot for the GUI's write paths: a failed snapshot is reported but never blocks the user's operation
+    if not os.path.isfile(path):
+        return None
+    try:
+        return default_store.snapshot(path, action)
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"Failed to record a version of {path}: {e}")
+        return None
+
+
+def move(old_path, new_path):
+    # Called after the rename, so new_path tells whether a file or a folder moved
+    try:
+        if os.path.isdir(new_path):
+            default_store.move_tree(old_path, new_path)
+        else:
+            default_store.move(old_path, new_path)
+    except (OSError, ValueError) as e:
+        print(f"Failed to move the version history of {old_path}: {e}")
@@ -0,0 +1,11 @@
+# pmt_config reads the base and local data folders from the environment at import time, so point them at a
+# scratch folder before any PMT module is imported; tests use their own tmp_path folders on top of that
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_scratch = tempfile.mkdtemp(prefix="pmt-tests-")
+os.environ["PMT_BASE_DIRECTORY"] = os.path.join(_scratch, "base")
+os.environ["LOCALAPPDATA"] = os.path.join(_scratch, "local")
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+import pmt_archive
+import pmt_operations
+import pmt_versions
+from pmt_config import PMT_PROJECTS_PATH
+
+pytest.importorskip("zstandard")
+
+
+def make_project(name):
+    project_path = os.path.join(PMT_PROJECTS_PATH, name)
+    os.makedirs(os.path.join(project_path, "Source", "Props"))
+    with open(os.path.join(project_path, "Source", "Props", "Prop.ma"), "w") as scene_file:
+        scene_file.write("//Maya ASCII 2023 scene\ncreateNode transform -n \"prop\";\n")
+    return project_path
+
+
+def test_archive_refuses_to_replace_an_existing_archive(tmp_path):
+    project_path = make_project(f"Archived {os.getpid()}")
+    summary = pmt_operations.archive_project(project_path, str(tmp_path))
+    assert not summary["removed"] and os.path.isdir(project_path)
+    with pytest.raises(FileExistsError):
+        pmt_operations.archive_project(project_path, str(tmp_path), remove=True)
+    assert os.path.isdir(project_path)
+    pmt_operations.archive_project(project_path, str(tmp_path), remove=True, overwrite=True)
+    assert not os.path.exists(project_path)
+
+
+def test_failed_archive_leaves_no_partial_files(tmp_path):
+    project_path = make_project(f"Interrupted {os.getpid()}")
+
+    def progress(done, total, name):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        pmt_operations.archive_project(project_path, str(tmp_path), progress=progress)
+    assert os.listdir(tmp_path) == []
+    assert os.path.isdir(project_path)
+
+
+def test_restore_creates_the_project_and_never_writes_over_one(tmp_path):
+    name = f"Restored {os.getpid()}"
+    project_path = make_project(name)
+    archive_path = pmt_operations.archive_project(project_path, str(tmp_path), remove=True)["archive_path"]
+
+    events = []
+    summary = pmt_operations.restore_project(archive_path, progress=lambda *event: events.append(event))
+    assert summary["project_path"] == project_path
+    assert events[-1][0] == events[-1][1] == summary["entries"]
+    scene = os.path.join(project_path, "Source", "Props", "Prop.ma")
+    assert [v["action"] for v in pmt_versions.default_store.versions(scene)] == ["restore"]
+    assert name in pmt_operations.list_projects()
+
+    with open(scene, "a") as scene_file:
+        scene_file.write("// edited after the restore\n")
+    with pytest.raises(FileExistsError):
+        pmt_operations.restore_project(archive_path)
+    with open(scene) as scene_file:
+        assert "edited after the restore" in scene_file.read()
+    assert pmt_archive.load_index(archive_path)["project"] == name
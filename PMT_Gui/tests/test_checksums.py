@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+import pmt_checksums
+from pmt_checksums import ChecksumService
+
+FBX = pmt_checksums.FBX_BINARY_MAGIC + b"mesh data"
+
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as out_file:
+        out_file.write(content)
+
+
+def statuses(results):
+    return {os.path.basename(path): status for path, status, _ in results}
+
+
+@pytest.fixture
+def service():
+    service = ChecksumService(workers=2)
+    yield service
+    service.shutdown()
+
+
+def test_verify_reports_ok_corrupt_and_missing(tmp_path, service):
+    crate = str(tmp_path / "Props" / "crate.fbx")
+    barrel = str(tmp_path / "Props" / "barrel.fbx")
+    gone = str(tmp_path / "Props" / "gone.fbx")
+    for path in (crate, barrel, gone):
+        write_file(path, FBX)
+        service.record(path).result()
+
+    # Same size and mtime, different bytes: only a full verify can catch it
+    stat = os.stat(barrel)
+    write_file(barrel, FBX.replace(b"mesh", b"MESH"))
+    os.utime(barrel, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.remove(gone)
+
+    assert statuses(service.verify(str(tmp_path))) == {"crate.fbx": "skipped", "barrel.fbx": "skipped",
+                                                        "gone.fbx": "missing"}
+    assert statuses(service.verify(str(tmp_path), full=True)) == {"crate.fbx": "ok", "barrel.fbx": "corrupt",
+                                                                  "gone.fbx": "missing"}
+
+
+def test_verify_updates_stale_and_untracked_entries(tmp_path, service):
+    crate = str(tmp_path / "Props" / "crate.fbx")
+    write_file(crate, FBX)
+    service.record(crate).result()
+    write_file(crate, FBX + b" and more")
+    write_file(str(tmp_path / "Props" / "new.fbx"), FBX)
+    write_file(str(tmp_path / "Props" / "Temp" / "autosave.fbx"), b"ignored")
+
+    assert statuses(service.verify(str(tmp_path), update=True)) == {"crate.fbx": "stale", "new.fbx": "untracked"}
+    assert statuses(service.verify(str(tmp_path), full=True)) == {"crate.fbx": "ok", "new.fbx": "ok"}
+    assert pmt_checksums.load_manifest(str(tmp_path / "Props"))["files"]["crate.fbx"]["sha256"] == \
+        pmt_checksums.hash_file(crate)
+
+
+def test_truncated_fbx_is_refused_and_flagged(tmp_path, service):
+    broken = str(tmp_path / "Props" / "broken.fbx")
+    write_file(broken, b"Kaydara")
+    with pytest.raises(ValueError):
+        service.record(broken).result()
+    assert statuses(service.verify(str(tmp_path))) == {"broken.fbx": "corrupt"}
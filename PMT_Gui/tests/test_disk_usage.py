@@ -0,0 +1,83 @@
+import os
+
+from pmt_disk_usage import DiskUsageScanner
+
+
+def write_file(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as out_file:
+        out_file.write(b"x" * size)
+
+
+def touch_folder(path, offset):
+    # Folder mtimes can be coarse; move them explicitly so the test doesn't depend on timing
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + offset))
+
+
+def make_company(root):
+    write_file(os.path.join(root, "PMT Projects", "Demo", "Source", "Props", "crate.ma"), 100)
+    write_file(os.path.join(root, "PMT Projects", "Demo", "Exported", "Props", "crate.fbx"), 300)
+    write_file(os.path.join(root, "Department Assets", "rock.fbx"), 50)
+
+
+def test_rescan_reuses_cache_until_folder_mtime_changes(tmp_path):
+    root = str(tmp_path / "Company")
+    cache_path = str(tmp_path / "cache.json")
+    make_company(root)
+    listed, reused = DiskUsageScanner(root, cache_path, workers=2).scan()
+    assert reused == 0
+    folders = listed
+
+    scanner = DiskUsageScanner(root, cache_path, workers=2)
+    assert scanner.scan() == (0, folders)
+
+    props = os.path.join(root, "PMT Projects", "Demo", "Source", "Props")
+    write_file(os.path.join(props, "barrel.ma"), 1000)
+    touch_folder(props, 10)
+    scanner = DiskUsageScanner(root, cache_path, workers=2)
+    assert scanner.scan() == (1, folders - 1)
+    report = scanner.summarize()
+    assert report["projects"]["Demo"]["Source"]["Props"] == 1100
+    assert report["libraries"]["Department Assets"] == 50
+    assert report["total"] == 1450
+
+
+def test_full_scan_sees_files_rewritten_in_place(tmp_path):
+    root = str(tmp_path / "Company")
+    cache_path = str(tmp_path / "cache.json")
+    make_company(root)
+    DiskUsageScanner(root, cache_path, workers=2).scan()
+
+    # Rewriting a file doesn't move its folder's mtime, so only a full scan notices
+    rock = os.path.join(root, "Department Assets", "rock.fbx")
+    folder_stat = os.stat(os.path.dirname(rock))
+    write_file(rock, 500)
+    os.utime(os.path.dirname(rock), ns=(folder_stat.st_atime_ns, folder_stat.st_mtime_ns))
+
+    scanner = DiskUsageScanner(root, cache_path, workers=2)
+    scanner.scan()
+    assert scanner.summarize()["libraries"]["Department Assets"] == 50
+    scanner.scan(full=True)
+    assert scanner.summarize()["libraries"]["Department Assets"] == 500
+
+
+def test_duplicate_hashes_are_dropped_when_a_file_changes(tmp_path):
+    root = str(tmp_path / "Company")
+    cache_path = str(tmp_path / "cache.json")
+    write_file(os.path.join(root, "Department Assets", "a.fbx"), 200)
+    write_file(os.path.join(root, "Department Assets", "b.fbx"), 200)
+    scanner = DiskUsageScanner(root, cache_path, workers=2)
+    scanner.scan()
+    duplicates = scanner.find_duplicates(min_size=1)
+    assert [d["paths"] for d in duplicates] == [["Department Assets/a.fbx", "Department Assets/b.fbx"]]
+
+    b = os.path.join(root, "Department Assets", "b.fbx")
+    with open(b, "wb") as out_file:
+        out_file.write(b"y" * 200)
+    stat = os.stat(b)
+    os.utime(b, (stat.st_atime, stat.st_mtime + 10))
+    touch_folder(os.path.dirname(b), 10)
+    scanner = DiskUsageScanner(root, cache_path, workers=2)
+    scanner.scan()
+    assert scanner.find_duplicates(min_size=1) == []
@@ -0,0 +1,121 @@
+import os
+import json
+
+import pytest
+
+import pmt_export_queue
+from pmt_export_queue import ExportScheduler, StubExecutor
+
+
+def make_scheduler(queue_path, executor=None, **kwargs):
+    kwargs.setdefault("poll_interval", 0.05)
+    kwargs.setdefault("retry_delay", 0.0)
+    return ExportScheduler(executor or StubExecutor(), queue_path=str(queue_path), **kwargs)
+
+
+def load_jobs(queue_path):
+    with open(os.path.join(queue_path, pmt_export_queue.JOBS_FILE)) as jobs_file:
+        return {job["id"]: job for job in json.load(jobs_file)}
+
+
+def test_runs_highest_priority_first(tmp_path):
+    executor = StubExecutor()
+    scheduler = make_scheduler(tmp_path, executor, max_concurrent=1)
+    low = scheduler.submit("low.ma", "low.fbx", pmt_export_queue.PRIORITY_LOW)
+    normal = scheduler.submit("normal.ma", "normal.fbx")
+    high = scheduler.submit("high.ma", "high.fbx", pmt_export_queue.PRIORITY_HIGH)
+    scheduler.start()
+    assert scheduler.wait_idle(timeout=5)
+    scheduler.stop()
+    assert executor.runs == [high["id"], normal["id"], low["id"]]
+
+
+def test_concurrency_limit(tmp_path):
+    running = []
+    peak = []
+
+    class CountingExecutor(StubExecutor):
+        def run(self, job):
+            with self.lock:
+                running.append(job["id"])
+                peak.append(len(running))
+            try:
+                super().run(job)
+            finally:
+                with self.lock:
+                    running.remove(job["id"])
+
+    scheduler = make_scheduler(tmp_path, CountingExecutor(duration=0.05), max_concurrent=2)
+    for i in range(8):
+        scheduler.submit(f"scene{i}.ma", f"scene{i}.fbx")
+    scheduler.start()
+    assert scheduler.wait_idle(timeout=5)
+    scheduler.stop()
+    assert max(peak) == 2
+
+
+def test_retries_then_fails(tmp_path):
+    scheduler = make_scheduler(tmp_path, StubExecutor(failures=1), max_retries=2)
+    retried = scheduler.submit("retried.ma", "retried.fbx")
+    scheduler.start()
+    assert scheduler.wait_idle(timeout=5)
+    scheduler.stop()
+    assert load_jobs(tmp_path)[retried["id"]]["state"] == pmt_export_queue.STATE_DONE
+    assert load_jobs(tmp_path)[retried["id"]]["attempts"] == 2
+
+    scheduler = make_scheduler(tmp_path, StubExecutor(failures=10), max_retries=2)
+    failed = scheduler.submit("failed.ma", "failed.fbx")
+    scheduler.start()
+    assert scheduler.wait_idle(timeout=5)
+    scheduler.stop()
+    job = load_jobs(tmp_path)[failed["id"]]
+    assert job["state"] == pmt_export_queue.STATE_FAILED
+    assert job["attempts"] == 3
+    assert "Stub failure 3" in job["error"]
+
+
+def test_state_survives_restart(tmp_path):
+    scheduler = make_scheduler(tmp_path)
+    job = scheduler.submit("scene.ma", "scene.fbx")
+    # Simulate a crash while the job was running
+    scheduler.jobs[job["id"]]["state"] = pmt_export_queue.STATE_RUNNING
+    with scheduler.condition:
+        scheduler.save()
+    scheduler.stop()
+
+    executor = StubExecutor()
+    scheduler = make_scheduler(tmp_path, executor)
+    assert scheduler.jobs[job["id"]]["state"] == pmt_export_queue.STATE_QUEUED
+    scheduler.start()
+    assert scheduler.wait_idle(timeout=5)
+    scheduler.stop()
+    assert executor.runs == [job["id"]]
+
+
+def test_incoming_job_kept_until_saved(tmp_path, monkeypatch):
+    job = pmt_export_queue.submit_job_file("scene.ma", "scene.fbx", queue_path=str(tmp_path))
+    incoming_path = os.path.join(tmp_path, pmt_export_queue.INCOMING_FOLDER, job["id"] + ".json")
+    scheduler = make_scheduler(tmp_path)
+
+    def crash():
+        raise OSError("disk full")
+
+    monkeypatch.setattr(scheduler, "save", crash)
+    with pytest.raises(OSError):
+        scheduler.collect_incoming()
+    assert os.path.exists(incoming_path)
+    scheduler.stop()
+
+    scheduler = make_scheduler(tmp_path)
+    scheduler.collect_incoming()
+    scheduler.stop()
+    assert not os.path.exists(incoming_path)
+    assert job["id"] in load_jobs(tmp_path)
+
+
+def test_one_scheduler_per_queue(tmp_path):
+    scheduler = make_scheduler(tmp_path)
+    with pytest.raises(BlockingIOError):
+        make_scheduler(tmp_path)
+    scheduler.stop()
+    make_scheduler(tmp_path).stop()
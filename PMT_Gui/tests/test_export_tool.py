@@ -0,0 +1,61 @@
+import os
+import sys
+import json
+import importlib.util
+from importlib.machinery import SourceFileLoader
+from unittest import mock
+
+import pytest
+
+import pmt_checksums
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "PMT Export Tool.txt")
+
+
+@pytest.fixture
+def export_tool(monkeypatch):
+    # Loads the Maya export script with mocks standing in for maya.cmds and OpenMaya; the windows it builds go nowhere,
+    # and the project list it builds on load comes back empty instead of reading the studio share
+    maya = mock.MagicMock()
+    monkeypatch.setitem(sys.modules, "maya", maya)
+    monkeypatch.setitem(sys.modules, "maya.cmds", maya.cmds)
+    monkeypatch.setitem(sys.modules, "maya.api", maya.api)
+    monkeypatch.setitem(sys.modules, "maya.api.OpenMaya", maya.api.OpenMaya)
+    loader = SourceFileLoader("pmt_export_tool", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader(loader.name, loader))
+    with mock.patch("socket.create_connection", side_effect=OSError), mock.patch("os.listdir", return_value=[]):
+        loader.exec_module(module)
+    return module
+
+
+def test_piece_names_only_use_full_paths_on_clashes(export_tool):
+    names = export_tool.piece_file_names(["|env_GRP|rock:rock_01", "|props_GRP|rock_01", "|Crate", "|barrel",
+                                          "|set:Barrel"])
+    assert names == {"|env_GRP|rock:rock_01": "env_GRP_rock_rock_01.fbx",
+                     "|props_GRP|rock_01": "props_GRP_rock_01.fbx",
+                     "|Crate": "Crate.fbx",
+                     "|barrel": "barrel.fbx",
+                     "|set:Barrel": "set_Barrel.fbx"}
+
+
+def test_piece_names_number_remaining_clashes(export_tool):
+    names = export_tool.piece_file_names(["|a_b|c", "|a|b|c"])
+    assert sorted(name.lower() for name in names.values()) == ["a_b_c.fbx", "a_b_c_2.fbx"]
+
+
+def test_checksums_and_split_hashes_match_pmt(tmp_path, export_tool):
+    piece = tmp_path / "rock_01.fbx"
+    piece.write_bytes(export_tool.FBX_BINARY_MAGIC + b"mesh")
+    export_tool.record_checksum(str(piece))
+    entry = pmt_checksums.load_manifest(str(tmp_path))["files"]["rock_01.fbx"]
+    assert pmt_checksums.check_file(str(piece), entry, full=True)[0] == "ok"
+
+    export_tool.update_json_manifest(str(tmp_path), export_tool.SPLIT_MANIFEST_NAME, "rock_01.fbx", "abc")
+    assert export_tool.load_split_hashes(str(tmp_path)) == {"rock_01.fbx": "abc"}
+
+    broken = tmp_path / "broken.fbx"
+    broken.write_bytes(b"Kaydara")
+    with pytest.raises(ValueError):
+        export_tool.record_checksum(str(broken))
+    with open(tmp_path / pmt_checksums.MANIFEST_NAME) as manifest_file:
+        assert "broken.fbx" not in json.load(manifest_file)["files"]
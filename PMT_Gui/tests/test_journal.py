@@ -0,0 +1,95 @@
+import os
+import json
+import ntpath
+
+import pmt_journal
+from pmt_journal import Journal
+
+
+def make_journal(tmp_path, user="anna"):
+    journal = Journal(path=str(tmp_path / "Journal"), root=str(tmp_path))
+    journal.user = user
+    return journal
+
+
+def run_command(tmp_path, number, user="anna"):
+    # What one short `pmt` run leaves behind: a closed segment with a couple of events
+    journal = make_journal(tmp_path, user)
+    journal.record("create_file", str(tmp_path / "PMT Projects" / "Show" / f"scene{number}.ma"))
+    journal.record("delete_file", str(tmp_path / "PMT Projects" / "Other" / f"scene{number}.ma"))
+    journal.close()
+
+
+def index_names(tmp_path):
+    return sorted(n for n in os.listdir(tmp_path / "Journal") if n.endswith(pmt_journal.INDEX_EXTENSION))
+
+
+def test_compact_merges_finished_segments(tmp_path):
+    for number in range(20):
+        run_command(tmp_path, number, user="anna" if number % 2 else "ben")
+    reader = make_journal(tmp_path)
+    before = reader.query()
+    assert len(index_names(tmp_path)) == 20
+
+    assert reader.compact() == 19
+    assert len(index_names(tmp_path)) == 1
+    assert len(os.listdir(tmp_path / "Journal")) == 3  # Segment, index and the lock file
+    after = reader.query()
+    assert after == before
+    assert [e["t"] for e in after] == sorted(e["t"] for e in after)
+    assert len(reader.query(user="ben")) == 20
+    assert {e["user"] for e in reader.query(user="ben")} == {"ben"}
+    assert len(reader.query(path="PMT Projects/Show")) == 20
+
+
+def test_compact_leaves_open_segments(tmp_path):
+    run_command(tmp_path, 0)
+    run_command(tmp_path, 1)
+    writer = make_journal(tmp_path)
+    writer.record("create_file", str(tmp_path / "PMT Projects" / "Show" / "open.ma"))
+    writer.flush()
+    assert writer.compact() == 1
+    writer.record("create_file", str(tmp_path / "PMT Projects" / "Show" / "later.ma"))
+    writer.flush()
+    assert len(writer.query()) == 6
+    writer.close()
+
+
+def test_interrupted_compaction_is_not_read_twice(tmp_path):
+    for number in range(3):
+        run_command(tmp_path, number)
+    journal = make_journal(tmp_path)
+    indexes, _ = journal.load_indexes()
+    remove_segment = journal.remove_segment
+    journal.remove_segment = lambda segment: None  # Crash before the merged segments are removed
+    journal.merge(indexes)
+    assert len(journal.query()) == 6
+    journal.remove_segment = remove_segment
+    assert journal.compact() == 0
+    assert len(index_names(tmp_path)) == 1
+    assert len(journal.query()) == 6
+
+
+def test_path_matching_follows_the_filesystem_case(tmp_path, monkeypatch):
+    journal = make_journal(tmp_path)
+    journal.record("create_file", str(tmp_path / "PMT Projects" / "Show" / "Scene.ma"))
+    journal.flush()
+    monkeypatch.setattr(os.path, "normcase", ntpath.normcase)
+    assert pmt_journal.key_matches("PMT Projects/Show", "pmt projects/show/scene.ma")
+    assert not pmt_journal.key_matches("PMT Projects/Show", "pmt projects/showreel")
+    assert len(journal.query(path="pmt projects/SHOW")) == 1
+    assert journal.query(path="pmt projects/showreel") == []
+
+
+def test_unclosed_segments_compact_once_old(tmp_path):
+    run_command(tmp_path, 0)
+    journal = make_journal(tmp_path)
+    journal.record("create_file", str(tmp_path / "crashed.ma"))
+    journal.flush()
+    journal.segment_file.close()  # Killed: the segment is never marked closed
+    index_path = tmp_path / "Journal" / (journal.segment + pmt_journal.INDEX_EXTENSION)
+    index = json.loads(index_path.read_text())
+    assert make_journal(tmp_path).compact() == 0
+    index["opened"] -= 2 * pmt_journal.SEGMENT_AGE
+    index_path.write_text(json.dumps(index))
+    assert make_journal(tmp_path).compact() == 1
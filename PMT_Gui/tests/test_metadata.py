@@ -0,0 +1,30 @@
+import asyncio
+
+from pmt_metadata import MetadataServer
+
+
+def test_refresh_loop_survives_share_errors(tmp_path, capsys):
+    (tmp_path / "PMT Projects").mkdir()
+    server = MetadataServer(root=str(tmp_path), address=("127.0.0.1", 0), refresh_interval=0.01)
+    calls = []
+
+    def updates(folders):
+        calls.append(folders)
+        if len(calls) <= 2:
+            raise OSError("The specified network name is no longer available")
+        return {}
+
+    async def run():
+        server.index.updates = updates
+        task = asyncio.create_task(server.refresh_loop())
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if len(calls) > 3:
+                break
+        assert not task.done()
+        task.cancel()
+
+    asyncio.run(run())
+    assert len(calls) > 3
+    assert "Failed to refresh the PMT metadata index" in capsys.readouterr().out
+
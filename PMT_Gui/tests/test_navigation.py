@@ -0,0 +1,17 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+BENCH_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench_navigation.py")
+
+
+def test_navigation_memory_stays_flat():
+    # Own process: the benchmark builds its own company tree and QApplication
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    result = subprocess.run([sys.executable, BENCH_PATH, "3000"], capture_output=True, text=True, env=env,
+                            cwd=os.path.dirname(BENCH_PATH), timeout=600)
+    assert result.returncode == 0, result.stdout[-2000:] + result.stderr[-2000:]
@@ -0,0 +1,109 @@
+import os
+
+import pmt_references
+import pmt_validate
+from pmt_references import ReferenceRewriter
+
+
+def write_scene(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as scene_file:
+        scene_file.write("//Maya ASCII 2023 scene\n" + text)
+
+
+def test_rewrites_paths_the_validation_scan_does_not_record(tmp_path):
+    projects_path = str(tmp_path / "PMT Projects")
+    old_path = os.path.join(projects_path, "Old")
+    new_path = os.path.join(projects_path, "New")
+    cache_path = os.path.join(old_path, "Cache", "smoke.vdb").replace("\\", "/")
+    scene = os.path.join(projects_path, "Shot", "shot.ma")
+    write_scene(scene, f'setAttr ".cachePath" -type "string" "{cache_path}";\n')
+    os.makedirs(old_path)
+    # The cached scan lists no path under the old project, which used to skip the scene
+    validator = pmt_validate.SceneValidator(workers=1)
+    validator.validate([scene])
+    validator.save_cache()
+    assert not validator.cached_scan(scene)["paths"]
+
+    rewriter = ReferenceRewriter(workers=1, processes=False, roots=[projects_path], projects_path=projects_path)
+    assert rewriter.rename(old_path, new_path) == [(scene, 1)]
+    with open(scene) as scene_file:
+        assert os.path.join(new_path, "Cache", "smoke.vdb").replace("\\", "/") in scene_file.read()
+
+
+def test_skips_scenes_deleted_before_the_rewrite(tmp_path):
+    projects_path = str(tmp_path / "PMT Projects")
+    os.makedirs(os.path.join(projects_path, "Old"))
+    scene = os.path.join(projects_path, "Shot", "gone.ma")
+    write_scene(scene, "")
+    rewriter = ReferenceRewriter(workers=1, processes=False, roots=[projects_path], projects_path=projects_path)
+    plan = rewriter.plan(os.path.join(projects_path, "Old"), os.path.join(projects_path, "New"))
+    os.remove(scene)
+    assert rewriter.run(plan, False) == []
+
+
+def make_rewriter(tmp_path, projects_path):
+    return ReferenceRewriter(workers=1, processes=False, roots=[projects_path], projects_path=projects_path,
+                             index_path=str(tmp_path / "reference_index.json"))
+
+
+def count_calls(monkeypatch, name):
+    calls = []
+    function = getattr(pmt_references, name)
+
+    def counted(path, *args):
+        calls.append(path)
+        return function(path, *args)
+
+    monkeypatch.setattr(pmt_references, name, counted)
+    return calls
+
+
+def test_index_limits_reads_to_scenes_that_mention_the_old_path(tmp_path, monkeypatch):
+    projects_path = str(tmp_path / "PMT Projects")
+    rig = os.path.join(projects_path, "Show", "Rigs", "hero.ma")
+    write_scene(rig, "")
+    for number in range(10):
+        reference = f'file -r -ns "hero" "{rig}";\n'.replace("\\", "/") if number < 2 else ""
+        write_scene(os.path.join(projects_path, "Show", "Shots", f"shot{number}.ma"), reference)
+    indexed = count_calls(monkeypatch, "scene_references")
+    searched = count_calls(monkeypatch, "contains")
+
+    assert len(make_rewriter(tmp_path, projects_path).find(rig, rig.replace("hero", "villain"))) == 2
+    assert len(indexed) == 11 and len(searched) == 2
+    indexed.clear()
+    searched.clear()
+    assert len(make_rewriter(tmp_path, projects_path).find(rig, rig.replace("hero", "villain"))) == 2
+    assert indexed == [] and len(searched) == 2
+
+    # A scene written since it was indexed is read again
+    changed = os.path.join(projects_path, "Show", "Shots", "shot5.ma")
+    write_scene(changed, f'file -r -ns "hero" "{rig}";\n'.replace("\\", "/"))
+    searched.clear()
+    assert len(make_rewriter(tmp_path, projects_path).find(rig, rig.replace("hero", "villain"))) == 3
+    assert indexed == [changed] and len(searched) == 3
+
+
+def test_rename_keeps_the_index_current(tmp_path, monkeypatch):
+    projects_path = str(tmp_path / "PMT Projects")
+    rig = os.path.join(projects_path, "Show", "Rigs", "hero.ma")
+    shot = os.path.join(projects_path, "Show", "Shots", "shot.ma")
+    write_scene(rig, "")
+    write_scene(shot, f'file -r -ns "hero" "{rig}";\n'.replace("\\", "/"))
+    villain = rig.replace("hero", "villain")
+    make_rewriter(tmp_path, projects_path).rename(rig, villain)
+
+    indexed = count_calls(monkeypatch, "scene_references")
+    assert make_rewriter(tmp_path, projects_path).find(villain, rig) == [(shot, 1)]
+    assert make_rewriter(tmp_path, projects_path).find(rig, villain) == []
+    assert indexed == []
+
+
+def test_old_paths_the_index_cannot_answer_for_read_every_scene(tmp_path):
+    projects_path = str(tmp_path / "PMT Projects")
+    old_path = os.path.join(projects_path, "Show", "Source")
+    os.makedirs(old_path)
+    shot = os.path.join(projects_path, "Show", "Shots", "shot.ma")
+    write_scene(shot, 'setAttr ".folder" -type "string" "Source";\n')
+    rewriter = make_rewriter(tmp_path, projects_path)
+    assert rewriter.find(old_path, os.path.join(projects_path, "Show", "Scenes")) == [(shot, 1)]
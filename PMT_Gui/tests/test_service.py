@@ -0,0 +1,153 @@
+import os
+import time
+import asyncio
+import threading
+
+import pytest
+
+import pmt_operations
+import pmt_service
+import pmt_versions
+from pmt_config import PMT_PROJECTS_PATH, PROJECT_TEMPLATES_PATH
+from pmt_service import ServiceServer, ServiceClient, ServiceError
+
+
+@pytest.fixture
+def serve():
+    # Runs a ServiceServer on a free localhost port in a background loop; returns a client factory
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    servers = []
+
+    def start(token="", **kwargs):
+        server = ServiceServer(address=("127.0.0.1", 0), token=token, **kwargs)
+        asyncio.run_coroutine_threadsafe(server.start(), loop).result(timeout=5)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        asyncio.run_coroutine_threadsafe(server.stop(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    loop.close()
+
+
+def client_for(server, token=""):
+    return ServiceClient(address=("127.0.0.1", server.port), token=token, timeout=30)
+
+
+def unique_name(prefix):
+    return f"{prefix} {os.getpid()} {time.time_ns()}"
+
+
+def test_create_and_list_projects(serve):
+    client = client_for(serve())
+    name = unique_name("Service")
+    summary = client.call("create_project", project_name=name)
+    assert os.path.isdir(os.path.join(PMT_PROJECTS_PATH, name))
+    assert summary["template"] == "Default"
+    assert name in client.call("list_projects")
+
+
+def test_batch_reports_each_failure(serve):
+    client = client_for(serve())
+    results = client.batch([("list_projects", {}), ("delete_project", {"project_path": "PMT Projects/Missing"})])
+    assert isinstance(results[0], list)
+    assert isinstance(results[1], ServiceError)
+
+
+def test_streams_progress(serve):
+    client = client_for(serve())
+    events = []
+    client.call("create_project", progress=lambda done, total, name: events.append((done, total)),
+                project_name=unique_name("Progress"))
+    assert events
+    assert events[-1][0] == events[-1][1]
+
+
+def test_refuses_template_outside_templates_folder(serve):
+    client = client_for(serve())
+    secret = os.path.join(os.path.dirname(PROJECT_TEMPLATES_PATH), "Secret")
+    os.makedirs(os.path.join(secret, "Source"), exist_ok=True)
+    name = unique_name("Traversal")
+    for template in ("../Secret", secret):
+        with pytest.raises(ServiceError):
+            client.call("create_project", project_name=name, template=template)
+    assert not os.path.exists(os.path.join(PMT_PROJECTS_PATH, name))
+
+
+def test_refuses_non_project_folders(serve):
+    client = client_for(serve())
+    keep = unique_name("Keep")
+    client.call("create_project", project_name=keep)
+    for project_path in ("PMT Projects", "", ".", "PMT Projects/Tools", "PMT Projects/" + keep + "/Source"):
+        with pytest.raises(ServiceError):
+            client.call("delete_project", project_path=project_path)
+    assert os.path.isdir(os.path.join(PMT_PROJECTS_PATH, keep))
+    with pytest.raises(ValueError):
+        pmt_operations.delete_project(os.path.dirname(PMT_PROJECTS_PATH))
+
+
+def test_token_required(serve):
+    server = serve(token="secret")
+    with pytest.raises(ServiceError) as error:
+        client_for(server, token="wrong").call("list_projects")
+    assert error.value.code == 401
+    with pytest.raises(ServiceError) as error:
+        client_for(server).call("list_projects")
+    assert error.value.code == 401
+    assert isinstance(client_for(server, token="secret").call("list_projects"), list)
+
+
+def test_concurrency_limit(serve):
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def slow():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.1)
+        with lock:
+            running[0] -= 1
+        return True
+
+    client = client_for(serve(max_concurrent=2, methods={"slow": slow}))
+    assert client.batch([("slow", {})] * 6) == [True] * 6
+    assert peak[0] == 2
+
+
+def test_file_operations_stay_in_projects_and_libraries(serve):
+    client = client_for(serve())
+    project = unique_name("Files")
+    client.call("create_project", project_name=project)
+    scene = client.call("create_maya_file", folder_path=f"PMT Projects/{project}/Source/Props", file_name="Crate")
+    os.makedirs(os.path.join(os.path.dirname(PMT_PROJECTS_PATH), "Journal"), exist_ok=True)
+    for method, params in [("delete_maya_file", {"file_path": "Journal/segment.jsonl"}),
+                           ("delete_maya_file", {"file_path": "Version History/assets/old.ma"}),
+                           ("delete_maya_file", {"file_path": "PMT Projects/Tools/shelf.ma"}),
+                           ("rename_maya_file", {"file_path": scene, "new_file_name": "Crate.json"}),
+                           ("create_maya_file", {"folder_path": "Journal", "file_name": "x"}),
+                           ("copy_maya_file", {"source_path": scene, "destination_folder": "Journal"})]:
+        with pytest.raises(ServiceError):
+            client.call(method, **params)
+    assert os.path.isfile(scene)
+
+
+def test_rename_and_copy_refuse_existing_files(serve):
+    client = client_for(serve())
+    project = unique_name("Existing")
+    client.call("create_project", project_name=project)
+    folder = f"PMT Projects/{project}/Source/Props"
+    crate = client.call("create_maya_file", folder_path=folder, file_name="Crate")
+    client.call("create_maya_file", folder_path=folder, file_name="Barrel")
+    with pytest.raises(ServiceError) as error:
+        client.call("rename_maya_file", file_path=crate, new_file_name="Barrel.ma")
+    assert error.value.code == pmt_service.ALREADY_EXISTS
+    assert pmt_versions.default_store.versions(crate)[-1]["action"] == "create"
+    with pytest.raises(ServiceError):
+        client.call("copy_maya_file", source_path=crate, destination_folder=folder)
+    assert client.call("rename_maya_file", file_path=crate, new_file_name="Box.ma").endswith("Box.ma")
@@ -0,0 +1,76 @@
+import os
+import time
+
+import pytest
+
+import pmt_locks
+import pmt_temp_janitor
+from pmt_temp_janitor import TempJanitor, plan_evictions, policy_for
+
+DAY = 24 * 3600
+POLICY = {"max_age_days": 14, "max_bytes": 1000, "min_age_minutes": 30, "interval_minutes": 60, "folders": {}}
+
+
+def test_plan_evicts_old_files_then_least_recently_used():
+    now = 100 * DAY
+    files = [("old.ma", 10, now - 20 * DAY),
+             ("big.ma", 800, now - 2 * DAY),
+             ("recent.ma", 500, now - DAY),
+             ("autosave.ma", 600, now - 60)]
+    assert plan_evictions(files, POLICY, now) == [("old.ma", 10, "age"), ("big.ma", 800, "size"),
+                                                  ("recent.ma", 500, "size")]
+
+
+def test_plan_never_evicts_files_in_use():
+    now = 100 * DAY
+    files = [("autosave.ma", 5000, now - 60)]
+    assert plan_evictions(files, POLICY, now) == []
+
+
+def test_folder_overrides():
+    policy = dict(POLICY, folders={"PMT Projects/*/Source/Characters/Temp": {"max_bytes": 0}})
+    assert policy_for(policy, "PMT Projects/Demo/Source/Characters/Temp")["max_bytes"] == 0
+    assert policy_for(policy, "PMT Projects/Demo/Source/Props/Temp")["max_bytes"] == 1000
+
+
+def make_janitor(tmp_path):
+    temp = tmp_path / "Company" / "Department Assets" / "Temp"
+    temp.mkdir(parents=True)
+    old = temp / "Scenes" / "old.ma"
+    old.parent.mkdir()
+    old.write_bytes(b"x")
+    stale = time.time() - 30 * DAY
+    os.utime(old, (stale, stale))
+    (temp / "autosave.ma").write_bytes(b"x")
+    janitor = TempJanitor(dict(POLICY), log_path=str(tmp_path / "log.jsonl"), root=str(tmp_path / "Company"),
+                          find_folders=lambda: [str(temp)], lock_path=str(tmp_path / "janitor.lock"),
+                          state_path=str(tmp_path / "state.json"))
+    return janitor, temp, old
+
+
+def test_run_once_removes_and_logs(tmp_path):
+    janitor, temp, old = make_janitor(tmp_path)
+    assert [r["path"] for r in janitor.run_once(dry_run=True)] == [str(old)]
+    assert old.exists()
+
+    records = janitor.run_once()
+    assert [(r["path"], r["reason"], r["result"]) for r in records] == [(str(old), "age", "removed")]
+    assert not old.exists() and not old.parent.exists()
+    assert (temp / "autosave.ma").exists()
+    assert [r["dry_run"] for r in pmt_temp_janitor.read_log(janitor.log_path)] == [True, False]
+
+
+def test_run_once_honours_shared_lock_and_interval(tmp_path):
+    janitor, temp, old = make_janitor(tmp_path)
+    with pmt_locks.locked(janitor.lock_path):
+        with pytest.raises(BlockingIOError):
+            janitor.run_once()
+    assert old.exists()
+
+    # Another workstation ran a pass a minute ago
+    pmt_temp_janitor.save_last_run(janitor.state_path, time.time() - 60)
+    assert janitor.run_once(due_only=True) is None
+    assert old.exists()
+    pmt_temp_janitor.save_last_run(janitor.state_path, time.time() - 2 * 3600)
+    assert len(janitor.run_once(due_only=True)) == 1
+    assert not old.exists()
@@ -0,0 +1,56 @@
+import os
+import json
+import stat
+
+import pytest
+
+import pmt_operations
+import pmt_templates
+from pmt_config import PMT_PROJECTS_PATH
+
+
+def make_template(templates_path):
+    template_path = templates_path / "Rigged"
+    (template_path / "Rigs").mkdir(parents=True)
+    (template_path / "Rigs" / "hero.ma").write_text("//Maya ASCII 2023 scene\n// rig\n")
+    (template_path / "Source" / "Characters").mkdir(parents=True)
+    (template_path / "Source" / "Characters" / "Character.ma").write_text("//Maya ASCII 2023 scene\n")
+    (template_path / pmt_templates.TEMPLATE_MANIFEST).write_text(json.dumps({"link": ["Rigs/*"]}))
+    return template_path
+
+
+def test_links_only_shared_files_and_leaves_them_writable(tmp_path):
+    template_path = make_template(tmp_path / "Templates")
+    name = f"Linked {os.getpid()}"
+    summary = pmt_templates.create_project(name, "Rigged", templates_path=str(tmp_path / "Templates"),
+                                           mode=pmt_templates.MODE_HARDLINK)
+    project_path = os.path.join(PMT_PROJECTS_PATH, name)
+    assert summary["hardlinked"] == 1 and summary["copied"] == 1
+    rig = os.path.join(project_path, "Rigs", "hero.ma")
+    scene = os.path.join(project_path, "Source", "Characters", "Character.ma")
+    assert os.path.samefile(rig, template_path / "Rigs" / "hero.ma")
+    assert not os.path.samefile(scene, template_path / "Source" / "Characters" / "Character.ma")
+    assert os.stat(rig).st_mode & stat.S_IWUSR and os.stat(scene).st_mode & stat.S_IWUSR
+    assert not os.stat(template_path / "Rigs").st_mode & stat.S_IWUSR  # The template's folders are protected
+
+    pmt_operations.delete_project(project_path)
+    assert not os.path.exists(project_path)
+    assert os.path.exists(template_path / "Rigs" / "hero.ma")
+
+
+def test_failed_clone_is_never_listed(tmp_path):
+    make_template(tmp_path / "Templates")
+    name = f"Broken {os.getpid()}"
+    listed = []
+
+    def progress(done, total, path):
+        listed.append(pmt_operations.list_projects())
+        raise OSError("Disk full")
+
+    with pytest.raises(OSError):
+        pmt_templates.create_project(name, "Rigged", templates_path=str(tmp_path / "Templates"), progress=progress)
+    assert listed and not any(p.startswith(".") or name in p for p in listed[0])
+    assert name not in pmt_operations.list_projects()
+    assert os.listdir(os.path.join(PMT_PROJECTS_PATH, pmt_templates.STAGING_FOLDER)) == []
+    with pytest.raises(ValueError):
+        pmt_operations.delete_project(os.path.join(PMT_PROJECTS_PATH, pmt_templates.STAGING_FOLDER))
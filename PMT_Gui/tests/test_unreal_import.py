@@ -0,0 +1,134 @@
+import os
+import sys
+import types
+import importlib
+
+import pytest
+
+import pmt_unreal_import
+
+
+class EditorObject:
+    def __init__(self):
+        self.properties = {}
+
+    def set_editor_property(self, name, value):
+        self.properties[name] = value
+
+    def get_editor_property(self, name):
+        return self.properties.get(name)
+
+
+class FbxImportUI(EditorObject):
+    def __init__(self):
+        super().__init__()
+        self.skeletal_mesh_import_data = EditorObject()
+        self.static_mesh_import_data = EditorObject()
+
+
+class ScopedSlowTask:
+    def __init__(self, work, description):
+        self.frames = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def make_dialog(self, can_cancel):
+        pass
+
+    def should_cancel(self):
+        return False
+
+    def enter_progress_frame(self, work):
+        self.frames += work
+
+
+class AssetTools:
+    def __init__(self, failing):
+        self.failing = failing
+        self.imported = []
+
+    def import_asset_tasks(self, tasks):
+        for task in tasks:
+            if os.path.basename(task.get_editor_property("filename")) not in self.failing:
+                task.set_editor_property("imported_object_paths", [task.get_editor_property("destination_path")])
+                self.imported.append(task)
+
+
+@pytest.fixture
+def unreal_editor(monkeypatch):
+    # Stands in for the editor's unreal module; returns the asset tools the script imports through
+    asset_tools = AssetTools(failing=set())
+    unreal = types.ModuleType("unreal")
+    unreal.FbxImportUI = FbxImportUI
+    unreal.AssetImportTask = EditorObject
+    unreal.FBXImportType = types.SimpleNamespace(FBXIT_SKELETAL_MESH="skeletal", FBXIT_STATIC_MESH="static")
+    unreal.AssetToolsHelpers = types.SimpleNamespace(get_asset_tools=lambda: asset_tools)
+    unreal.ScopedSlowTask = ScopedSlowTask
+    unreal.log = unreal.log_warning = lambda message: None
+    monkeypatch.setitem(sys.modules, "unreal", unreal)
+    monkeypatch.delitem(sys.modules, "unreal_import_manifest", raising=False)
+    asset_tools.script = importlib.import_module("unreal_import_manifest")
+    return asset_tools
+
+
+def write_fbx(project_path, rel_path, content):
+    path = os.path.join(project_path, "Exported", *rel_path.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as fbx_file:
+        fbx_file.write(content)
+
+
+def ingest(project_path, editor):
+    manifest_path, manifest = pmt_unreal_import.write_manifest(str(project_path))
+    editor.imported = []
+    editor.script.import_manifest(manifest_path)
+    return manifest, pmt_unreal_import.commit_results(str(project_path))
+
+
+def test_manifest_lists_new_and_changed_assets(tmp_path):
+    project_path = tmp_path / "My Project"
+    write_fbx(project_path, "Props/Old Crate.fbx", b"crate")
+    write_fbx(project_path, "Characters/hero.fbx", b"hero")
+    manifest = pmt_unreal_import.build_manifest(str(project_path), batch_size=1)
+    assert manifest["asset_count"] == 2 and len(manifest["batches"]) == 2
+    crate = next(a for batch in manifest["batches"] for a in batch if a["relative_path"] == "Props/Old Crate.fbx")
+    assert crate["destination_path"] == "/Game/My_Project/Props"
+    assert crate["destination_name"] == "Old_Crate"
+    assert crate["settings"] == pmt_unreal_import.IMPORT_SETTINGS["Props"]
+
+
+def test_ingest_skips_unchanged_and_reimports_changed(tmp_path, unreal_editor):
+    project_path = tmp_path / "Show"
+    write_fbx(project_path, "Props/crate.fbx", b"crate")
+    write_fbx(project_path, "Characters/hero.fbx", b"hero")
+    manifest, counts = ingest(project_path, unreal_editor)
+    assert manifest["asset_count"] == 2 and counts == (2, 0)
+    hero_options = next(t for t in unreal_editor.imported if t.get_editor_property("filename").endswith("hero.fbx"))
+    assert hero_options.get_editor_property("options").get_editor_property("import_as_skeletal")
+
+    assert pmt_unreal_import.build_manifest(str(project_path))["asset_count"] == 0
+    write_fbx(project_path, "Props/crate.fbx", b"crate, remodelled")
+    manifest, counts = ingest(project_path, unreal_editor)
+    assert [a["relative_path"] for batch in manifest["batches"] for a in batch] == ["Props/crate.fbx"]
+    assert counts == (1, 0)
+
+
+def test_failed_imports_are_not_marked_done(tmp_path, unreal_editor):
+    project_path = tmp_path / "Show"
+    write_fbx(project_path, "Props/crate.fbx", b"crate")
+    write_fbx(project_path, "Props/barrel.fbx", b"barrel")
+    unreal_editor.failing.add("barrel.fbx")
+    manifest, counts = ingest(project_path, unreal_editor)
+    assert counts == (1, 1)
+    assert not os.path.exists(os.path.join(project_path, "Exported", pmt_unreal_import.RESULTS_NAME))
+
+    unreal_editor.failing.clear()
+    manifest, counts = ingest(project_path, unreal_editor)
+    assert [a["relative_path"] for batch in manifest["batches"] for a in batch] == ["Props/barrel.fbx"]
+    assert counts == (1, 0)
+    with pytest.raises(FileNotFoundError):
+        pmt_unreal_import.commit_results(str(project_path))
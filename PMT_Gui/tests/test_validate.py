@@ -0,0 +1,80 @@
+import os
+
+import pmt_validate
+from pmt_validate import SceneValidator
+
+SCENE = '''//Maya ASCII 2024 scene
+requires maya "2024";
+file -rdi 1 -ns "rock" -rfn "rockRN" "{reference}";
+createNode transform -n "pCube1";
+createNode transform -n "Crate_Lid";
+createNode nurbsSurface -n "lidShape" -p "Crate_Lid";
+'''
+
+
+def write_scene(path, reference, extra=""):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as scene_file:
+        scene_file.write(SCENE.format(reference=reference) + extra)
+
+
+def rules(issues):
+    return sorted((i["severity"], i["rule"]) for i in issues)
+
+
+def count_scans(monkeypatch):
+    scanned = []
+    scan_scene = pmt_validate.scan_scene
+
+    def counting(path):
+        scanned.append(path)
+        return scan_scene(path)
+
+    monkeypatch.setattr(pmt_validate, "scan_scene", counting)
+    return scanned
+
+
+def test_validate_reports_scene_issues(tmp_path):
+    company = tmp_path / "Company"
+    scene = str(company / "Source" / "Props" / "crate.ma")
+    write_scene(scene, "C:/Users/artist/Desktop/rock.ma")
+    report = SceneValidator(workers=1, cache_path=str(tmp_path / "cache.json"), company_root=str(company)).validate([scene])
+    assert rules(report[scene]) == [("error", "missing_file"), ("error", "outside_company"),
+                                    ("error", "unsupported_node"), ("warning", "naming")]
+
+
+def test_cache_hits_skip_the_scan_but_recheck_paths(tmp_path, monkeypatch):
+    company = tmp_path / "Company"
+    scene = str(company / "Source" / "Props" / "crate.ma")
+    rock = company / "Source" / "Props" / "rock.ma"
+    write_scene(scene, str(rock).replace(os.sep, "/"))
+    cache_path = str(tmp_path / "cache.json")
+    scanned = count_scans(monkeypatch)
+
+    first = SceneValidator(workers=1, cache_path=cache_path, company_root=str(company)).validate([scene])
+    assert ("error", "missing_file") in rules(first[scene])
+    assert scanned == [scene]
+
+    # A new validator reads the saved cache; the scene isn't read again but the reference is checked again
+    rock.write_text("//Maya ASCII 2024 scene\n")
+    second = SceneValidator(workers=1, cache_path=cache_path, company_root=str(company)).validate([scene])
+    assert scanned == [scene]
+    assert rules(second[scene]) == [("error", "unsupported_node"), ("warning", "naming")]
+
+
+def test_changed_scene_is_scanned_again(tmp_path, monkeypatch):
+    company = tmp_path / "Company"
+    scene = str(company / "Source" / "Props" / "crate.ma")
+    write_scene(scene, "rock.ma")
+    validator = SceneValidator(workers=1, cache_path=str(tmp_path / "cache.json"), company_root=str(company))
+    scanned = count_scans(monkeypatch)
+    validator.validate([scene])
+
+    write_scene(scene, "rock.ma", 'createNode transform -n "pasted__Crate";\n')
+    stat = os.stat(scene)
+    os.utime(scene, (stat.st_atime, stat.st_mtime + 10))
+    report = validator.validate([scene])
+    assert scanned == [scene, scene]
+    assert rules(report[scene]).count(("warning", "naming")) == 2
+    assert validator.validate([scene], use_cache=False) == report
+    assert len(scanned) == 3
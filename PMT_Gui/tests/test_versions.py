@@ -0,0 +1,60 @@
+import os
+import threading
+
+import pmt_versions
+from pmt_versions import VersionStore
+
+
+def write_scene(path, nodes, tag=""):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as scene_file:
+        scene_file.write(f"//Maya ASCII 2023 scene {tag}\n")
+        for number in range(nodes):
+            scene_file.write(f'createNode transform -n "node{number}";\n' + f"    // {tag} {number}\n" * 4000)
+
+
+def test_snapshot_keeps_a_bounded_window_of_chunks(tmp_path, monkeypatch):
+    scene = str(tmp_path / "company" / "big.ma")
+    write_scene(scene, 40)
+    store = VersionStore(root=str(tmp_path / "history"), company_root=str(tmp_path / "company"), workers=2)
+    boundaries = pmt_versions.chunk_boundaries
+    store_chunk = store.store_chunk
+    stored = []
+    in_flight = []
+
+    def counting_boundaries(data, text):
+        for boundary in boundaries(data, text):
+            in_flight.append(len(in_flight) - len(stored))
+            yield boundary
+
+    def counting_store_chunk(*args):
+        store_chunk(*args)
+        stored.append(1)
+
+    monkeypatch.setattr(pmt_versions, "chunk_boundaries", counting_boundaries)
+    monkeypatch.setattr(store, "store_chunk", counting_store_chunk)
+    entry = store.snapshot(scene)
+    assert len(in_flight) > 10
+    assert max(in_flight) <= store.workers * pmt_versions.CHUNKS_PER_WORKER
+    assert store.restore(scene, entry["version"], str(tmp_path / "restored.ma"))
+    with open(scene, "rb") as original, open(tmp_path / "restored.ma", "rb") as restored:
+        assert original.read() == restored.read()
+
+
+def test_concurrent_snapshots_keep_every_version(tmp_path):
+    # Each thread stands in for a workstation: same store and company-relative path, its own content
+    history = str(tmp_path / "history")
+    threads = []
+    for number in range(8):
+        company = str(tmp_path / f"workstation{number}")
+        write_scene(os.path.join(company, "PMT Projects", "Show", "shot.ma"), 2, tag=str(number))
+        store = VersionStore(root=history, company_root=company, workers=1)
+        path = os.path.join(company, "PMT Projects", "Show", "shot.ma")
+        threads.append(threading.Thread(target=store.snapshot, args=(path,)))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    versions = VersionStore(root=history, company_root=company).versions(path)
+    assert [v["version"] for v in versions] == list(range(1, 9))
+    assert len({v["sha256"] for v in versions}) == 8
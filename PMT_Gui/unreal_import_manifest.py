@@ -0,0 +1,73 @@
+# Run inside the Unreal Editor (UE 5.3, Python Editor Script Plugin):
+#   py "C:/path/to/unreal_import_manifest.py" "C:/.../PMT Projects/MyProject/Exported/unreal_import_manifest.json"
+# Imports the assets listed in a PMT import manifest batch by batch, then writes
+# unreal_import_manifest.results.json next to it. Run "pmt ingest MyProject --commit" afterwards
+# so the next manifest only lists assets that changed again.
+import os
+import sys
+import json
+import time
+
+import unreal
+
+
+def build_import_task(asset):
+    settings = asset["settings"]
+    options = unreal.FbxImportUI()
+    skeletal = settings["mesh_type"] == "skeletal"
+    options.set_editor_property("import_mesh", True)
+    options.set_editor_property("import_as_skeletal", skeletal)
+    options.set_editor_property("mesh_type_to_import",
+                                unreal.FBXImportType.FBXIT_SKELETAL_MESH if skeletal else unreal.FBXImportType.FBXIT_STATIC_MESH)
+    options.set_editor_property("import_materials", settings["import_materials"])
+    options.set_editor_property("import_textures", settings["import_textures"])
+    options.set_editor_property("import_animations", settings["import_animations"])
+    if skeletal:
+        options.skeletal_mesh_import_data.set_editor_property("import_morph_targets", True)
+    else:
+        options.static_mesh_import_data.set_editor_property("combine_meshes", settings["combine_meshes"])
+        options.static_mesh_import_data.set_editor_property("generate_lightmap_u_vs", settings.get("generate_lightmap_uvs", True))
+
+    task = unreal.AssetImportTask()
+    task.set_editor_property("filename", asset["source"])
+    task.set_editor_property("destination_path", asset["destination_path"])
+    task.set_editor_property("destination_name", asset["destination_name"])
+    task.set_editor_property("replace_existing", True)
+    task.set_editor_property("automated", True)
+    task.set_editor_property("save", True)
+    task.set_editor_property("options", options)
+    return task
+
+
+def import_manifest(manifest_path):
+    with open(manifest_path, "r") as manifest_file:
+        manifest = json.load(manifest_file)
+
+    asset_tools = unreal.AssetToolsHelpers.get_asset_tools()
+    imported = []
+    failed = []
+    batches = manifest["batches"]
+    with unreal.ScopedSlowTask(len(batches), f"Importing {manifest['asset_count']} PMT assets") as slow_task:
+        slow_task.make_dialog(True)
+        for batch in batches:
+            if slow_task.should_cancel():
+                break
+            slow_task.enter_progress_frame(1)
+            tasks = [build_import_task(asset) for asset in batch]
+            asset_tools.import_asset_tasks(tasks)
+            for asset, task in zip(batch, tasks):
+                if task.get_editor_property("imported_object_paths"):
+                    imported.append({"relative_path": asset["relative_path"], "sha256": asset["sha256"]})
+                else:
+                    failed.append({"relative_path": asset["relative_path"], "source": asset["source"]})
+                    unreal.log_warning(f"PMT import failed: {asset['source']}")
+
+    results_path = os.path.join(os.path.dirname(manifest_path), "unreal_import_manifest.results.json")
+    with open(results_path, "w") as results_file:
+        json.dump({"manifest": manifest_path, "finished": time.time(), "imported": imported, "failed": failed},
+                  results_file, indent=4)
+    unreal.log(f"PMT import: {len(imported)} imported, {len(failed)} failed; results in {results_path}")
+
+
+if __name__ == "__main__":
+    import_manifest(sys.argv[1])